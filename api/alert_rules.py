@@ -0,0 +1,346 @@
+"""
+価格アラートのルールエンジン - ルールをNumPy配列に変換し全銘柄を一括判定
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# ルールの種類
+PERCENT = "percent"  # 前日比の変動率（%）が閾値以上
+PRICE_CROSS = "price_cross"  # 前日終値から現在値の間で指定価格をまたいだ
+VOLUME_SPIKE = "volume_spike"  # 出来高が前日の指定倍以上
+GAP = "gap"  # 始値の前日終値からの乖離（%）が閾値以上
+
+RULE_TYPES = (PERCENT, PRICE_CROSS, VOLUME_SPIKE, GAP)
+
+# 銘柄ごとに1つの閾値を持つルール（銘柄 > 市場 > 全体 の順に優先）
+_THRESHOLD_TYPES = (PERCENT, VOLUME_SPIKE, GAP)
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """アラートルール（symbol・marketの指定がなければ全銘柄が対象）"""
+
+    type: str
+    value: float  # 閾値（%）、価格、または倍率
+    symbol: Optional[str] = None
+    market: Optional[str] = None
+
+    @property
+    def specificity(self) -> int:
+        if self.symbol:
+            return 2
+        if self.market:
+            return 1
+        return 0
+
+
+@dataclass(frozen=True)
+class AlertHit:
+    """ルールに該当した銘柄と理由"""
+
+    price: object
+    reasons: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class _CompiledRules:
+    thresholds: Dict[str, np.ndarray]  # 種類ごとの閾値（ルールなしはNaN）
+    cross_index: np.ndarray  # 価格ルールの対象銘柄の位置
+    cross_level: np.ndarray  # 価格ルールの価格
+
+
+class AlertRuleSet:
+    """アラートルールの集合（銘柄リストごとに配列へコンパイルして評価）"""
+
+    def __init__(self, rules: Iterable[AlertRule]):
+        self.rules = sorted(rules, key=lambda rule: rule.specificity)
+        for rule in self.rules:
+            if rule.type not in RULE_TYPES:
+                raise ValueError(f"不明なアラートルール: {rule.type}")
+        self._compiled_key = None
+        self._compiled = None
+
+    @classmethod
+    def from_config(cls, config) -> "AlertRuleSet":
+        """設定から作成（全体の変動率ルール + 銘柄ごとの閾値 + ルールファイル）
+
+        全ての監視銘柄について銘柄設定の閾値を変動率ルールとする。
+        ルールファイルにその銘柄・市場（または全体）の変動率ルールがあれば
+        ファイルのルールを優先する。
+        """
+        rules = [AlertRule(PERCENT, config.price_change_threshold)]
+
+        file_rules = []
+        path = getattr(config, "alert_rules_path", "")
+        if path and Path(path).exists():
+            file_rules = cls.load_rules(path)
+
+        percent_rules = [rule for rule in file_rules if rule.type == PERCENT]
+        if not any(rule.specificity == 0 for rule in percent_rules):
+            symbols = {rule.symbol for rule in percent_rules if rule.symbol}
+            markets = {rule.market for rule in percent_rules if rule.specificity == 1}
+            rules.extend(
+                AlertRule(PERCENT, stock_config.threshold, symbol=stock_config.symbol)
+                for stock_config in getattr(config, "stocks", [])
+                if stock_config.symbol not in symbols
+                and stock_config.market not in markets
+            )
+
+        return cls(rules + file_rules)
+
+    @classmethod
+    def from_thresholds(cls, thresholds: Dict[str, float]) -> "AlertRuleSet":
+        """銘柄ごとの変動率閾値から作成"""
+        return cls(
+            AlertRule(PERCENT, threshold, symbol=symbol)
+            for symbol, threshold in thresholds.items()
+        )
+
+    @staticmethod
+    def load_rules(path: str) -> List[AlertRule]:
+        """ルールファイル（JSON）を読み込み
+
+        例: {"rules": [{"type": "percent", "value": 3.0, "market": "jp"},
+                       {"type": "price_cross", "value": 40000, "symbol": "^N225"}]}
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        return [
+            AlertRule(
+                type=entry["type"],
+                value=float(entry["value"]),
+                symbol=entry.get("symbol"),
+                market=entry.get("market"),
+            )
+            for entry in data.get("rules", [])
+        ]
+
+    def compile(self, symbols: Sequence[str], markets: Sequence[str]) -> _CompiledRules:
+        """銘柄リストに対するルールの閾値配列を作成（同じ銘柄リストなら再利用）"""
+        key = (tuple(symbols), tuple(markets))
+        if key == self._compiled_key:
+            return self._compiled
+
+        n = len(symbols)
+        market_array = np.asarray(markets, dtype=object)
+        positions: Dict[str, List[int]] = {}
+        for index, symbol in enumerate(symbols):
+            positions.setdefault(symbol, []).append(index)
+
+        def targets(rule: AlertRule) -> np.ndarray:
+            if rule.symbol:
+                return np.asarray(positions.get(rule.symbol, []), dtype=np.intp)
+            if rule.market:
+                return np.flatnonzero(market_array == rule.market)
+            return np.arange(n, dtype=np.intp)
+
+        thresholds = {kind: np.full(n, np.nan) for kind in _THRESHOLD_TYPES}
+        cross_index = []
+        cross_level = []
+        for rule in self.rules:
+            index = targets(rule)
+            if rule.type == PRICE_CROSS:
+                cross_index.append(index)
+                cross_level.append(np.full(len(index), rule.value))
+            else:
+                # 優先度の低い順に並んでいるため、後のルールで上書きする
+                thresholds[rule.type][index] = rule.value
+
+        compiled = _CompiledRules(
+            thresholds=thresholds,
+            cross_index=(
+                np.concatenate(cross_index) if cross_index else np.empty(0, np.intp)
+            ),
+            cross_level=(
+                np.concatenate(cross_level) if cross_level else np.empty(0, float)
+            ),
+        )
+        self._compiled_key, self._compiled = key, compiled
+        return compiled
+
+    def evaluate(self, prices: Sequence) -> List[AlertHit]:
+        """全銘柄を一括で判定し、該当した銘柄を返す"""
+        if hasattr(prices, "symbol_list"):
+            # PriceBatchは列をそのまま使う
+            symbols, markets = prices.symbol_list(), prices.market_list()
+            columns = _batch_columns(prices)
+        else:
+            prices = list(prices)
+            symbols = [p.symbol for p in prices]
+            markets = [p.market for p in prices]
+            columns = _columns(prices)
+        if not symbols:
+            return []
+
+        compiled = self.compile(symbols, markets)
+        hits = _evaluate(compiled, columns)
+
+        any_hit = np.zeros(len(prices), dtype=bool)
+        for mask in hits.values():
+            any_hit |= mask
+
+        results = []
+        for index in np.flatnonzero(any_hit):
+            reasons = tuple(
+                _describe(kind, index, columns, compiled)
+                for kind, mask in hits.items()
+                if mask[index]
+            )
+            results.append(AlertHit(price=prices[index], reasons=reasons))
+
+        return results
+
+
+def _optional(values) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def _columns(prices: Sequence) -> Dict[str, np.ndarray]:
+    """株価リストを列ごとの配列に変換"""
+    return {
+        "price": np.array([p.price for p in prices], dtype=np.float64),
+        "change_percent": np.array([p.change_percent for p in prices], np.float64),
+        "volume": np.array([p.volume for p in prices], dtype=np.float64),
+        "previous_close": _optional(getattr(p, "previous_close", None) for p in prices),
+        "open": _optional(getattr(p, "open_price", None) for p in prices),
+        "previous_volume": _optional(
+            getattr(p, "previous_volume", None) for p in prices
+        ),
+    }
+
+
+def _batch_columns(batch) -> Dict[str, np.ndarray]:
+    """PriceBatchの列を判定用の配列として取得"""
+    previous_volume = batch.previous_volume.astype(np.float64)
+    previous_volume[batch.previous_volume < 0] = np.nan
+    return {
+        "price": batch.price,
+        "change_percent": batch.change_percent,
+        "volume": batch.volume.astype(np.float64),
+        "previous_close": batch.previous_close,
+        "open": batch.open_price,
+        "previous_volume": previous_volume,
+    }
+
+
+def _evaluate(
+    compiled: _CompiledRules, columns: Dict[str, np.ndarray]
+) -> Dict[str, np.ndarray]:
+    """ルールの種類ごとに該当マスクを計算（NaNとの比較は常にFalse）"""
+    thresholds = compiled.thresholds
+    price = columns["price"]
+    previous_close = columns["previous_close"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gap_percent = (
+            np.abs(columns["open"] - previous_close) / np.abs(previous_close) * 100
+        )
+        volume_ratio = np.where(
+            columns["previous_volume"] > 0,
+            columns["volume"] / columns["previous_volume"],
+            np.nan,
+        )
+
+    hits = {
+        PERCENT: np.abs(columns["change_percent"]) >= thresholds[PERCENT],
+        VOLUME_SPIKE: volume_ratio >= thresholds[VOLUME_SPIKE],
+        GAP: gap_percent >= thresholds[GAP],
+    }
+
+    # 前日終値と現在値が価格の反対側にある（または現在値がちょうど価格に到達した）
+    crossed = np.zeros(len(price), dtype=bool)
+    if len(compiled.cross_index):
+        index, level = compiled.cross_index, compiled.cross_level
+        before = previous_close[index] - level
+        after = price[index] - level
+        mask = (before * after < 0) | ((after == 0) & (before != 0))
+        crossed[index[mask]] = True
+    hits[PRICE_CROSS] = crossed
+
+    return hits
+
+
+def _describe(kind: str, index: int, columns, compiled: _CompiledRules) -> str:
+    """該当理由の表示用文字列"""
+    if kind == PERCENT:
+        return f"変動率 {columns['change_percent'][index]:+.2f}%"
+    if kind == VOLUME_SPIKE:
+        ratio = columns["volume"][index] / columns["previous_volume"][index]
+        return f"出来高 前日比{ratio:.1f}倍"
+    if kind == GAP:
+        gap = (
+            (columns["open"][index] - columns["previous_close"][index])
+            / columns["previous_close"][index]
+            * 100
+        )
+        return f"ギャップ {gap:+.2f}%"
+
+    levels = compiled.cross_level[compiled.cross_index == index]
+    previous, current = columns["previous_close"][index], columns["price"][index]
+    crossed = [
+        level
+        for level in levels
+        if (previous - level) * (current - level) < 0
+        or (current == level and previous != level)
+    ]
+    direction = "上抜け" if current > previous else "下抜け"
+    return " / ".join(f"{level:,.2f} を{direction}" for level in crossed)
+
+
+class CooldownTracker:
+    """銘柄ごとの最終アラート時刻を配列で保持し、送信可否をマスクで判定"""
+
+    def __init__(self, cooldown: float = 1800):
+        self.cooldown = cooldown
+        self._index: Dict[str, int] = {}
+        self._last = np.full(16, np.nan)
+
+    def _position(self, symbol: str) -> int:
+        position = self._index.get(symbol)
+        if position is None:
+            position = len(self._index)
+            self._index[symbol] = position
+            if position >= len(self._last):
+                grown = np.full(len(self._last) * 2, np.nan)
+                grown[: len(self._last)] = self._last
+                self._last = grown
+        return position
+
+    def ready_mask(
+        self, symbols: Sequence[str], now: Optional[float] = None
+    ) -> np.ndarray:
+        """各銘柄がクールダウンを過ぎているか（未送信の銘柄はTrue）"""
+        now = time.time() if now is None else now
+        positions = np.array(
+            [self._index.get(symbol, -1) for symbol in symbols], dtype=np.intp
+        )
+        last = np.where(positions >= 0, self._last[positions], np.nan)
+        return ~(now - last <= self.cooldown)
+
+    def record(self, symbols: Iterable[str], now: Optional[float] = None):
+        """アラート送信時刻を記録"""
+        now = time.time() if now is None else now
+        for symbol in symbols:
+            position = self._position(symbol)  # 配列を拡張する場合があるため先に取得
+            self._last[position] = now
+
+    # dict互換（last_alert_time[symbol] = datetime のような既存の使い方）
+    def __contains__(self, symbol: str) -> bool:
+        position = self._index.get(symbol)
+        return position is not None and not np.isnan(self._last[position])
+
+    def __getitem__(self, symbol: str) -> datetime:
+        if symbol not in self:
+            raise KeyError(symbol)
+        return datetime.fromtimestamp(self._last[self._index[symbol]])
+
+    def __setitem__(self, symbol: str, value: datetime):
+        self.record([symbol], value.timestamp())
@@ -0,0 +1,73 @@
+"""
+市場スナップショット - 1回のスケジューラtickで取得した株価をまとめて保持
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional, Sequence
+
+from api.alert_rules import AlertHit, AlertRuleSet
+from api.price_batch import PriceBatch
+from api.stock_api import StockPrice
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """監視銘柄の株価スナップショット（不変）"""
+
+    prices: Sequence[StockPrice]  # 通常はPriceBatch（StockPriceのタプルも可）
+    thresholds: Mapping[str, float]
+    created_at: datetime = field(default_factory=datetime.now)
+
+    @classmethod
+    def build(
+        cls, stock_configs: Iterable, prices: Iterable[Optional[StockPrice]]
+    ) -> "MarketSnapshot":
+        """銘柄設定と取得結果（銘柄リスト順、失敗はNone）から作成"""
+        stock_configs = list(stock_configs)
+        thresholds = {
+            stock_config.symbol: stock_config.threshold
+            for stock_config in stock_configs
+        }
+        return cls(
+            prices=PriceBatch.from_prices(price for price in prices if price),
+            thresholds=MappingProxyType(thresholds),
+        )
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __iter__(self):
+        return iter(self.prices)
+
+    def to_prices(self) -> List[StockPrice]:
+        """StockPriceのリストに変換（PriceBatchの行ビューは実体化する）"""
+        return [_to_stock_price(price) for price in self.prices]
+
+    def get(self, symbol: str) -> Optional[StockPrice]:
+        """シンボルで株価を検索"""
+        return next((price for price in self.prices if price.symbol == symbol), None)
+
+    def by_market(self, market: str) -> List[StockPrice]:
+        """市場別に株価を取得"""
+        return [price for price in self.prices if price.market == market]
+
+    def alert_hits(self, rules: Optional[AlertRuleSet] = None) -> List[AlertHit]:
+        """アラートルールに該当した銘柄と理由を取得
+
+        ルールの指定がなければ銘柄ごとの変動率閾値で判定する。
+        """
+        if rules is None:
+            rules = AlertRuleSet.from_thresholds(self.thresholds)
+        return rules.evaluate(self.prices)
+
+    def alerts(self, rules: Optional[AlertRuleSet] = None) -> List[StockPrice]:
+        """アラートルールに該当した銘柄を取得"""
+        return [_to_stock_price(hit.price) for hit in self.alert_hits(rules)]
+
+
+def _to_stock_price(price) -> StockPrice:
+    """PriceBatchの行ビューをStockPriceに変換（StockPriceはそのまま返す）"""
+    to_stock_price = getattr(price, "to_stock_price", None)
+    return to_stock_price() if to_stock_price is not None else price
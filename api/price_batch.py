@@ -0,0 +1,222 @@
+"""
+株価バッチ - 1回の取得結果を列ごとの型付き配列でまとめて保持
+"""
+
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from api.stock_api import StockPrice
+
+# 前日出来高がない場合の値
+_NO_VOLUME = -1
+
+
+class PriceBatch:
+    """株価のリストを列指向で保持するコンテナ（不変）
+
+    数値は float64 / int64 の配列、タイムスタンプはUNIXエポック（マイクロ秒）、
+    シンボル・市場は重複を除いた文字列表への整数コードで保持する。
+    要素は ``PriceRow``（StockPriceと同じ属性を持つ軽量ビュー）として参照する。
+    """
+
+    __slots__ = (
+        "_symbols",
+        "_names",
+        "_markets",
+        "symbol_code",
+        "market_code",
+        "price",
+        "change",
+        "change_percent",
+        "volume",
+        "timestamp",
+        "open_price",
+        "previous_close",
+        "previous_volume",
+    )
+
+    def __init__(
+        self,
+        symbols: List[str],
+        names: List[str],
+        markets: List[str],
+        columns: Dict[str, np.ndarray],
+    ):
+        self._symbols = symbols  # シンボルコード -> シンボル
+        self._names = names  # シンボルコード -> 銘柄名
+        self._markets = markets  # 市場コード -> 市場
+        for name in self.__slots__[3:]:
+            column = columns[name]
+            column.flags.writeable = False
+            setattr(self, name, column)
+
+    @classmethod
+    def from_prices(cls, prices: Iterable[StockPrice]) -> "PriceBatch":
+        """株価データのリストから作成"""
+        prices = list(prices)
+        n = len(prices)
+
+        symbol_codes: Dict[str, int] = {}
+        market_codes: Dict[str, int] = {}
+        names: List[str] = []
+        columns = {
+            "symbol_code": np.empty(n, dtype=np.int32),
+            "market_code": np.empty(n, dtype=np.int32),
+            "price": np.empty(n, dtype=np.float64),
+            "change": np.empty(n, dtype=np.float64),
+            "change_percent": np.empty(n, dtype=np.float64),
+            "volume": np.empty(n, dtype=np.int64),
+            "timestamp": np.empty(n, dtype=np.int64),
+            "open_price": np.empty(n, dtype=np.float64),
+            "previous_close": np.empty(n, dtype=np.float64),
+            "previous_volume": np.empty(n, dtype=np.int64),
+        }
+
+        for i, price in enumerate(prices):
+            code = symbol_codes.get(price.symbol)
+            if code is None:
+                code = symbol_codes[sys.intern(price.symbol)] = len(names)
+                names.append(price.name)
+            columns["symbol_code"][i] = code
+            columns["market_code"][i] = market_codes.setdefault(
+                sys.intern(price.market), len(market_codes)
+            )
+            columns["price"][i] = price.price
+            columns["change"][i] = price.change
+            columns["change_percent"][i] = price.change_percent
+            columns["volume"][i] = price.volume
+            columns["timestamp"][i] = _epoch_micros(price.timestamp)
+            columns["open_price"][i] = _or_nan(getattr(price, "open_price", None))
+            columns["previous_close"][i] = _or_nan(
+                getattr(price, "previous_close", None)
+            )
+            previous_volume = getattr(price, "previous_volume", None)
+            columns["previous_volume"][i] = (
+                _NO_VOLUME if previous_volume is None else previous_volume
+            )
+
+        return cls(list(symbol_codes), names, list(market_codes), columns)
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def __iter__(self) -> Iterator["PriceRow"]:
+        return (PriceRow(self, i) for i in range(len(self)))
+
+    def __getitem__(self, index: int) -> "PriceRow":
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PriceBatch index out of range")
+        return PriceRow(self, index)
+
+    def symbol_list(self) -> List[str]:
+        """行ごとのシンボル"""
+        return [self._symbols[code] for code in self.symbol_code.tolist()]
+
+    def market_list(self) -> List[str]:
+        """行ごとの市場"""
+        return [self._markets[code] for code in self.market_code.tolist()]
+
+    def to_prices(self) -> List[StockPrice]:
+        """StockPriceのリストに変換"""
+        return [row.to_stock_price() for row in self]
+
+
+def _or_nan(value: Optional[float]) -> float:
+    return np.nan if value is None else value
+
+
+def _epoch_micros(value: datetime) -> int:
+    """日時をUNIXエポック（マイクロ秒）に変換（浮動小数点の丸め誤差なし）"""
+    seconds = int(value.replace(microsecond=0).timestamp())
+    return seconds * 1_000_000 + value.microsecond
+
+
+class PriceRow:
+    """PriceBatchの1行を参照するビュー（StockPriceと同じ属性を持つ）"""
+
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch: PriceBatch, index: int):
+        self._batch = batch
+        self._index = index
+
+    @property
+    def symbol(self) -> str:
+        return self._batch._symbols[self._batch.symbol_code[self._index]]
+
+    @property
+    def name(self) -> str:
+        return self._batch._names[self._batch.symbol_code[self._index]]
+
+    @property
+    def market(self) -> str:
+        return self._batch._markets[self._batch.market_code[self._index]]
+
+    @property
+    def price(self) -> float:
+        return float(self._batch.price[self._index])
+
+    @property
+    def change(self) -> float:
+        return float(self._batch.change[self._index])
+
+    @property
+    def change_percent(self) -> float:
+        return float(self._batch.change_percent[self._index])
+
+    @property
+    def volume(self) -> int:
+        return int(self._batch.volume[self._index])
+
+    @property
+    def timestamp(self) -> datetime:
+        seconds, micros = divmod(int(self._batch.timestamp[self._index]), 1_000_000)
+        return datetime.fromtimestamp(seconds).replace(microsecond=micros)
+
+    @property
+    def open_price(self) -> Optional[float]:
+        value = float(self._batch.open_price[self._index])
+        return None if np.isnan(value) else value
+
+    @property
+    def previous_close(self) -> Optional[float]:
+        value = float(self._batch.previous_close[self._index])
+        return None if np.isnan(value) else value
+
+    @property
+    def previous_volume(self) -> Optional[int]:
+        value = int(self._batch.previous_volume[self._index])
+        return None if value == _NO_VOLUME else value
+
+    def to_stock_price(self) -> StockPrice:
+        """StockPriceに変換"""
+        return StockPrice(
+            symbol=self.symbol,
+            name=self.name,
+            price=self.price,
+            change=self.change,
+            change_percent=self.change_percent,
+            volume=self.volume,
+            timestamp=self.timestamp,
+            market=self.market,
+            open_price=self.open_price,
+            previous_close=self.previous_close,
+            previous_volume=self.previous_volume,
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PriceRow):
+            other = other.to_stock_price()
+        if isinstance(other, StockPrice):
+            return self.to_stock_price() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PriceRow({self.symbol!r}, {self.market!r}, price={self.price})"
@@ -0,0 +1,168 @@
+"""
+永続株価キャッシュ - 単発実行をまたいで取得済みの株価を再利用
+"""
+
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from api.stock_api import StockPrice
+from utils.market_calendar import SETTLEMENT_DELAY, is_market_open, last_close
+
+logger = logging.getLogger(__name__)
+
+# 1回のクエリで渡すシンボル数の上限（SQLiteのバインド変数の上限より小さくとる）
+_MAX_VARIABLES = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    symbol TEXT NOT NULL,
+    market TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    change REAL NOT NULL,
+    change_percent REAL NOT NULL,
+    volume INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    open_price REAL,
+    previous_close REAL,
+    previous_volume INTEGER,
+    PRIMARY KEY (symbol, market)
+) WITHOUT ROWID
+"""
+
+# 後から追加した列（以前のバージョンで作成したファイルにはALTER TABLEで追加）
+_ADDED_COLUMNS = {
+    "open_price": "REAL",
+    "previous_close": "REAL",
+    "previous_volume": "INTEGER",
+}
+
+
+class PersistentPriceCache:
+    """SQLiteファイルに保存する株価キャッシュ（シンボル・市場単位）"""
+
+    def __init__(self, path: str, ttl: float = 600):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(quotes)")}
+            for name, column_type in _ADDED_COLUMNS.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE quotes ADD COLUMN {name} {column_type}")
+
+    @contextmanager
+    def _connect(self):
+        """トランザクション付きで接続（同時実行中の別プロセスの書き込みは待機）"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def fresh_since(self, market: str, now: float) -> float:
+        """この時刻以降に取得した株価が有効（休場中は直近の終値確定まで遡る）"""
+        since = now - self.ttl
+        at = datetime.fromtimestamp(now, tz=timezone.utc)
+        if is_market_open(market, at):
+            return since
+
+        closed = last_close(market, at)
+        if closed is None:
+            return since
+        return min(since, (closed + SETTLEMENT_DELAY).timestamp())
+
+    def is_fresh(self, fetched_at: float, market: str, now: float) -> bool:
+        """キャッシュエントリが有効期限内かチェック（休場中は次の寄り付きまで延長）"""
+        return fetched_at >= self.fresh_since(market, now)
+
+    def load(
+        self, keys: Iterable[Tuple[str, str]], now: Optional[float] = None
+    ) -> Dict[Tuple[str, str], StockPrice]:
+        """有効期限内の株価を(シンボル, 市場)をキーに読み込み"""
+        now = time.time() if now is None else now
+        by_market: Dict[str, List[str]] = {}
+        for symbol, market in dict.fromkeys(keys):
+            by_market.setdefault(market, []).append(symbol)
+        if not by_market:
+            return {}
+
+        rows = []
+        try:
+            with self._connect() as conn:
+                # 有効期限は市場ごとに異なるため、市場単位で期限内の行だけを読む
+                for market, symbols in by_market.items():
+                    since = self.fresh_since(market, now)
+                    for i in range(0, len(symbols), _MAX_VARIABLES):
+                        chunk = symbols[i : i + _MAX_VARIABLES]
+                        placeholders = ", ".join("?" * len(chunk))
+                        rows += conn.execute(
+                            "SELECT symbol, market, name, price, change,"
+                            " change_percent, volume, fetched_at, open_price,"
+                            " previous_close, previous_volume FROM quotes"
+                            f" WHERE market = ? AND symbol IN ({placeholders})"
+                            " AND fetched_at >= ?",
+                            [market, *chunk, since],
+                        ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"永続キャッシュ読み込みエラー: {e}")
+            return {}
+
+        results = {}
+        for row in rows:
+            symbol, market, name, price, change, pct, volume, fetched_at = row[:8]
+            results[(symbol, market)] = StockPrice(
+                symbol=symbol,
+                name=name,
+                price=price,
+                change=change,
+                change_percent=pct,
+                volume=volume,
+                timestamp=datetime.fromtimestamp(fetched_at),
+                market=market,
+                open_price=row[8],
+                previous_close=row[9],
+                previous_volume=row[10],
+            )
+
+        return results
+
+    def save(self, prices: Iterable[StockPrice]):
+        """株価をまとめて保存（1トランザクションで原子的に書き込み）"""
+        rows = [
+            (
+                price.symbol,
+                price.market,
+                price.name,
+                float(price.price),
+                float(price.change),
+                float(price.change_percent),
+                int(price.volume),
+                price.timestamp.timestamp(),
+                price.open_price,
+                price.previous_close,
+                price.previous_volume,
+            )
+            for price in prices
+        ]
+        if not rows:
+            return
+
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO quotes (symbol, market, name, price,"
+                    " change, change_percent, volume, fetched_at, open_price,"
+                    " previous_close, previous_volume)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"永続キャッシュ書き込みエラー: {e}")
@@ -0,0 +1,121 @@
+"""
+株価のメモリキャッシュ - 件数上限付きのLRUと市場ごとの有効期限
+
+有効期限内の株価はそのまま返し（FRESH）、期限切れでもstale_ttl以内なら
+再検証中の値として返せる（STALE、stale-while-revalidate用）。
+上限を超えた場合は最も長く参照されていない銘柄から捨てる。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple
+
+from api.stock_api import StockPrice
+from utils.market_calendar import is_quote_final
+from utils.metrics import REGISTRY
+
+EVICTIONS = REGISTRY.counter(
+    "price_cache_evictions_total", "件数上限により株価キャッシュから捨てた数"
+)
+
+# キャッシュの状態
+FRESH = "fresh"  # 有効期限内（または休場中で終値確定済み）
+STALE = "stale"  # 期限切れだが再検証中の値として返せる
+
+
+@dataclass
+class CacheEntry:
+    """キャッシュした株価と保存時刻"""
+
+    data: StockPrice
+    stored_at: float  # 保存したUNIX時刻
+
+
+class QuoteCache:
+    """件数上限付きLRUの株価キャッシュ（スレッドセーフ）"""
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        ttl: float = 60,
+        market_ttls: Optional[Mapping[str, float]] = None,
+        stale_ttl: float = 600,
+        clock=time.time,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.market_ttls: Dict[str, float] = dict(market_ttls or {})
+        self.stale_ttl = stale_ttl  # 期限切れの株価を返してよい経過秒数の上限
+        self.clock = clock
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, cache_config=None) -> "QuoteCache":
+        """設定（config.cache）からキャッシュを作成（設定がなければ既定値）"""
+        if cache_config is None:
+            return cls()
+        return cls(
+            max_entries=cache_config.max_entries,
+            ttl=cache_config.memory_ttl,
+            market_ttls=cache_config.market_ttls,
+            stale_ttl=cache_config.stale_ttl,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def ttl_for(self, market: str) -> float:
+        """市場ごとの有効期限（秒、指定がなければ共通のttl）"""
+        return self.market_ttls.get(market, self.ttl)
+
+    def age(self, key: str) -> Optional[float]:
+        """保存してからの経過秒数（キャッシュになければNone）"""
+        entry = self._entries.get(key)
+        return self.clock() - entry.stored_at if entry is not None else None
+
+    def lookup(self, key: str) -> Tuple[Optional[StockPrice], Optional[str]]:
+        """株価と状態（FRESH / STALE）を返す（使えない場合は (None, None)）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            self._entries.move_to_end(key)
+
+        stock_price = entry.data
+        age = self.clock() - entry.stored_at
+        if age < self.ttl_for(stock_price.market):
+            return stock_price, FRESH
+
+        # 休場中は終値確定後に取得した株価を次の寄り付きまで使い続ける
+        if is_quote_final(stock_price.market, stock_price.timestamp):
+            return stock_price, FRESH
+        if age < self.stale_ttl:
+            return stock_price, STALE
+        return None, None
+
+    def get(self, key: str) -> Optional[StockPrice]:
+        """有効期限内の株価（なければNone）"""
+        stock_price, state = self.lookup(key)
+        return stock_price if state == FRESH else None
+
+    def put(self, key: str, stock_price: StockPrice):
+        """株価を保存し、上限を超えた分を古い順に捨てる"""
+        evicted = 0
+        with self._lock:
+            self._entries[key] = CacheEntry(stock_price, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            EVICTIONS.inc(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,308 @@
+"""
+株価取得元 - StockPriceAPIが使う株価データの取得方法を切り替える
+
+- yfinance: yfinanceで取得（pandasのDataFrameを経由する）
+- yahoo_chart: Yahoo FinanceのチャートAPIのJSONを直接StockPriceに変換（pandas不要）
+- replay: フィクスチャの株価を再生（テスト・オフライン検証用）
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Sequence
+from urllib.parse import urlsplit
+
+from api.stock_api import StockPrice
+from utils.lazy_import import LazyModule
+
+# yfinance（pandas・NumPyを含む）は株価を取得する時点で読み込む
+yf = LazyModule("yfinance")
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("yfinance", "yahoo_chart", "replay")
+
+
+class RateLimitError(Exception):
+    """取得元のレート制限（リトライ対象）"""
+
+
+def make_stock_price(
+    symbol: str,
+    name: str,
+    market: str,
+    close: float,
+    volume: int,
+    previous_close: Optional[float] = None,
+    previous_volume: Optional[int] = None,
+    open_price: Optional[float] = None,
+) -> StockPrice:
+    """直近2日分の終値・出来高から株価データを作成（前日分がなければ変動なし）"""
+    base = previous_close if previous_close is not None else close
+    change = close - base
+    change_percent = (change / base) * 100 if base > 0 else 0
+
+    return StockPrice(
+        symbol=symbol,
+        name=name,
+        price=close,
+        change=change,
+        change_percent=change_percent,
+        volume=volume,
+        timestamp=datetime.now(),
+        market=market,
+        open_price=open_price,
+        previous_close=previous_close,
+        previous_volume=previous_volume,
+    )
+
+
+class QuoteProvider:
+    """株価取得元のインターフェース
+
+    fetchは1銘柄を取得し、データがない場合はNoneを返す。レート制限は
+    RateLimitError、その他の失敗は例外で通知する（リトライはStockPriceAPIが行う）。
+    supports_batchがTrueの取得元はfetch_manyで複数銘柄をまとめて取得できる。
+    hostは送信先のホスト名で、StockPriceAPIがホストごとのレート制限に使う
+    （空の場合はネットワークに接続しない取得元として制限しない）。
+    """
+
+    name = ""
+    host = ""
+    supports_batch = False
+
+    def fetch(self, symbol: str, name: str, market: str) -> Optional[StockPrice]:
+        raise NotImplementedError
+
+    def fetch_many(self, stock_configs) -> List[StockPrice]:
+        """複数銘柄をまとめて取得（取得できなかった銘柄は結果に含めない）"""
+        return []
+
+
+class YFinanceProvider(QuoteProvider):
+    """yfinanceで株価を取得"""
+
+    name = "yfinance"
+    host = "query2.finance.yahoo.com"
+    supports_batch = True
+
+    def __init__(self, timeout: float = 10.0):
+        # yfinanceは内部で共有のcurl_cffiセッションを使うため、タイムアウトのみ指定
+        self.timeout = timeout
+
+    def fetch(self, symbol: str, name: str, market: str) -> Optional[StockPrice]:
+        try:
+            hist = yf.Ticker(symbol).history(period="2d", timeout=self.timeout)
+        except yf.exceptions.YFRateLimitError as e:
+            # yfinanceは429をHTTPErrorではなく独自の例外で通知する
+            raise RateLimitError(f"レート制限 (yfinance): {symbol}") from e
+        if hist.empty:
+            return None
+        return self._from_history(symbol, name, market, hist)
+
+    def fetch_many(self, stock_configs) -> List[StockPrice]:
+        """1回のyf.download呼び出しで複数銘柄の株価を取得"""
+        symbols = [stock_config.symbol for stock_config in stock_configs]
+
+        try:
+            data = yf.download(
+                symbols,
+                period="2d",
+                group_by="ticker",
+                progress=False,
+                threads=True,
+                timeout=self.timeout,
+            )
+        except yf.exceptions.YFRateLimitError as e:
+            raise RateLimitError(f"レート制限 (yfinance, {len(symbols)}銘柄)") from e
+        except Exception as e:
+            logger.warning(f"一括株価取得エラー ({len(symbols)}銘柄): {e}")
+            return []
+
+        if data is None or data.empty:
+            logger.warning(f"一括株価取得の結果が空です ({len(symbols)}銘柄)")
+            return []
+
+        prices = []
+        tickers = set(data.columns.get_level_values(0))
+        for stock_config in stock_configs:
+            if stock_config.symbol not in tickers:
+                continue
+
+            # 市場ごとに営業日が異なるため、銘柄ごとに欠損行を除外する
+            hist = data[stock_config.symbol].dropna(subset=["Close"])
+            if hist.empty:
+                continue
+
+            prices.append(
+                self._from_history(
+                    stock_config.symbol, stock_config.name, stock_config.market, hist
+                )
+            )
+
+        return prices
+
+    @staticmethod
+    def _from_history(symbol: str, name: str, market: str, hist) -> StockPrice:
+        """履歴データ（DataFrame）から株価データを作成"""
+        latest = hist.iloc[-1]
+        previous = hist.iloc[-2] if len(hist) > 1 else None
+
+        # NumPyのスカラーではなくPythonの数値として保持する
+        return make_stock_price(
+            symbol,
+            name,
+            market,
+            close=float(latest["Close"]),
+            volume=int(latest["Volume"]),
+            previous_close=float(previous["Close"]) if previous is not None else None,
+            previous_volume=int(previous["Volume"]) if previous is not None else None,
+            open_price=float(latest["Open"]) if "Open" in latest else None,
+        )
+
+
+class YahooChartProvider(QuoteProvider):
+    """Yahoo FinanceのチャートAPIから取得（JSONを直接変換し、pandasを使わない）"""
+
+    name = "yahoo_chart"
+    CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+    # 既定のUser-Agentでは拒否されるため、ブラウザ相当の値を送る
+    HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; discord-stock-bot)"}
+
+    def __init__(self, transport, chart_url: str = CHART_URL):
+        self.transport = transport
+        self.chart_url = chart_url  # ローカルのシミュレーターに向ける場合に変更する
+        self.host = urlsplit(chart_url).netloc
+
+    def fetch(self, symbol: str, name: str, market: str) -> Optional[StockPrice]:
+        response = self.transport.get(
+            self.chart_url.format(symbol=symbol),
+            params={"range": "5d", "interval": "1d"},
+            headers=self.HEADERS,
+        )
+        if response.status_code == 429:
+            raise RateLimitError(f"レート制限 (HTTP 429): {symbol}")
+        response.raise_for_status()
+
+        return self.parse_chart(symbol, name, market, response.json())
+
+    @staticmethod
+    def parse_chart(
+        symbol: str, name: str, market: str, payload: Mapping
+    ) -> Optional[StockPrice]:
+        """チャートAPIのレスポンスから直近2日分の日足を取り出して株価データを作成"""
+        results = (payload.get("chart") or {}).get("result") or []
+        if not results:
+            return None
+
+        result = results[0]
+        quotes = (result.get("indicators") or {}).get("quote") or [{}]
+        quote = quotes[0]
+        closes = quote.get("close") or []
+        opens = quote.get("open") or []
+        volumes = quote.get("volume") or []
+
+        # 休場日や取引中の未確定値は終値がnullになるため除外する
+        bars = [
+            (
+                close,
+                opens[i] if i < len(opens) else None,
+                volumes[i] if i < len(volumes) else None,
+            )
+            for i, close in enumerate(closes)
+            if close is not None
+        ]
+        if not bars:
+            return None
+
+        close, open_price, volume = bars[-1]
+        previous = bars[-2] if len(bars) > 1 else None
+        return make_stock_price(
+            symbol,
+            name,
+            market,
+            close=float(close),
+            volume=int(volume or 0),
+            previous_close=float(previous[0]) if previous else None,
+            previous_volume=(
+                int(previous[2]) if previous and previous[2] is not None else None
+            ),
+            open_price=float(open_price) if open_price is not None else None,
+        )
+
+
+class ReplayProvider(QuoteProvider):
+    """フィクスチャの日足を再生する取得元
+
+    フィクスチャは銘柄ごとの日足（古い順）のリスト:
+    ``{"AAPL": [{"close": 100.0, "volume": 1000}, {"close": 105.0, "open": 101.0, "volume": 1100}]}``
+    取得するたびに1日ずつ進み、最後の日足に達した後はその株価を返し続ける。
+    """
+
+    name = "replay"
+    supports_batch = True
+
+    def __init__(self, quotes: Mapping[str, Sequence[Mapping]]):
+        self.quotes = {symbol: list(bars) for symbol, bars in quotes.items()}
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path) -> "ReplayProvider":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def fetch(self, symbol: str, name: str, market: str) -> Optional[StockPrice]:
+        bars = self.quotes.get(symbol)
+        if not bars:
+            return None
+
+        with self._lock:
+            calls = self.calls.get(symbol, 0)
+            self.calls[symbol] = calls + 1
+
+        position = min(calls + 1, len(bars) - 1)
+        latest = bars[position]
+        previous = bars[position - 1] if position > 0 else None
+        return make_stock_price(
+            symbol,
+            name,
+            market,
+            close=float(latest["close"]),
+            volume=int(latest.get("volume", 0)),
+            previous_close=float(previous["close"]) if previous else None,
+            previous_volume=(
+                int(previous.get("volume", 0)) if previous is not None else None
+            ),
+            open_price=(
+                float(latest["open"]) if latest.get("open") is not None else None
+            ),
+        )
+
+    def fetch_many(self, stock_configs) -> List[StockPrice]:
+        prices = []
+        for stock_config in stock_configs:
+            stock_price = self.fetch(
+                stock_config.symbol, stock_config.name, stock_config.market
+            )
+            if stock_price:
+                prices.append(stock_price)
+        return prices
+
+
+def create_provider(config, transport) -> QuoteProvider:
+    """設定（config.fetch.provider）に応じた取得元を作成"""
+    fetch_config = getattr(config, "fetch", None)
+    name = getattr(fetch_config, "provider", "yfinance") or "yfinance"
+
+    if name == "yfinance":
+        return YFinanceProvider(timeout=transport.read_timeout)
+    if name == "yahoo_chart":
+        return YahooChartProvider(transport)
+    if name == "replay":
+        if not fetch_config.fixture_path:
+            raise ValueError("replayにはQUOTE_FIXTURE_PATHの指定が必要です")
+        return ReplayProvider.from_file(fetch_config.fixture_path)
+
+    raise ValueError(f"未対応の株価取得元です: {name} (対応: {', '.join(PROVIDERS)})")
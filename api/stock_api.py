@@ -3,16 +3,56 @@
 """
 
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import partial
 from typing import Dict, List, Optional
 
-import requests
-import yfinance as yf
+from utils.lazy_import import LazyModule
+from utils.metrics import REGISTRY
+
+# requestsは株価を取得する時点で読み込む（yfinanceはapi.quote_providersで読み込む）
+requests = LazyModule("requests")
 
 logger = logging.getLogger(__name__)
 
+FETCH_SECONDS = REGISTRY.histogram(
+    "stock_fetch_seconds", "銘柄ごとの株価取得時間（リトライ込み、秒）"
+)
+FETCH_RESULTS = REGISTRY.counter("stock_fetch_results_total", "銘柄ごとの株価取得結果")
+FETCH_RETRIES = REGISTRY.counter("stock_fetch_retries_total", "株価取得のリトライ回数")
+FETCH_RATE_LIMITED = REGISTRY.counter(
+    "stock_fetch_rate_limited_total", "株価取得でレート制限を受けた回数"
+)
+FETCH_EMPTY = REGISTRY.counter(
+    "stock_fetch_empty_total", "空の株価データを受け取った回数"
+)
+FETCH_ERRORS = REGISTRY.counter("stock_fetch_errors_total", "株価取得のエラー回数")
+BATCH_SECONDS = REGISTRY.histogram(
+    "stock_fetch_batch_seconds", "一括取得1回あたりの時間（秒）"
+)
+BATCH_SYMBOLS = REGISTRY.counter(
+    "stock_fetch_batch_symbols_total", "一括取得の対象銘柄数（取得できたか否か）"
+)
+SNAPSHOT_SECONDS = REGISTRY.histogram(
+    "stock_snapshot_seconds", "全銘柄の株価スナップショットの作成時間（秒）"
+)
+FETCH_SKIPPED = REGISTRY.counter(
+    "stock_fetch_skipped_total", "失敗が続きバックオフ中のため取得しなかった銘柄数"
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "price_cache_lookups_total", "株価キャッシュの参照回数"
+)
+REVALIDATIONS = REGISTRY.counter(
+    "price_cache_revalidations_total", "期限切れの株価をバックグラウンドで更新した結果"
+)
+PERSISTENT_LOADED = REGISTRY.counter(
+    "price_cache_persistent_loaded_total", "永続キャッシュから読み込んだ株価数"
+)
+
 
 @dataclass
 class StockPrice:
@@ -26,36 +66,91 @@ class StockPrice:
     volume: int
     timestamp: datetime
     market: str
+    open_price: Optional[float] = None  # 当日始値
+    previous_close: Optional[float] = None  # 前日終値
+    previous_volume: Optional[int] = None  # 前日出来高
 
 
 class StockPriceAPI:
     """株価データAPI"""
 
-    def __init__(self, config):
+    def __init__(self, config, transport=None, provider=None):
+        from api.quote_cache import QuoteCache
+        from api.quote_providers import create_provider
+        from api.symbol_health import SymbolHealth
+        from utils.http_client import get_shared_transport
+        from utils.rate_limiter import get_rate_limiter
+
         self.config = config
-        self.cache = {}
-        self.cache_timeout = 60  # キャッシュタイムアウト（秒）
+        self.transport = transport or get_shared_transport(config)
+        # 株価の取得元（設定のQUOTE_PROVIDERで選択、テストでは直接渡せる）
+        self.provider = provider or create_provider(config, self.transport)
+        # 取得元ホストへの送信ペース（全スレッド共有、429を受けると自動で減速）
+        self.rate_limiter = get_rate_limiter(config, self.provider.host)
+        # 取得に失敗し続けている銘柄の記録（上場廃止・誤入力の銘柄で毎回待たない）
+        fetch_config = config.fetch
+        self.symbol_health = SymbolHealth(
+            fetch_config.health_path,
+            threshold=fetch_config.failure_threshold,
+            backoff=fetch_config.failure_backoff,
+            max_backoff=fetch_config.failure_backoff_max,
+        )
+        cache_config = getattr(config, "cache", None)
+        # 件数上限付きLRUのメモリキャッシュ（市場ごとの有効期限）
+        self.cache = QuoteCache.from_config(cache_config)
+        self.persistent_cache = None
+        self.history_store = None
+        # 今回新たに取得した株価（バックグラウンド更新からも追加されるためロックで保護）
+        self._fresh_prices: List[StockPrice] = []
+        self._fresh_lock = threading.Lock()
+        self._alert_rules = None  # check_price_alertsで初回に作成
+
+        # stale-while-revalidate（継続実行時のみstart_background_refreshで有効化）
+        self._refresher: Optional[ThreadPoolExecutor] = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+
+        if cache_config and cache_config.path:
+            from api.price_cache import PersistentPriceCache
+
+            self.persistent_cache = PersistentPriceCache(
+                cache_config.path, ttl=cache_config.ttl
+            )
+
+        history_config = getattr(config, "history", None)
+        if history_config and history_config.path:
+            from utils.price_history import PriceHistoryStore
+
+            self.history_store = PriceHistoryStore(history_config.path)
 
     def get_stock_price(
         self, symbol: str, name: str, market: str
     ) -> Optional[StockPrice]:
         """株価データを取得"""
-        try:
-            # キャッシュチェック
-            cache_key = f"{symbol}_{market}"
-            if self._is_cache_valid(cache_key):
-                logger.debug(f"キャッシュから株価データを取得: {symbol}")
-                return self.cache[cache_key]["data"]
+        # キャッシュチェック
+        cached = self._cache_lookup(f"{symbol}_{market}")
+        if cached is not None:
+            logger.debug(f"キャッシュから株価データを取得: {symbol}")
+            return cached
+
+        return self._fetch_and_cache(symbol, name, market)
 
-            # yfinanceで株価取得（リトライ機能付き）
-            stock_price = self._fetch_with_retry(symbol, name, market)
+    def _fetch_and_cache(
+        self, symbol: str, name: str, market: str
+    ) -> Optional[StockPrice]:
+        """取得元から株価を取得してキャッシュに保存（キャッシュは参照しない）"""
+        try:
+            # 取得元から株価取得（リトライ機能付き）
+            provider = self.provider.name
+            with FETCH_SECONDS.time(provider=provider):
+                stock_price = self._fetch_with_retry(symbol, name, market)
+            FETCH_RESULTS.inc(
+                provider=provider, result="ok" if stock_price else "failed"
+            )
 
             if stock_price:
                 # キャッシュに保存
-                self.cache[cache_key] = {
-                    "data": stock_price,
-                    "timestamp": datetime.now(),
-                }
+                self._store_cache(f"{symbol}_{market}", stock_price)
                 logger.debug(f"株価データを取得してキャッシュに保存: {symbol}")
 
             return stock_price
@@ -64,70 +159,345 @@ class StockPriceAPI:
             logger.error(f"株価取得エラー {symbol}: {e}")
             return None
 
+    def get_snapshot(self):
+        """全銘柄の株価を1回だけ取得してスナップショットを作成"""
+        from api.market_snapshot import MarketSnapshot
+
+        stock_configs = list(self.config.stocks)
+        with SNAPSHOT_SECONDS.time():
+            return MarketSnapshot.build(
+                stock_configs, self._fetch_watchlist(stock_configs)
+            )
+
     def get_all_prices(self) -> List[StockPrice]:
         """全銘柄の株価を取得"""
-        prices = []
+        return self.get_snapshot().to_prices()
 
-        for stock_config in self.config.stocks:
-            price = self.get_stock_price(
-                stock_config.symbol, stock_config.name, stock_config.market
+    def check_price_alerts(self) -> List[StockPrice]:
+        """価格アラート対象の銘柄をチェック（設定のアラートルールで判定）"""
+        from api.alert_rules import AlertRuleSet
+
+        # ルールは一度だけ作成し、銘柄リストごとのコンパイル結果を再利用する
+        if self._alert_rules is None:
+            self._alert_rules = AlertRuleSet.from_config(self.config)
+        return self.get_snapshot().alerts(self._alert_rules)
+
+    def _fetch_watchlist(self, stock_configs) -> List[Optional[StockPrice]]:
+        """監視銘柄の株価を銘柄リスト順に取得（取得失敗はNone）"""
+        stock_configs = list(stock_configs)
+
+        # 前回の実行で保存された株価をメモリキャッシュに読み込む
+        if self.persistent_cache:
+            self._load_persistent_cache(stock_configs)
+
+        # 失敗が続いている銘柄はバックオフ期間が明けるまで取得しない
+        # （有効なキャッシュがあればその株価を使う）
+        blocked: Dict[str, Optional[StockPrice]] = {}
+        active = []
+        for stock_config in stock_configs:
+            if self.symbol_health.is_blocked(stock_config.symbol, stock_config.market):
+                blocked[stock_config.symbol] = self._cache_lookup(
+                    f"{stock_config.symbol}_{stock_config.market}"
+                )
+            else:
+                active.append(stock_config)
+        skipped = len(blocked)
+        if skipped:
+            FETCH_SKIPPED.inc(skipped)
+            logger.info(f"失敗が続いている{skipped}銘柄の取得を見送ります")
+
+        # 継続実行中は期限切れの株価をそのまま返し、更新はバックグラウンドで行う
+        stale = self._serve_stale(active) if self._refresher is not None else {}
+        pending = [
+            stock_config for stock_config in active if stock_config.symbol not in stale
+        ]
+
+        # 一括取得できた銘柄はそのまま使い、取得できなかった銘柄のみ個別取得する
+        # （一括取得でキャッシュを参照済みの場合は、個別取得で参照し直さない）
+        batched = self._fetch_batched(pending)
+        remaining = [
+            stock_config
+            for stock_config in pending
+            if stock_config.symbol not in batched
+        ]
+        fetched = dict(
+            zip(
+                (c.symbol for c in remaining),
+                self._fetch_parallel(remaining, use_cache=not self._batching),
+            )
+        )
+
+        prices = [
+            blocked.get(stock_config.symbol)
+            or stale.get(stock_config.symbol)
+            or batched.get(stock_config.symbol)
+            or fetched.get(stock_config.symbol)
+            for stock_config in stock_configs
+        ]
+
+        if self.persistent_cache:
+            self.persistent_cache.save(price for price in prices if price)
+
+        # 今回新たに取得した株価のみ履歴に追記する（キャッシュ由来の重複を避ける）
+        with self._fresh_lock:
+            fresh, self._fresh_prices = self._fresh_prices, []
+        if self.history_store is not None and fresh:
+            try:
+                self.history_store.append(fresh)
+            except Exception as e:
+                logger.error(f"株価履歴の保存エラー: {e}")
+
+        self.symbol_health.save()
+        broken = self.symbol_health.summary()
+        if broken:
+            logger.warning(f"取得停止中の銘柄: {broken}")
+        REGISTRY.set_info("broken_symbols", self.symbol_health.broken())
+        if self.rate_limiter is not None:
+            REGISTRY.set_info(
+                "quote_rate_limit",
+                {
+                    "host": self.rate_limiter.host,
+                    "rate": round(self.rate_limiter.rate, 3),
+                },
             )
-            if price:
-                prices.append(price)
 
         return prices
 
-    def check_price_alerts(self) -> List[StockPrice]:
-        """価格アラート対象の銘柄をチェック"""
-        alerts = []
+    def _load_persistent_cache(self, stock_configs):
+        """永続キャッシュの有効な株価をメモリキャッシュに展開
+
+        メモリキャッシュにない銘柄（起動直後など）のみ読み込む。期限切れの
+        メモリキャッシュを上書きすると保存時刻が新しくなり、メモリの有効期限と
+        stale-while-revalidateを迂回してしまうため。
+        """
+        keys = [
+            (c.symbol, c.market)
+            for c in stock_configs
+            if f"{c.symbol}_{c.market}" not in self.cache
+        ]
+        loaded = self.persistent_cache.load(keys) if keys else {}
+
+        for (symbol, market), stock_price in loaded.items():
+            self.cache.put(f"{symbol}_{market}", stock_price)
+
+        if loaded:
+            PERSISTENT_LOADED.inc(len(loaded))
+            logger.info(f"永続キャッシュから{len(loaded)}銘柄の株価を再利用します")
+
+    def _fetch_parallel(
+        self, stock_configs, use_cache: bool = True
+    ) -> List[Optional[StockPrice]]:
+        """スレッドプールで個別取得を並列実行（入力順に結果を返す）"""
+        if not stock_configs:
+            return []
+
+        fetch_one = partial(self._fetch_one, use_cache=use_cache)
+        max_workers = max(1, min(self.config.fetch.max_workers, len(stock_configs)))
+        if max_workers == 1:
+            return [fetch_one(stock_config) for stock_config in stock_configs]
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="stock-fetch"
+        ) as executor:
+            return list(executor.map(fetch_one, stock_configs))
+
+    def _fetch_one(self, stock_config, use_cache: bool = True) -> Optional[StockPrice]:
+        """1銘柄を取得（例外は銘柄単位で握りつぶす）"""
+        fetch = self.get_stock_price if use_cache else self._fetch_and_cache
+        try:
+            return fetch(stock_config.symbol, stock_config.name, stock_config.market)
+        except Exception as e:
+            logger.error(f"株価取得エラー {stock_config.symbol}: {e}")
+            return None
+
+    def _is_cache_valid(self, cache_key: str) -> bool:
+        """キャッシュの有効性をチェック（休場中は終値確定後の株価を使い続ける）"""
+        return self.cache.get(cache_key) is not None
+
+    def _cache_lookup(self, cache_key: str) -> Optional[StockPrice]:
+        """有効期限内のキャッシュを参照し、ヒット・ミスを記録"""
+        stock_price = self.cache.get(cache_key)
+        CACHE_LOOKUPS.inc(result="hit" if stock_price is not None else "miss")
+        return stock_price
+
+    def _store_cache(self, cache_key: str, stock_price: StockPrice):
+        """株価データをキャッシュに保存（新たに取得した株価として記録）"""
+        self.cache.put(cache_key, stock_price)
+        with self._fresh_lock:
+            self._fresh_prices.append(stock_price)
+
+    def start_background_refresh(self):
+        """期限切れの株価を即座に返し、バックグラウンドで更新する（継続実行用）"""
+        if self._refresher is None:
+            self._refresher = ThreadPoolExecutor(
+                max_workers=max(1, self.config.fetch.max_workers),
+                thread_name_prefix="stock-refresh",
+            )
+
+    def stop_background_refresh(self, wait: bool = True):
+        """バックグラウンド更新を停止（未着手の更新は破棄）"""
+        refresher, self._refresher = self._refresher, None
+        if refresher is not None:
+            refresher.shutdown(wait=wait, cancel_futures=True)
+
+    def _serve_stale(self, stock_configs) -> Dict[str, StockPrice]:
+        """期限切れの株価を返し、その銘柄の更新をバックグラウンドで予約"""
+        from api.quote_cache import STALE
+
+        stale = {}
+        for stock_config in stock_configs:
+            cache_key = f"{stock_config.symbol}_{stock_config.market}"
+            stock_price, state = self.cache.lookup(cache_key)
+            if state != STALE:
+                continue
+
+            CACHE_LOOKUPS.inc(result="stale")
+            stale[stock_config.symbol] = stock_price
+            self._schedule_refresh(cache_key, stock_config)
+
+        if stale:
+            logger.debug(f"期限切れの{len(stale)}銘柄をバックグラウンドで更新します")
+        return stale
 
-        for stock_config in self.config.stocks:
-            price = self.get_stock_price(
+    def _schedule_refresh(self, cache_key: str, stock_config):
+        """銘柄の更新を予約（更新中の銘柄は重複して予約しない）"""
+        refresher = self._refresher
+        with self._refresh_lock:
+            if refresher is None or cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        try:
+            refresher.submit(self._refresh, cache_key, stock_config)
+        except RuntimeError:
+            # 停止処理と競合した場合は次回の取得に任せる
+            with self._refresh_lock:
+                self._refreshing.discard(cache_key)
+
+    def _refresh(self, cache_key: str, stock_config):
+        """期限切れの銘柄を取得し直してキャッシュを更新"""
+        try:
+            stock_price = self._fetch_with_retry(
                 stock_config.symbol, stock_config.name, stock_config.market
             )
+            REVALIDATIONS.inc(result="ok" if stock_price else "failed")
+            if stock_price:
+                self._store_cache(cache_key, stock_price)
+        except Exception as e:
+            REVALIDATIONS.inc(result="failed")
+            logger.error(f"株価の更新エラー {stock_config.symbol}: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(cache_key)
+
+    @property
+    def _batching(self) -> bool:
+        """一括取得を使うか（取得元が対応し、batch_sizeが2以上）"""
+        return self.config.fetch.batch_size > 1 and self.provider.supports_batch
+
+    def _fetch_batched(self, stock_configs) -> Dict[str, StockPrice]:
+        """複数銘柄をまとめて取得（キャッシュ済みの銘柄は除外）"""
+        if not self._batching:
+            return {}
+
+        batch_size = self.config.fetch.batch_size
+
+        results = {}
+        pending = []
+        for stock_config in stock_configs:
+            cached = self._cache_lookup(f"{stock_config.symbol}_{stock_config.market}")
+            if cached is not None:
+                results[stock_config.symbol] = cached
+            else:
+                pending.append(stock_config)
+
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start : start + batch_size]
+            for stock_price in self._fetch_chunk(chunk):
+                self._store_cache(
+                    f"{stock_price.symbol}_{stock_price.market}", stock_price
+                )
+                self.symbol_health.record_success(
+                    stock_price.symbol, stock_price.market
+                )
+                results[stock_price.symbol] = stock_price
 
-            if price and abs(price.change_percent) >= stock_config.threshold:
-                alerts.append(price)
+        return results
 
-        return alerts
+    def _fetch_chunk(self, stock_configs) -> List[StockPrice]:
+        """取得元の一括取得で複数銘柄の株価を取得"""
+        from api.quote_providers import RateLimitError
 
-    def _is_cache_valid(self, cache_key: str) -> bool:
-        """キャッシュの有効性をチェック"""
-        if cache_key not in self.cache:
-            return False
+        provider = self.provider.name
+        self._acquire_rate_limit()
+        try:
+            with BATCH_SECONDS.time(provider=provider):
+                prices = self.provider.fetch_many(stock_configs)
+        except RateLimitError as e:
+            # 減速したレートで個別取得に任せる
+            FETCH_RATE_LIMITED.inc(provider=provider)
+            self._rate_limit_throttled()
+            logger.warning(f"一括株価取得でレート制限を受けました: {e}")
+            prices = []
+        if prices:
+            self._rate_limit_success()
+
+        missing = len(stock_configs) - len(prices)
+        BATCH_SYMBOLS.inc(len(prices), provider=provider, result="fetched")
+        BATCH_SYMBOLS.inc(missing, provider=provider, result="missing")
+        if not prices:
+            return []
+
+        if missing:
+            logger.info(f"一括取得できなかった{missing}銘柄は個別取得します")
+        logger.info(f"一括株価取得成功: {len(prices)}/{len(stock_configs)}銘柄")
+
+        return prices
+
+    def _acquire_rate_limit(self):
+        """取得元ホストのレート制限に従い、送信できるまで待つ"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
 
-        cache_time = self.cache[cache_key]["timestamp"]
-        return (datetime.now() - cache_time).seconds < self.cache_timeout
+    def _rate_limit_success(self):
+        if self.rate_limiter is not None:
+            self.rate_limiter.on_success()
+
+    def _rate_limit_throttled(self):
+        if self.rate_limiter is not None:
+            self.rate_limiter.on_throttle()
 
     def _fetch_with_retry(
-        self, symbol: str, name: str, market: str, max_retries: int = 3
+        self, symbol: str, name: str, market: str, max_retries: Optional[int] = None
     ) -> Optional[StockPrice]:
-        """リトライ機能付きで株価データを取得"""
+        """リトライ機能付きで株価データを取得（結果を銘柄の失敗記録に反映）"""
+        from api.quote_providers import RateLimitError
+        from api.symbol_health import EMPTY, ERROR, HTTP_ERROR
+
+        # 失敗の記録がある銘柄は待機付きのリトライをせず1回だけ試す
+        if max_retries is None:
+            max_retries = self.symbol_health.attempts(symbol, market, 3)
+
+        provider = self.provider.name
+        reason = None
         for attempt in range(max_retries):
             try:
                 # 各試行前に少し待機（レート制限対策）
                 if attempt > 0:
+                    FETCH_RETRIES.inc(provider=provider)
                     wait_time = 2**attempt  # 指数バックオフ
                     logger.info(
                         f"リトライ {attempt + 1}/{max_retries} for {symbol}, {wait_time}秒待機中..."
                     )
                     time.sleep(wait_time)
 
-                # yfinanceで株価取得（セッション設定でUser-Agent追加）
-                ticker = yf.Ticker(symbol)
+                self._acquire_rate_limit()
+                stock_price = self.provider.fetch(symbol, name, market)
+                self._rate_limit_success()
 
-                # セッション設定を改善
-                session = requests.Session()
-                session.headers.update(
-                    {
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                    }
-                )
-                ticker.session = session
-
-                hist = ticker.history(period="2d")
-
-                if hist.empty:
+                if stock_price is None:
+                    FETCH_EMPTY.inc(provider=provider)
+                    reason = EMPTY
                     logger.warning(
                         f"株価データが空です: {symbol} (試行 {attempt + 1}/{max_retries})"
                     )
@@ -135,54 +505,38 @@ class StockPriceAPI:
                         logger.error(
                             f"最終試行でも株価データが取得できませんでした: {symbol}"
                         )
-                        return None
                     continue
 
-                # 最新の株価データ
-                latest = hist.iloc[-1]
-                previous = hist.iloc[-2] if len(hist) > 1 else latest
-
-                current_price = latest["Close"]
-                previous_price = previous["Close"]
-
-                change = current_price - previous_price
-                change_percent = (
-                    (change / previous_price) * 100 if previous_price > 0 else 0
-                )
+                logger.info(f"株価データ取得成功: {symbol} = ${stock_price.price:.2f}")
+                self.symbol_health.record_success(symbol, market)
+                return stock_price
 
-                stock_price = StockPrice(
-                    symbol=symbol,
-                    name=name,
-                    price=current_price,
-                    change=change,
-                    change_percent=change_percent,
-                    volume=int(latest["Volume"]),
-                    timestamp=datetime.now(),
-                    market=market,
+            except RateLimitError as e:
+                FETCH_RATE_LIMITED.inc(provider=provider)
+                self._rate_limit_throttled()
+                reason = None  # レート制限は銘柄の問題ではないため失敗に数えない
+                logger.warning(
+                    f"レート制限エラー {symbol}: {e} (試行 {attempt + 1}/{max_retries})"
                 )
-
-                logger.info(f"株価データ取得成功: {symbol} = ${current_price:.2f}")
-                return stock_price
+                if attempt == max_retries - 1:
+                    logger.error(f"レート制限により株価取得に失敗: {symbol}")
+                continue
 
             except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429:
-                    logger.warning(
-                        f"レート制限エラー {symbol}: {e} (試行 {attempt + 1}/{max_retries})"
-                    )
-                    if attempt == max_retries - 1:
-                        logger.error(f"レート制限により株価取得に失敗: {symbol}")
-                        return None
-                    continue
-                else:
-                    logger.error(f"HTTPエラー {symbol}: {e}")
-                    return None
+                # 429は取得元がRateLimitErrorに変換するため、ここでは429以外のエラー
+                FETCH_ERRORS.inc(provider=provider)
+                reason = HTTP_ERROR
+                logger.error(f"HTTPエラー {symbol}: {e}")
+                break
 
             except Exception as e:
+                FETCH_ERRORS.inc(provider=provider)
+                reason = ERROR
                 logger.error(
                     f"株価取得エラー {symbol}: {e} (試行 {attempt + 1}/{max_retries})"
                 )
-                if attempt == max_retries - 1:
-                    return None
                 continue
 
+        if reason is not None:
+            self.symbol_health.record_failure(symbol, market, reason)
         return None
@@ -0,0 +1,158 @@
+"""
+銘柄ごとの取得失敗の記録 - 失敗が続く銘柄の取得を指数バックオフで止める
+
+上場廃止や誤入力の銘柄は毎回リトライの待機とリクエストを浪費するため、
+連続失敗がしきい値に達した銘柄はサーキットを開き（取得停止中）、
+バックオフ期間中は取得しない（ネガティブキャッシュ）。一時的なエラーで
+正常な銘柄を止めないよう、しきい値未満の失敗では取得を止めない。
+バックオフ明けは1回だけ試し（リトライなし）、成功すれば記録を消す。
+レート制限は銘柄の問題ではないため失敗に数えない（StockPriceAPIが記録しない）。
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.file_utils import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# 失敗の種類
+EMPTY = "empty"  # 株価データが空（上場廃止・誤入力の可能性）
+HTTP_ERROR = "http_error"  # 404などの429以外のHTTPエラー
+ERROR = "error"  # その他の例外
+
+
+@dataclass
+class FailureRecord:
+    """1銘柄の連続失敗の記録"""
+
+    failures: int
+    reason: str
+    last_failure: float  # UNIX時刻
+    retry_at: float  # この時刻まで取得しない（しきい値未満では失敗した時刻）
+
+
+class SymbolHealth:
+    """銘柄ごとの連続失敗とバックオフ（ファイルに永続化可能）"""
+
+    def __init__(
+        self,
+        path: str = "",
+        threshold: int = 3,
+        backoff: float = 300,
+        max_backoff: float = 86400,
+        clock=time.time,
+    ):
+        self.path = Path(path) if path else None
+        self.threshold = threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.records: Dict[str, FailureRecord] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def _key(symbol: str, market: str) -> str:
+        return f"{symbol}_{market}"
+
+    def load(self):
+        """前回の実行で保存した記録を読み込み"""
+        if self.path is None or not self.path.exists():
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.records = {
+                key: FailureRecord(**value)
+                for key, value in data.get("symbols", {}).items()
+            }
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"銘柄の失敗記録の読み込みエラー: {e}")
+            self.records = {}
+
+    def save(self):
+        """変更があればファイルに保存"""
+        if self.path is None or not self._dirty:
+            return
+
+        with self._lock:
+            data = {
+                "symbols": {key: asdict(record) for key, record in self.records.items()}
+            }
+            self._dirty = False
+        try:
+            atomic_write_json(self.path, data)
+        except OSError as e:
+            logger.warning(f"銘柄の失敗記録の保存エラー: {e}")
+
+    def is_blocked(self, symbol: str, market: str) -> bool:
+        """バックオフ期間中で取得を見送るべきか"""
+        record = self.records.get(self._key(symbol, market))
+        return record is not None and self.clock() < record.retry_at
+
+    def attempts(self, symbol: str, market: str, default: int) -> int:
+        """試行回数（サーキットを開いた銘柄はリトライしない）"""
+        record = self.records.get(self._key(symbol, market))
+        if record is not None and record.failures >= self.threshold:
+            return 1
+        return default
+
+    def record_success(self, symbol: str, market: str):
+        key = self._key(symbol, market)
+        if key not in self.records:
+            return
+
+        with self._lock:
+            record = self.records.pop(key, None)
+            self._dirty = True
+        if record is not None and record.failures >= self.threshold:
+            logger.info(f"取得を再開しました: {symbol} ({record.failures}回失敗後)")
+
+    def record_failure(self, symbol: str, market: str, reason: str):
+        """失敗を記録し、しきい値に達していれば次に取得するまでのバックオフを設定"""
+        key = self._key(symbol, market)
+        now = self.clock()
+        with self._lock:
+            previous = self.records.get(key)
+            failures = previous.failures + 1 if previous else 1
+            delay = 0.0
+            if failures >= self.threshold:
+                delay = min(
+                    self.max_backoff, self.backoff * 2 ** (failures - self.threshold)
+                )
+            self.records[key] = FailureRecord(
+                failures=failures, reason=reason, last_failure=now, retry_at=now + delay
+            )
+            self._dirty = True
+
+        if failures == self.threshold:
+            logger.warning(
+                f"{symbol} は{failures}回連続で取得に失敗したため取得を停止します"
+                f" ({reason}, {delay:.0f}秒後に再試行)"
+            )
+
+    def broken(self) -> List[Dict]:
+        """サーキットを開いた（連続失敗がしきい値以上の）銘柄の一覧"""
+        return [
+            {"key": key, **asdict(record)}
+            for key, record in sorted(self.records.items())
+            if record.failures >= self.threshold
+        ]
+
+    def summary(self) -> Optional[str]:
+        """取得停止中の銘柄の要約（なければNone）"""
+        broken = self.broken()
+        if not broken:
+            return None
+        return ", ".join(
+            f"{entry['key']} ({entry['failures']}回, {entry['reason']})"
+            for entry in broken
+        )
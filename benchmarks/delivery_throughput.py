@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+通知配信ベンチマーク - 株価取得からDiscord配信までをローカルで計測
+
+株価はbenchmarks.quote_simulatorの取得元から、通知はDiscord Webhookの
+スタンドイン（benchmarks.webhook_simulator）へ送る。DiscordStockBotの
+_send_regular_update と _check_price_alerts を実際に呼び出し、銘柄数ごとに
+送信メッセージ数・毎秒メッセージ数・送信バイト数・取得開始から配信完了までの時間を出力する。
+
+    python benchmarks/delivery_throughput.py [--sizes 10,100,1000,5000] [--json]
+
+Webhookのバケット（既定は2秒で5件、Discordと同じ）は --reset-after で縮められる。
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import asdict
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.stock_api import StockPriceAPI  # noqa: E402
+from benchmarks.fetch_throughput import make_config  # noqa: E402
+from benchmarks.quote_simulator import (  # noqa: E402
+    FaultProfile,
+    SimulatedQuoteProvider,
+)
+from benchmarks.webhook_simulator import (  # noqa: E402
+    SimulatedWebhookServer,
+    WebhookProfile,
+)
+from bot.discord_bot import DiscordStockBot  # noqa: E402
+from utils.http_client import HTTPTransport  # noqa: E402
+
+SIZES = (10, 100, 1000, 5000)
+
+
+def run(
+    count: int,
+    webhook_profile: WebhookProfile,
+    quote_profile: FaultProfile = FaultProfile(latency_ms=1.0),
+    workers: int = 8,
+) -> Dict:
+    """count銘柄の定期通知と価格アラートを1回ずつ配信し、計測結果を返す"""
+    config = make_config(count, workers)
+    config.notification.mode = "full"
+
+    transport = HTTPTransport(pool_maxsize=workers)
+    try:
+        with SimulatedWebhookServer(webhook_profile) as server:
+            config.notification.webhook_url = server.webhook_url
+            stock_api = StockPriceAPI(
+                config,
+                transport=transport,
+                provider=SimulatedQuoteProvider(quote_profile),
+            )
+            bot = DiscordStockBot(config, stock_api, transport=transport)
+
+            started = time.monotonic()
+            snapshot = stock_api.get_snapshot()
+            fetched = time.monotonic()
+
+            bot._send_regular_update(snapshot)
+            regular_messages = server.stats.delivered
+            bot._check_price_alerts(snapshot)
+            finished = time.monotonic()
+
+            stats = server.stats
+    finally:
+        transport.close()
+
+    messages = stats.messages
+    delivery = finished - fetched
+    return {
+        "symbols": count,
+        "prices": len(snapshot.prices),
+        "alerts": sum(message.embeds for message in messages[regular_messages:]),
+        "messages": stats.delivered,
+        "regular_messages": regular_messages,
+        "alert_messages": stats.delivered - regular_messages,
+        "bytes": stats.bytes_delivered,
+        "requests": stats.requests,
+        "rate_limited": stats.rate_limited,
+        "rejected": stats.rejected,
+        "failed": bot.delivery.stats.failed,
+        "fetch_s": round(fetched - started, 3),
+        "delivery_s": round(delivery, 3),
+        "messages_per_s": round(stats.delivered / delivery, 2) if delivery else 0.0,
+        # 取得開始から最初・最後のメッセージを受け付けるまでの時間
+        "first_delivery_s": (
+            round(messages[0].received_at - started, 3) if messages else None
+        ),
+        "fetch_to_delivery_s": (
+            round(messages[-1].received_at - started, 3) if messages else None
+        ),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="株価通知の配信性能を計測")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in SIZES),
+        help="計測する銘柄数（カンマ区切り）",
+    )
+    parser.add_argument("--workers", type=int, default=8, help="株価の並列取得数")
+    parser.add_argument("--limit", type=int, default=5, help="バケットあたりの送信数")
+    parser.add_argument(
+        "--reset-after", type=float, default=2.0, help="バケットが回復するまでの秒数"
+    )
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    profile = WebhookProfile(
+        limit=args.limit,
+        reset_after=args.reset_after,
+        rate_limit_rate=args.rate_limit_rate,
+        latency_ms=args.latency_ms,
+    )
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = [run(size, profile, workers=args.workers) for size in sizes]
+
+    if args.json:
+        print(
+            json.dumps(
+                {"profile": asdict(profile), "results": results},
+                ensure_ascii=False,
+                indent=2,
+            )
+        )
+    else:
+        print(
+            f"{'symbols':>8}{'messages':>10}{'msg/s':>8}{'bytes':>10}{'429':>6}"
+            f"{'rejected':>10}{'fetch':>9}{'delivery':>10}{'fetch→last':>12}"
+        )
+        for r in results:
+            print(
+                f"{r['symbols']:>8}{r['messages']:>10}{r['messages_per_s']:>8.2f}"
+                f"{r['bytes']:>10}{r['rate_limited']:>6}{r['rejected']:>10}"
+                f"{r['fetch_s']:>8.2f}s{r['delivery_s']:>9.2f}s"
+                f"{r['fetch_to_delivery_s'] or 0:>11.2f}s"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+株価取得ベンチマーク - 障害を注入したシミュレーターに対してget_all_pricesを計測
+
+実際のStockPriceAPI（並列取得・リトライ・バックオフ）を使い、銘柄数ごとに
+スループット、銘柄単位の取得時間（p50/p99、リトライ込み）、リトライ回数を出力する。
+ネットワークには接続しないため、取得経路の性能変化をオフラインで比較できる。
+
+    python benchmarks/fetch_throughput.py [--sizes 10,100,1000,5000] [--mode provider|http] [--json]
+
+--mode http ではチャートAPI互換のローカルサーバーとYahooChartProviderを使い、
+HTTPTransportの接続プールを含めて計測する。リトライ時のバックオフは
+--backoff-scale 倍に縮めて待機する（既定では1/100）。
+--rate-limit を指定すると送信前にAIMDのレート制限（utils.rate_limiter）を通し、
+--max-rps で上限を設けたシミュレーターに対する429の削減を確認できる。
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import time
+from contextlib import ExitStack
+from dataclasses import asdict
+from types import SimpleNamespace
+from typing import Dict, List, Sequence
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.quote_providers import YahooChartProvider  # noqa: E402
+from api.stock_api import StockPriceAPI  # noqa: E402
+from benchmarks.quote_simulator import (  # noqa: E402
+    EMPTY,
+    ERROR,
+    RATE_LIMITED,
+    FaultProfile,
+    SimulatedQuoteProvider,
+    SimulatedQuoteServer,
+)
+from utils.config import Config, StockConfig  # noqa: E402
+from utils.http_client import HTTPTransport  # noqa: E402
+from utils.rate_limiter import AdaptiveRateLimiter  # noqa: E402
+
+SIZES = (10, 100, 1000, 5000)
+MARKETS = ("us", "jp", "crypto")
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """最近傍順位法によるパーセンタイル"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def make_config(count: int, workers: int) -> Config:
+    """シミュレーター用の銘柄を監視する設定"""
+    config = Config()
+    config.stocks = [
+        StockConfig(symbol=f"SIM{i:05d}", name=f"Sim {i}", market=MARKETS[i % 3])
+        for i in range(count)
+    ]
+    # 銘柄単位の取得経路を計測するため一括取得・永続キャッシュ・履歴は無効にする
+    config.fetch.batch_size = 1
+    config.fetch.max_workers = workers
+    config.cache.path = ""
+    config.history.path = ""
+    # 送信ペースはrunのrate_limitで指定する（ホスト共有のレート制限は使わない）
+    config.fetch.rate_limit = 0
+    return config
+
+
+def run(
+    count: int,
+    profile: FaultProfile,
+    mode: str = "provider",
+    workers: int = 8,
+    backoff_scale: float = 0.01,
+    rate_limit: float = 0.0,
+    rate_burst: int = 5,
+) -> Dict:
+    """count銘柄をシミュレーターから1回取得し、計測結果を返す"""
+    config = make_config(count, workers)
+    latencies: List[float] = []
+    backoff: List[float] = []
+
+    def scaled_sleep(seconds):
+        backoff.append(seconds)
+        time.sleep(seconds * backoff_scale)
+
+    with ExitStack() as stack:
+        transport = HTTPTransport(pool_maxsize=workers)
+        stack.callback(transport.close)
+        if mode == "http":
+            simulator = stack.enter_context(SimulatedQuoteServer(profile))
+            provider = YahooChartProvider(transport, simulator.chart_url)
+        else:
+            simulator = provider = SimulatedQuoteProvider(profile)
+
+        api = StockPriceAPI(config, transport=transport, provider=provider)
+        if rate_limit > 0:
+            api.rate_limiter = AdaptiveRateLimiter(
+                rate_limit, burst=rate_burst, host="simulator"
+            )
+        fetch = api._fetch_with_retry
+
+        def timed_fetch(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fetch(*args, **kwargs)
+            finally:
+                latencies.append(time.perf_counter() - started)
+
+        api._fetch_with_retry = timed_fetch
+        stack.enter_context(
+            patch("api.stock_api.time", SimpleNamespace(sleep=scaled_sleep))
+        )
+
+        started = time.perf_counter()
+        prices = api.get_all_prices()
+        elapsed = time.perf_counter() - started
+
+    stats = simulator.stats
+    return {
+        "symbols": count,
+        "mode": mode,
+        "workers": workers,
+        "elapsed_s": round(elapsed, 3),
+        "throughput": round(count / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "requests": stats.requests,
+        "retries": stats.retries,
+        "rate_limited": stats.outcomes.get(RATE_LIMITED, 0),
+        "errors": stats.outcomes.get(ERROR, 0),
+        "empty": stats.outcomes.get(EMPTY, 0),
+        "failed": count - len(prices),
+        "backoff_s": round(sum(backoff), 1),
+        "reused_connections": transport.stats.reused_connections,
+        # 終了時点の送信レート（レート制限なしの場合はNone）
+        "final_rate": round(api.rate_limiter.rate, 1) if api.rate_limiter else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="株価取得のスループットを計測")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in SIZES),
+        help="計測する銘柄数（カンマ区切り）",
+    )
+    parser.add_argument("--mode", choices=("provider", "http"), default="provider")
+    parser.add_argument("--workers", type=int, default=8, help="並列取得数")
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--slow-rate", type=float, default=0.001)
+    parser.add_argument("--slow-ms", type=float, default=500.0)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.02)
+    parser.add_argument("--max-rps", type=float, default=0.0)
+    parser.add_argument("--empty-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--backoff-scale", type=float, default=0.01, help="バックオフの待機時間の倍率"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0.0,
+        help="送信レートの上限（毎秒、0でレート制限なし）",
+    )
+    parser.add_argument("--rate-burst", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args(argv)
+
+    # 注入した障害による警告ログで出力が埋もれないようにする
+    logging.basicConfig(level=logging.CRITICAL)
+
+    profile = FaultProfile(
+        latency_ms=args.latency_ms,
+        jitter=args.jitter,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        max_rps=args.max_rps,
+        empty_rate=args.empty_rate,
+        seed=args.seed,
+    )
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = [
+        run(
+            size,
+            profile,
+            args.mode,
+            args.workers,
+            args.backoff_scale,
+            args.rate_limit,
+            args.rate_burst,
+        )
+        for size in sizes
+    ]
+
+    if args.json:
+        print(
+            json.dumps(
+                {"profile": asdict(profile), "results": results},
+                ensure_ascii=False,
+                indent=2,
+            )
+        )
+    else:
+        print(
+            f"{'symbols':>8}{'elapsed':>10}{'sym/s':>9}{'p50':>9}{'p99':>9}"
+            f"{'requests':>10}{'retries':>9}{'429':>6}{'5xx':>6}{'empty':>7}"
+            f"{'failed':>8}{'rate':>8}"
+        )
+        for r in results:
+            print(
+                f"{r['symbols']:>8}{r['elapsed_s']:>9.2f}s{r['throughput']:>9.1f}"
+                f"{r['p50_ms']:>7.1f}ms{r['p99_ms']:>7.1f}ms{r['requests']:>10}"
+                f"{r['retries']:>9}{r['rate_limited']:>6}{r['errors']:>6}"
+                f"{r['empty']:>7}{r['failed']:>8}{r['final_rate'] or '-':>8}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+ローカルHTTPサーバー - シミュレーター用のスレッド型サーバーの共通部分
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class JSONHandler(BaseHTTPRequestHandler):
+    """JSONで応答するリクエストハンドラー（self.server.simulatorで状態を参照）"""
+
+    protocol_version = "HTTP/1.1"  # keep-aliveで接続を再利用させる
+    disable_nagle_algorithm = True  # ヘッダーと本文の分割送信で遅延しないようにする
+
+    @property
+    def simulator(self):
+        return self.server.simulator
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def send_json(
+        self,
+        status: int,
+        payload: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """JSON（payloadがNoneなら本文なし）で応答"""
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalServer:
+    """127.0.0.1の空きポートで起動するサーバー（withで起動・停止）"""
+
+    handler_class = JSONHandler
+    thread_name = "local-server"
+
+    def __init__(self):
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler_class)
+        self._server.daemon_threads = True
+        self._server.simulator = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name=self.thread_name, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,223 @@
+"""
+株価取得のシミュレーター - 遅延・エラー・レート制限・空データを注入する
+
+同じ障害設定（FaultProfile）を2通りの形で使える:
+
+- SimulatedQuoteProvider: プロセス内のQuoteProvider（StockPriceAPIに直接渡す）
+- SimulatedQuoteServer: チャートAPI互換のローカルHTTPサーバー
+  （YahooChartProviderのchart_urlを向けて、HTTPTransportを含めて計測する）
+"""
+
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List
+from urllib.parse import unquote, urlparse
+
+from api.quote_providers import QuoteProvider, RateLimitError, make_stock_price
+from benchmarks.local_server import JSONHandler, LocalServer
+
+# StockPriceAPIのバックオフをテスト・ベンチマークで差し替えても影響を受けないよう保持する
+_sleep = time.sleep
+
+OK = "ok"
+ERROR = "error"
+RATE_LIMITED = "rate_limited"
+EMPTY = "empty"
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    """注入する障害の設定"""
+
+    latency_ms: float = 10.0  # 応答時間の中央値
+    jitter: float = 0.5  # 応答時間のばらつき（対数正規分布のσ）
+    slow_rate: float = 0.0  # 極端に遅い応答の割合
+    slow_ms: float = 1000.0  # 遅い応答に加算する時間
+    error_rate: float = 0.0  # エラー（HTTP 500）の割合
+    rate_limit_rate: float = 0.0  # ランダムに429を返す割合
+    max_rps: float = 0.0  # 1秒あたりの許容リクエスト数（超過分は429、0で無制限）
+    empty_rate: float = 0.0  # 空の履歴を返す割合
+    seed: int = 0
+
+
+@dataclass
+class SimulatorStats:
+    """シミュレーターが返した応答の集計"""
+
+    requests: int = 0
+    outcomes: Dict[str, int] = field(default_factory=dict)
+    calls: Dict[str, int] = field(default_factory=dict)  # 銘柄ごとの要求回数
+
+    @property
+    def retries(self) -> int:
+        """同じ銘柄への2回目以降の要求数"""
+        return sum(count - 1 for count in self.calls.values())
+
+
+class FaultInjector:
+    """要求ごとに応答の種類と遅延を決める（スレッドセーフ・シード固定）"""
+
+    def __init__(self, profile: FaultProfile):
+        self.profile = profile
+        self.stats = SimulatorStats()
+        self._random = random.Random(profile.seed)
+        self._lock = threading.Lock()
+        self._tokens = profile.max_rps
+        self._refilled = time.monotonic()
+
+    def decide(self, symbol: str):
+        """(応答の種類, 遅延秒) を返す"""
+        profile = self.profile
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.calls[symbol] = self.stats.calls.get(symbol, 0) + 1
+
+            delay = profile.latency_ms * self._random.lognormvariate(0, profile.jitter)
+            if self._random.random() < profile.slow_rate:
+                delay += profile.slow_ms
+
+            if not self._take_token():
+                outcome = RATE_LIMITED
+            else:
+                roll = self._random.random()
+                if roll < profile.rate_limit_rate:
+                    outcome = RATE_LIMITED
+                elif roll < profile.rate_limit_rate + profile.error_rate:
+                    outcome = ERROR
+                elif (
+                    roll
+                    < profile.rate_limit_rate + profile.error_rate + profile.empty_rate
+                ):
+                    outcome = EMPTY
+                else:
+                    outcome = OK
+
+            self.stats.outcomes[outcome] = self.stats.outcomes.get(outcome, 0) + 1
+
+        return outcome, delay / 1000
+
+    def _take_token(self) -> bool:
+        if self.profile.max_rps <= 0:
+            return True
+
+        now = time.monotonic()
+        self._tokens = min(
+            self.profile.max_rps,
+            self._tokens + (now - self._refilled) * self.profile.max_rps,
+        )
+        self._refilled = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+def simulated_bars(symbol: str) -> List[Dict]:
+    """銘柄ごとに決まった直近2日分の日足"""
+    seed = zlib.crc32(symbol.encode())
+    previous = 50.0 + seed % 950
+    change = ((seed >> 10) % 2001 - 1000) / 10000  # -10%〜+10%
+    return [
+        {"open": previous, "close": previous, "volume": 1000 + seed % 9000},
+        {
+            "open": round(previous * (1 + change / 2), 2),
+            "close": round(previous * (1 + change), 2),
+            "volume": 1000 + (seed >> 5) % 9000,
+        },
+    ]
+
+
+def chart_payload(symbol: str, empty: bool = False) -> Dict:
+    """チャートAPI互換のレスポンス"""
+    bars = simulated_bars(symbol)
+    quote = {
+        key: [None if empty else bar[key] for bar in bars]
+        for key in ("open", "close", "volume")
+    }
+    return {
+        "chart": {
+            "result": [
+                {
+                    "meta": {"symbol": symbol},
+                    "timestamp": [1760400000, 1760486400],
+                    "indicators": {"quote": [quote]},
+                }
+            ],
+            "error": None,
+        }
+    }
+
+
+class SimulatedQuoteProvider(QuoteProvider):
+    """障害を注入するプロセス内の取得元"""
+
+    name = "simulated"
+
+    def __init__(self, profile: FaultProfile = FaultProfile()):
+        self.injector = FaultInjector(profile)
+
+    @property
+    def stats(self) -> SimulatorStats:
+        return self.injector.stats
+
+    def fetch(self, symbol: str, name: str, market: str):
+        outcome, delay = self.injector.decide(symbol)
+        _sleep(delay)
+
+        if outcome == RATE_LIMITED:
+            raise RateLimitError(f"simulated 429: {symbol}")
+        if outcome == ERROR:
+            raise RuntimeError(f"simulated error: {symbol}")
+        if outcome == EMPTY:
+            return None
+
+        previous, latest = simulated_bars(symbol)
+        return make_stock_price(
+            symbol,
+            name,
+            market,
+            close=latest["close"],
+            volume=latest["volume"],
+            previous_close=previous["close"],
+            previous_volume=previous["volume"],
+            open_price=latest["open"],
+        )
+
+
+class _ChartHandler(JSONHandler):
+    """/v8/finance/chart/{symbol} に障害を注入して応答する"""
+
+    def do_GET(self):
+        symbol = unquote(urlparse(self.path).path.rsplit("/", 1)[-1])
+        outcome, delay = self.simulator.injector.decide(symbol)
+        _sleep(delay)
+
+        if outcome == RATE_LIMITED:
+            self.send_json(429, {"error": "Too Many Requests"})
+        elif outcome == ERROR:
+            self.send_json(500, {"error": "Internal Server Error"})
+        else:
+            self.send_json(200, chart_payload(symbol, empty=outcome == EMPTY))
+
+
+class SimulatedQuoteServer(LocalServer):
+    """チャートAPI互換のローカルHTTPサーバー（withで起動・停止）"""
+
+    handler_class = _ChartHandler
+    thread_name = "quote-simulator"
+
+    def __init__(self, profile: FaultProfile = FaultProfile()):
+        super().__init__()
+        self.injector = FaultInjector(profile)
+
+    @property
+    def stats(self) -> SimulatorStats:
+        return self.injector.stats
+
+    @property
+    def chart_url(self) -> str:
+        """YahooChartProviderに渡すURLテンプレート"""
+        return f"{self.base_url}/v8/finance/chart/{{symbol}}"
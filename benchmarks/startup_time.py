@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+起動時間ベンチマーク - 各エントリーポイントのコールドスタート時のインポート時間を計測
+
+新しいPythonプロセスで各エントリーポイントを読み込み、所要時間（中央値）と
+読み込まれた重い依存パッケージを確認する。時間の上限を超えた場合や、
+読み込むべきでないパッケージが読み込まれた場合は終了コード1を返す。
+
+    python benchmarks/startup_time.py [--runs 5] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 重い依存パッケージ
+HEAVY_MODULES = ("yfinance", "pandas", "numpy", "requests", "aiohttp")
+
+
+@dataclass(frozen=True)
+class EntryPath:
+    """計測するエントリーポイント"""
+
+    name: str
+    code: str  # 計測するPythonコード
+    budget_ms: float  # 所要時間の上限（CIの遅いランナーを考慮して余裕を持たせる）
+    forbidden: Tuple[str, ...]  # 読み込まれてはいけないパッケージ
+
+
+ENTRY_PATHS = (
+    EntryPath("main", "import main", 250, HEAVY_MODULES),
+    EntryPath("process_commands", "import process_commands", 250, HEAVY_MODULES),
+    EntryPath(
+        "config_validate",
+        "from utils.config import Config; Config().validate()",
+        150,
+        HEAVY_MODULES,
+    ),
+    EntryPath("stock_api", "import api.stock_api", 250, HEAVY_MODULES),
+    EntryPath(
+        "discord_bot", "import bot.discord_bot", 400, ("yfinance", "pandas", "numpy")
+    ),
+)
+
+_PROBE = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "modules": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(entry: EntryPath, runs: int = 5) -> Dict:
+    """新しいプロセスでエントリーポイントを読み込み、所要時間の中央値を返す"""
+    timings: List[float] = []
+    modules = set()
+
+    # ログファイルやデータファイルを作成するエントリーがあるため一時ディレクトリで実行
+    with tempfile.TemporaryDirectory() as cwd:
+        for _ in range(runs):
+            probe = _PROBE.format(root=ROOT, code=entry.code, heavy=HEAVY_MODULES)
+            result = subprocess.run(
+                [sys.executable, "-c", probe],
+                cwd=cwd,
+                capture_output=True,
+                text=True,
+                check=True,
+                env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+            )
+            data = json.loads(result.stdout.strip().splitlines()[-1])
+            timings.append(data["ms"])
+            modules.update(data["modules"])
+
+    loaded = sorted(module for module in modules if module in entry.forbidden)
+    median = statistics.median(timings)
+    return {
+        "name": entry.name,
+        "median_ms": round(median, 1),
+        "budget_ms": entry.budget_ms,
+        "heavy_modules": sorted(modules),
+        "ok": median <= entry.budget_ms and not loaded,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="エントリーポイントの起動時間を計測")
+    parser.add_argument("--runs", type=int, default=5, help="計測回数")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args()
+
+    results = [measure(entry, args.runs) for entry in ENTRY_PATHS]
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(f"{'entry':<20}{'median':>10}{'budget':>10}  heavy modules")
+        for result in results:
+            mark = "" if result["ok"] else "  <-- NG"
+            print(
+                f"{result['name']:<20}{result['median_ms']:>8.1f}ms"
+                f"{result['budget_ms']:>8.0f}ms  "
+                f"{', '.join(result['heavy_modules']) or '-'}{mark}"
+            )
+
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Discord Webhookのスタンドイン - Discordと同じ形式の応答をローカルで返す
+
+- 受け付けたメッセージには204（本文なし）
+- レート制限ヘッダ（X-RateLimit-Limit / Remaining / Reset-After / Bucket）
+- バケットを使い切った場合やランダムな共有制限では429（retry_after付きJSON）
+- 埋め込みの上限超過は400（code 50035）、本文サイズの上限超過は413
+"""
+
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from benchmarks.local_server import JSONHandler, LocalServer
+
+# Discordの埋め込みの上限（bot.embed_packerとは独立に検証する）
+MAX_EMBEDS = 10
+MAX_FIELDS = 25
+MAX_FIELD_VALUE = 1024
+MAX_EMBED_TOTAL = 6000
+
+
+@dataclass(frozen=True)
+class WebhookProfile:
+    """スタンドインの応答設定"""
+
+    limit: int = 5  # バケットあたりの送信数
+    reset_after: float = 2.0  # バケットが回復するまでの秒数
+    rate_limit_rate: float = 0.0  # バケットと無関係に429を返す割合（共有制限の再現）
+    latency_ms: float = 0.0  # 応答までの遅延
+    max_body_bytes: int = 8 * 1024 * 1024  # これを超える本文は413
+    seed: int = 0
+
+
+@dataclass
+class ReceivedMessage:
+    """受け付けたメッセージ"""
+
+    received_at: float  # time.monotonic()
+    size: int  # 本文のバイト数
+    embeds: int
+
+
+@dataclass
+class WebhookStats:
+    """スタンドインの受信統計"""
+
+    requests: int = 0
+    rate_limited: int = 0
+    rejected: int = 0
+    bytes_received: int = 0
+    messages: List[ReceivedMessage] = field(default_factory=list)
+
+    @property
+    def delivered(self) -> int:
+        return len(self.messages)
+
+    @property
+    def bytes_delivered(self) -> int:
+        return sum(message.size for message in self.messages)
+
+
+def validate_payload(payload) -> Optional[str]:
+    """Discordが拒否するペイロードならエラー内容を返す"""
+    if not isinstance(payload, dict):
+        return "payload must be an object"
+
+    embeds = payload.get("embeds") or []
+    if not embeds and not payload.get("content"):
+        return "Cannot send an empty message"
+    if len(embeds) > MAX_EMBEDS:
+        return f"embeds: Must be {MAX_EMBEDS} or fewer in length."
+
+    total = 0
+    for embed in embeds:
+        fields = embed.get("fields") or []
+        if len(fields) > MAX_FIELDS:
+            return f"embeds.fields: Must be {MAX_FIELDS} or fewer in length."
+        for embed_field in fields:
+            if len(embed_field.get("value", "")) > MAX_FIELD_VALUE:
+                return f"embeds.fields.value: Must be {MAX_FIELD_VALUE} or fewer."
+            total += len(embed_field.get("name", "")) + len(embed_field["value"])
+        total += len(embed.get("title", "")) + len(embed.get("description", ""))
+        total += len((embed.get("footer") or {}).get("text", ""))
+    if total > MAX_EMBED_TOTAL:
+        return f"embeds: Embed size exceeds maximum size of {MAX_EMBED_TOTAL}"
+
+    return None
+
+
+class _WebhookHandler(JSONHandler):
+    def do_POST(self):
+        self.simulator.handle(self)
+
+
+class SimulatedWebhookServer(LocalServer):
+    """Discord Webhookのスタンドイン（withで起動・停止）"""
+
+    handler_class = _WebhookHandler
+    thread_name = "webhook-simulator"
+    BUCKET = "simulated-webhook"
+
+    def __init__(self, profile: WebhookProfile = WebhookProfile()):
+        super().__init__()
+        self.profile = profile
+        self.stats = WebhookStats()
+        self._random = random.Random(profile.seed)
+        self._lock = threading.Lock()
+        self._remaining = profile.limit
+        self._reset_at = 0.0
+
+    @property
+    def webhook_url(self) -> str:
+        return f"{self.base_url}/api/webhooks/0/simulated"
+
+    def handle(self, handler: JSONHandler):
+        body = handler.read_body()
+        profile = self.profile
+        if profile.latency_ms:
+            time.sleep(profile.latency_ms / 1000)
+
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.bytes_received += len(body)
+            now = time.monotonic()
+            if now >= self._reset_at:
+                self._remaining = profile.limit
+                self._reset_at = now + profile.reset_after
+            reset_after = max(0.0, self._reset_at - now)
+
+            shared_limit = self._random.random() < profile.rate_limit_rate
+            if self._remaining <= 0 or shared_limit:
+                self.stats.rate_limited += 1
+                retry_after = reset_after if not shared_limit else 0.05
+                status, payload = 429, {
+                    "message": "You are being rate limited.",
+                    "retry_after": round(retry_after, 3),
+                    "global": False,
+                }
+            else:
+                self._remaining -= 1
+                status, payload = self._accept(body, now)
+
+            headers = {
+                "X-RateLimit-Limit": str(profile.limit),
+                "X-RateLimit-Remaining": str(max(0, self._remaining)),
+                "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+                "X-RateLimit-Bucket": self.BUCKET,
+            }
+            if status == 429:
+                headers["Retry-After"] = str(payload["retry_after"])
+
+        handler.send_json(status, payload, headers)
+
+    def _accept(self, body: bytes, now: float):
+        """レート制限を通過した要求の検証（ロック内で呼び出す）"""
+        if len(body) > self.profile.max_body_bytes:
+            self.stats.rejected += 1
+            return 413, {"message": "Request entity too large", "code": 40005}
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        error = validate_payload(payload)
+        if error:
+            self.stats.rejected += 1
+            return 400, {
+                "message": "Invalid Form Body",
+                "code": 50035,
+                "errors": error,
+            }
+
+        self.stats.messages.append(
+            ReceivedMessage(
+                received_at=now, size=len(body), embeds=len(payload.get("embeds", []))
+            )
+        )
+        return 204, None
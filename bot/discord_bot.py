@@ -3,139 +3,338 @@ Discord通知ボット
 """
 
 import asyncio
-import json
 import logging
-import threading
-import time
 from datetime import datetime
-from typing import List
-
-import requests
-import schedule
+from typing import TYPE_CHECKING, List, Sequence, Tuple
 
 from api.stock_api import StockPrice
+from bot.embed_packer import pack_embeds, split_embed, split_field_lines
+from bot.published_state import PublishedState
+from bot.webhook_queue import Delivery, WebhookDeliveryQueue
+from utils.metrics import REGISTRY, write_metrics
+
+if TYPE_CHECKING:
+    from api.alert_rules import AlertHit
 
 logger = logging.getLogger(__name__)
 
+TICK_SECONDS = REGISTRY.histogram(
+    "scheduler_tick_seconds", "ジョブ1回（tick）あたりの処理時間（秒）"
+)
+
 
 class DiscordStockBot:
     """Discord株価通知ボット"""
 
-    def __init__(self, config, stock_api):
+    # 価格アラートのチェック間隔（秒）。株価スナップショットもこの間隔で1回だけ取得する
+    ALERT_CHECK_INTERVAL = 30
+    # 同じ銘柄のアラートを再送しない期間（秒）
+    ALERT_COOLDOWN = 1800
+
+    def __init__(self, config, stock_api, transport=None):
+        # NumPy・requestsは通知処理を行う場合のみ必要なため、ここで読み込む
+        from api.alert_rules import AlertRuleSet, CooldownTracker
+        from utils.http_client import get_shared_transport
+
         self.config = config
         self.stock_api = stock_api
-        self.last_alert_time = {}
+        self.transport = transport or get_shared_transport(config)
+        self.delivery = WebhookDeliveryQueue(
+            config.notification.webhook_url, self.transport
+        )
+        self.alert_rules = AlertRuleSet.from_config(config)
+        self.last_alert_time = CooldownTracker(self.ALERT_COOLDOWN)
         self.running = False
 
+        # 差分通知モードでは前回送信した株価を記録する
+        self.published_state = None
+        if config.notification.mode == "delta":
+            self.published_state = PublishedState(config.notification.state_path)
+
+        # asyncioランタイムの状態
+        self._loop = None
+        self._tasks = []
+        self._http = None
+        self._snapshot = None
+        self._snapshot_lock = None
+
     def run(self):
-        """ボットを実行（従来の継続実行版）"""
+        """ボットを実行（継続実行版）"""
         if not self.config.validate():
             logger.error("設定が無効です")
             return
 
-        self.running = True
-
-        # 定期通知のスケジュール設定
-        schedule.every(self.config.notification.interval).seconds.do(
-            self._send_regular_update
-        )
-
-        # 価格アラートのスケジュール設定（より頻繁にチェック）
-        schedule.every(30).seconds.do(self._check_price_alerts)
+        try:
+            asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            logger.info("ボットを停止しました")
+        finally:
+            write_metrics(self.config)
 
-        # 初回実行
-        self._send_regular_update()
+    async def run_async(self):
+        """asyncioランタイムでボットを実行（定期通知と価格アラートを並行実行）"""
+        import aiohttp
 
-        # メインループ
-        while self.running:
-            schedule.run_pending()
-            time.sleep(1)
+        self.running = True
+        self._loop = asyncio.get_running_loop()
+        self._snapshot_lock = asyncio.Lock()
+        # 期限切れの株価は取得を待たずに返し、バックグラウンドで更新する
+        if self.config.cache.stale_while_revalidate:
+            self.stock_api.start_background_refresh()
+
+        http_config = self.config.http
+        timeout = aiohttp.ClientTimeout(
+            connect=http_config.connect_timeout, sock_read=http_config.read_timeout
+        )
+        connector = aiohttp.TCPConnector(limit_per_host=http_config.pool_maxsize)
+
+        async with aiohttp.ClientSession(
+            timeout=timeout, connector=connector
+        ) as session:
+            self._http = session
+            self._tasks = [
+                asyncio.create_task(
+                    self._every(
+                        self.config.notification.interval,
+                        self._send_regular_update_async,
+                    ),
+                    name="regular-update",
+                ),
+                asyncio.create_task(
+                    self._every(
+                        self.ALERT_CHECK_INTERVAL, self._check_price_alerts_async
+                    ),
+                    name="price-alert",
+                ),
+            ]
+
+            try:
+                await asyncio.gather(*self._tasks)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                for task in self._tasks:
+                    task.cancel()
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+                self._tasks = []
+                self._http = None
+                self.running = False
+                if self.config.cache.stale_while_revalidate:
+                    self.stock_api.stop_background_refresh(wait=False)
+
+        logger.info("ボットを停止しました")
 
     def stop(self):
-        """ボットを停止"""
+        """ボットを停止（実行中のジョブもキャンセル、別スレッドからも呼び出し可）"""
         self.running = False
 
-    def _send_regular_update(self):
-        """定期的な株価更新を送信"""
-        try:
-            logger.info("定期株価更新を開始")
-            prices = self.stock_api.get_all_prices()
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            for task in list(self._tasks):
+                loop.call_soon_threadsafe(task.cancel)
 
-            if not prices:
-                logger.warning("株価データが取得できませんでした")
-                return
+    async def _every(self, interval: float, job):
+        """ジョブを一定間隔で実行（初回は即時）"""
+        loop = asyncio.get_running_loop()
+        while self.running:
+            started = loop.time()
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f"ジョブ実行エラー: {e}")
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+    async def _get_tick_snapshot(self):
+        """現在のtickの株価スナップショットを取得（同じtick内では再取得しない）"""
+        async with self._snapshot_lock:
+            snapshot = self._snapshot
+            if (
+                snapshot is None
+                or (datetime.now() - snapshot.created_at).total_seconds()
+                >= self.ALERT_CHECK_INTERVAL
+            ):
+                # yfinanceはブロッキングなのでワーカースレッドで取得する
+                snapshot = await asyncio.to_thread(self.stock_api.get_snapshot)
+                self._snapshot = snapshot
+            return snapshot
+
+    async def _send_regular_update_async(self):
+        """定期的な株価更新を送信（asyncio版）"""
+        with TICK_SECONDS.time(job="regular_update"):
+            logger.info("定期株価更新を開始")
+            snapshot = await self._get_tick_snapshot()
+
+            prices, unchanged = self._select_regular_prices(snapshot)
+            if prices:
+                embed = self._build_regular_embed(prices, unchanged)
+                if await self._send_discord_embeds_async(split_embed(embed)):
+                    self._record_published(prices)
+
+    async def _check_price_alerts_async(self):
+        """価格アラートをチェック（asyncio版）"""
+        with TICK_SECONDS.time(job="price_alert"):
+            snapshot = await self._get_tick_snapshot()
+
+            hits = self._pending_alerts(snapshot)
+            if hits:
+                embeds = self._alert_embeds(hits)
+                self._record_alerts(hits, await self._deliver_embeds_async(embeds))
+
+    async def _send_discord_message_async(self, embed):
+        """Discord Webhookでメッセージを送信（asyncio版）"""
+        await self._send_discord_embeds_async([embed])
+
+    async def _send_discord_embeds_async(self, embeds: List[dict]) -> bool:
+        """複数の埋め込みをまとめて送信（asyncio版）"""
+        return all(await self._deliver_embeds_async(embeds))
+
+    async def _deliver_embeds_async(self, embeds: List[dict]) -> List[bool]:
+        """複数の埋め込みをまとめて送信し、埋め込みごとの送信結果を返す（asyncio版）"""
+        deliveries = [self.delivery.enqueue(p) for p in pack_embeds(embeds)]
+        await self.delivery.flush_async(self._http)
+        return _embed_results(deliveries)
+
+    def _send_regular_update(self, snapshot=None):
+        """定期的な株価更新を送信"""
+        with TICK_SECONDS.time(job="regular_update"):
+            try:
+                logger.info("定期株価更新を開始")
+                if snapshot is None:
+                    snapshot = self.stock_api.get_snapshot()
+
+                prices, unchanged = self._select_regular_prices(snapshot)
+                if prices:
+                    embed = self._build_regular_embed(prices, unchanged)
+                    # Discord Webhookで送信（上限を超える場合は分割）
+                    if self._send_discord_embeds(split_embed(embed)):
+                        self._record_published(prices)
+
+            except Exception as e:
+                logger.error(f"定期更新エラー: {e}")
+
+    def _check_price_alerts(self, snapshot=None):
+        """価格アラートをチェック"""
+        with TICK_SECONDS.time(job="price_alert"):
+            try:
+                if snapshot is None:
+                    snapshot = self.stock_api.get_snapshot()
 
-            # 市場別にグループ化
-            jp_stocks = [p for p in prices if p.market == "jp"]
-            us_stocks = [p for p in prices if p.market == "us"]
-            crypto_stocks = [p for p in prices if p.market == "crypto"]
+                hits = self._pending_alerts(snapshot)
 
-            # Discord埋め込みメッセージを作成
-            embed = self._create_regular_embed(jp_stocks, us_stocks, crypto_stocks)
+                # 同時に発生したアラートは1リクエスト最大10件にまとめて送信
+                if hits:
+                    embeds = self._alert_embeds(hits)
+                    self._record_alerts(hits, self._deliver_embeds(embeds))
 
-            # Discord Webhookで送信
-            self._send_discord_message(embed)
+            except Exception as e:
+                logger.error(f"価格アラートチェックエラー: {e}")
 
-        except Exception as e:
-            logger.error(f"定期更新エラー: {e}")
+    def _select_regular_prices(self, snapshot) -> Tuple[List[StockPrice], int]:
+        """定期通知に載せる銘柄と、差分通知で省略した銘柄数を返す"""
+        if not snapshot.prices:
+            logger.warning("株価データが取得できませんでした")
+            return [], 0
 
-    def _check_price_alerts(self):
-        """価格アラートをチェック"""
-        try:
-            alerts = self.stock_api.check_price_alerts()
+        if self.published_state is None:
+            return list(snapshot.prices), 0
 
-            for alert in alerts:
-                # 同じ銘柄のアラートが短時間で重複しないようにチェック
-                if self._should_send_alert(alert):
-                    self._send_price_alert(alert)
-                    self.last_alert_time[alert.symbol] = datetime.now()
+        prices, unchanged = self.published_state.diff(
+            snapshot.prices, self.config.notification.delta_epsilon
+        )
+        if not prices:
+            logger.info("前回通知から変化した銘柄がないため定期通知を省略します")
+        return prices, unchanged
+
+    def _build_regular_embed(
+        self, prices: List[StockPrice], unchanged: int = 0
+    ) -> dict:
+        """株価リストから定期更新用の埋め込みメッセージを作成"""
+        # 市場別にグループ化
+        jp_stocks = [p for p in prices if p.market == "jp"]
+        us_stocks = [p for p in prices if p.market == "us"]
+        crypto_stocks = [p for p in prices if p.market == "crypto"]
+
+        # Discord埋め込みメッセージを作成
+        embed = self._create_regular_embed(jp_stocks, us_stocks, crypto_stocks)
+        if unchanged:
+            embed["footer"] = {"text": f"変化なし: {unchanged}銘柄"}
+        return embed
 
-        except Exception as e:
-            logger.error(f"価格アラートチェックエラー: {e}")
+    def _record_published(self, prices: List[StockPrice]):
+        """差分通知モードで送信済みの株価を記録"""
+        if self.published_state is not None:
+            self.published_state.record(prices)
+            self.published_state.save()
+
+    def _pending_alerts(self, snapshot) -> List["AlertHit"]:
+        """送信すべき価格アラートを抽出"""
+        hits = snapshot.alert_hits(self.alert_rules)
+
+        # 同じ銘柄のアラートが短時間で重複しないよう、クールダウン中の銘柄を除外
+        ready = self.last_alert_time.ready_mask([hit.price.symbol for hit in hits])
+        return [hit for hit, ok in zip(hits, ready) if ok]
+
+    def _alert_embeds(self, hits: Sequence["AlertHit"]) -> List[dict]:
+        """アラートの埋め込みメッセージを作成"""
+        embeds = []
+        for hit in hits:
+            logger.info(f"価格アラート送信: {hit.price.symbol}")
+            embeds.append(self._create_alert_embed(hit.price, hit.reasons))
+        return embeds
+
+    def _record_alerts(self, hits: Sequence["AlertHit"], delivered: Sequence[bool]):
+        """送信できたアラートのみ送信時刻を記録（失敗した銘柄は次回のチェックで再送）"""
+        self.last_alert_time.record(
+            hit.price.symbol for hit, ok in zip(hits, delivered) if ok
+        )
 
     def _should_send_alert(self, alert: StockPrice) -> bool:
         """アラートを送信すべきかチェック"""
-        if alert.symbol not in self.last_alert_time:
-            return True
-
         # 30分以内の同じ銘柄のアラートは送信しない
-        time_diff = datetime.now() - self.last_alert_time[alert.symbol]
-        return time_diff.seconds > 1800  # 30分
+        return bool(self.last_alert_time.ready_mask([alert.symbol])[0])
 
     def _send_price_alert(self, alert: StockPrice):
         """価格アラートを送信"""
         try:
             logger.info(f"価格アラート送信: {alert.symbol}")
-
-            # 変動の方向を判定
-            direction = "急上昇" if alert.change_percent > 0 else "急落"
-            color = 0x00FF00 if alert.change_percent > 0 else 0xFF0000
-
-            embed = {
-                "title": f"🚨 {direction}アラート",
-                "description": f"**{alert.name} ({alert.symbol})**",
-                "color": color,
-                "fields": [
-                    {
-                        "name": "現在価格",
-                        "value": self._format_price(alert.price, alert.market),
-                        "inline": True,
-                    },
-                    {"name": "変動額", "value": f"{alert.change:+.2f}", "inline": True},
-                    {
-                        "name": "変動率",
-                        "value": f"{alert.change_percent:+.2f}%",
-                        "inline": True,
-                    },
-                ],
-                "timestamp": alert.timestamp.isoformat(),
-            }
-
-            self._send_discord_message(embed)
+            self._send_discord_message(self._create_alert_embed(alert))
 
         except Exception as e:
             logger.error(f"価格アラート送信エラー: {e}")
 
+    def _create_alert_embed(
+        self, alert: StockPrice, reasons: Sequence[str] = ()
+    ) -> dict:
+        """価格アラート用の埋め込みメッセージを作成"""
+        # 変動の方向を判定
+        direction = "急上昇" if alert.change_percent > 0 else "急落"
+        color = 0x00FF00 if alert.change_percent > 0 else 0xFF0000
+
+        embed = {
+            "title": f"🚨 {direction}アラート",
+            "description": f"**{alert.name} ({alert.symbol})**",
+            "color": color,
+            "fields": [
+                {
+                    "name": "現在価格",
+                    "value": self._format_price(alert.price, alert.market),
+                    "inline": True,
+                },
+                {"name": "変動額", "value": f"{alert.change:+.2f}", "inline": True},
+                {
+                    "name": "変動率",
+                    "value": f"{alert.change_percent:+.2f}%",
+                    "inline": True,
+                },
+            ],
+            "timestamp": alert.timestamp.isoformat(),
+        }
+        if reasons:
+            embed["fields"].append(
+                {"name": "条件", "value": "\n".join(reasons), "inline": False}
+            )
+        return embed
+
     def _create_regular_embed(
         self,
         jp_stocks: List[StockPrice],
@@ -151,39 +350,26 @@ class DiscordStockBot:
             "timestamp": datetime.now().isoformat(),
         }
 
-        # 日本株
-        if jp_stocks:
-            jp_text = self._format_stock_list(jp_stocks)
-            embed["fields"].append(
-                {
-                    "name": "🇯🇵 日本株・日本株インデックス",
-                    "value": jp_text,
-                    "inline": False,
-                }
-            )
-
-        # 米国株
-        if us_stocks:
-            us_text = self._format_stock_list(us_stocks)
-            embed["fields"].append(
-                {
-                    "name": "🇺🇸 米国株・米国株インデックス",
-                    "value": us_text,
-                    "inline": False,
-                }
-            )
-
-        # 暗号通貨
-        if crypto_stocks:
-            crypto_text = self._format_stock_list(crypto_stocks)
-            embed["fields"].append(
-                {"name": "₿ 暗号通貨", "value": crypto_text, "inline": False}
-            )
+        # 銘柄数が多い場合はフィールドの文字数上限に合わせて分割する
+        sections = [
+            ("🇯🇵 日本株・日本株インデックス", jp_stocks),
+            ("🇺🇸 米国株・米国株インデックス", us_stocks),
+            ("₿ 暗号通貨", crypto_stocks),
+        ]
+        for name, stocks in sections:
+            if stocks:
+                embed["fields"].extend(
+                    split_field_lines(name, self._format_stock_lines(stocks))
+                )
 
         return embed
 
     def _format_stock_list(self, stocks: List[StockPrice]) -> str:
         """株価リストをフォーマット"""
+        return "\n".join(self._format_stock_lines(stocks))
+
+    def _format_stock_lines(self, stocks: List[StockPrice]) -> List[str]:
+        """株価リストを1銘柄1行でフォーマット"""
         lines = []
         for stock in stocks:
             change_icon = (
@@ -195,7 +381,7 @@ class DiscordStockBot:
             lines.append(
                 f"{change_icon} **{stock.name}**: {price_str} ({stock.change_percent:+.2f}%)"
             )
-        return "\n".join(lines)
+        return lines
 
     def _format_price(self, price: float, market: str) -> str:
         """価格をフォーマット"""
@@ -210,19 +396,29 @@ class DiscordStockBot:
 
     def _send_discord_message(self, embed):
         """Discord Webhookでメッセージを送信"""
-        try:
-            webhook_url = self.config.notification.webhook_url
+        self._send_discord_embeds([embed])
 
-            payload = {"embeds": [embed]}
-
-            response = requests.post(
-                webhook_url, json=payload, headers={"Content-Type": "application/json"}
-            )
+    def _send_discord_embeds(self, embeds: List[dict]) -> bool:
+        """複数の埋め込みをDiscordの上限内でまとめて送信"""
+        return all(self._deliver_embeds(embeds))
 
-            if response.status_code == 204:
-                logger.info("Discord通知送信成功")
-            else:
-                logger.error(f"Discord通知送信失敗: {response.status_code}")
+    def _deliver_embeds(self, embeds: List[dict]) -> List[bool]:
+        """複数の埋め込みをまとめて送信し、埋め込みごとの送信結果を返す"""
+        try:
+            # 同時に送信した他のジョブが送る場合もあるため、自分のメッセージの結果で判定
+            deliveries = [self.delivery.enqueue(p) for p in pack_embeds(embeds)]
+            self.delivery.flush()
+            return _embed_results(deliveries)
 
         except Exception as e:
             logger.error(f"Discord通知送信エラー: {e}")
+            return [False] * len(embeds)
+
+
+def _embed_results(deliveries: Sequence[Delivery]) -> List[bool]:
+    """ペイロードごとの送信結果を、詰めた埋め込みごとの結果に展開"""
+    return [
+        bool(delivery.delivered)
+        for delivery in deliveries
+        for _ in delivery.payload["embeds"]
+    ]
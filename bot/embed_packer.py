@@ -0,0 +1,124 @@
+"""
+Discord埋め込みメッセージの分割・詰め込み - Discordの上限内で送信回数を最小化
+"""
+
+from typing import Dict, Iterable, List
+
+# Discordの上限
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_FIELDS_PER_EMBED = 25
+MAX_TITLE_LENGTH = 256
+MAX_DESCRIPTION_LENGTH = 4096
+MAX_FIELD_NAME_LENGTH = 256
+MAX_FIELD_VALUE_LENGTH = 1024
+MAX_FOOTER_LENGTH = 2048
+MAX_MESSAGE_LENGTH = 6000  # 1メッセージ内の全埋め込みの合計文字数
+
+CONTINUED_SUFFIX = "（続き）"
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def embed_length(embed: Dict) -> int:
+    """Discordの文字数上限の対象となる文字数を数える"""
+    length = len(embed.get("title", "")) + len(embed.get("description", ""))
+    for field in embed.get("fields", []):
+        length += len(field.get("name", "")) + len(field.get("value", ""))
+    length += len(embed.get("footer", {}).get("text", ""))
+    length += len(embed.get("author", {}).get("name", ""))
+    return length
+
+
+def split_field_lines(
+    name: str, lines: Iterable[str], inline: bool = False
+) -> List[Dict]:
+    """行のリストを1フィールドの上限に収まるよう複数フィールドに分割"""
+    fields = []
+    current: List[str] = []
+    current_length = 0
+
+    def flush():
+        field_name = name if not fields else name + CONTINUED_SUFFIX
+        fields.append(
+            {
+                "name": _truncate(field_name, MAX_FIELD_NAME_LENGTH),
+                "value": "\n".join(current),
+                "inline": inline,
+            }
+        )
+
+    for line in lines:
+        line = _truncate(line, MAX_FIELD_VALUE_LENGTH)
+        added = len(line) + (1 if current else 0)
+        if current and current_length + added > MAX_FIELD_VALUE_LENGTH:
+            flush()
+            current, current_length = [], 0
+            added = len(line)
+        current.append(line)
+        current_length += added
+
+    if current:
+        flush()
+
+    return fields
+
+
+def split_embed(embed: Dict) -> List[Dict]:
+    """フィールド数・文字数の上限を超える埋め込みを複数に分割"""
+    base = {key: value for key, value in embed.items() if key != "fields"}
+    if "title" in base:
+        base["title"] = _truncate(base["title"], MAX_TITLE_LENGTH)
+    if "description" in base:
+        base["description"] = _truncate(base["description"], MAX_DESCRIPTION_LENGTH)
+
+    fields = embed.get("fields", [])
+    if not fields:
+        return [base]
+
+    # 2つ目以降の埋め込みには説明文を付けない
+    continuation = {key: value for key, value in base.items() if key != "description"}
+
+    embeds = []
+    current = dict(base, fields=[])
+    for field in fields:
+        over_fields = len(current["fields"]) >= MAX_FIELDS_PER_EMBED
+        over_length = (
+            embed_length(current) + len(field["name"]) + len(field["value"])
+            > MAX_MESSAGE_LENGTH
+        )
+        if current["fields"] and (over_fields or over_length):
+            embeds.append(current)
+            current = dict(continuation, fields=[])
+        current["fields"].append(field)
+
+    embeds.append(current)
+
+    # フッター（変化なしの件数など）は最後の埋め込みにだけ付ける
+    for part in embeds[:-1]:
+        part.pop("footer", None)
+    return embeds
+
+
+def pack_embeds(embeds: Iterable[Dict]) -> List[Dict]:
+    """埋め込みを上限内でできるだけ少ないWebhookペイロードに詰める"""
+    payloads = []
+    current: List[Dict] = []
+    current_length = 0
+
+    for embed in embeds:
+        length = embed_length(embed)
+        if current and (
+            len(current) >= MAX_EMBEDS_PER_MESSAGE
+            or current_length + length > MAX_MESSAGE_LENGTH
+        ):
+            payloads.append({"embeds": current})
+            current, current_length = [], 0
+        current.append(embed)
+        current_length += length
+
+    if current:
+        payloads.append({"embeds": current})
+
+    return payloads
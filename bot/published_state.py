@@ -0,0 +1,97 @@
+"""
+前回通知した株価の記録 - 差分通知モードで変化した銘柄のみを送信
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from api.stock_api import StockPrice
+from utils.file_utils import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+
+class PublishedState:
+    """銘柄ごとに前回通知した価格と変動率を保持（ファイルに永続化可能）"""
+
+    def __init__(self, path: str = ""):
+        self.path = Path(path) if path else None
+        self.values: Dict[str, Tuple[float, float]] = {}
+        self.load()
+
+    @staticmethod
+    def _key(price: StockPrice) -> str:
+        return f"{price.symbol}_{price.market}"
+
+    def load(self):
+        """前回の実行で保存した状態を読み込み"""
+        if self.path is None or not self.path.exists():
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.values = {
+                key: (float(value["price"]), float(value["change_percent"]))
+                for key, value in data.get("published", {}).items()
+            }
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"通知済み状態の読み込みエラー: {e}")
+            self.values = {}
+
+    def save(self):
+        """状態をファイルに保存"""
+        if self.path is None:
+            return
+
+        data = {
+            "published": {
+                key: {"price": price, "change_percent": change_percent}
+                for key, (price, change_percent) in self.values.items()
+            }
+        }
+        try:
+            atomic_write_json(self.path, data)
+        except OSError as e:
+            logger.warning(f"通知済み状態の保存エラー: {e}")
+
+    def diff(
+        self, prices: Iterable[StockPrice], epsilon: float
+    ) -> Tuple[List[StockPrice], int]:
+        """前回通知から変化した銘柄と、変化していない銘柄数を返す
+
+        価格の変化率（%）または変動率の差（%ポイント）がepsilonを超えた銘柄を変化ありとする。
+        """
+        changed = []
+        unchanged = 0
+
+        for price in prices:
+            previous = self.values.get(self._key(price))
+            if previous is None:
+                changed.append(price)
+                continue
+
+            last_price, last_change_percent = previous
+            price_moved = (
+                abs(price.price - last_price) / abs(last_price) * 100 > epsilon
+                if last_price
+                else price.price != last_price
+            )
+            change_moved = abs(price.change_percent - last_change_percent) > epsilon
+
+            if price_moved or change_moved:
+                changed.append(price)
+            else:
+                unchanged += 1
+
+        return changed, unchanged
+
+    def record(self, prices: Iterable[StockPrice]):
+        """通知した株価を記録"""
+        for price in prices:
+            self.values[self._key(price)] = (
+                float(price.price),
+                float(price.change_percent),
+            )
@@ -0,0 +1,281 @@
+"""
+Discord Webhook配信キュー - レート制限ヘッダに従って送信を調整
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "webhook_request_seconds", "Webhookへの1リクエストの応答時間（秒）"
+)
+RESPONSES = REGISTRY.counter(
+    "webhook_responses_total", "Webhookの応答ステータス（errorは通信エラー）"
+)
+DELIVERY_SECONDS = REGISTRY.histogram(
+    "webhook_delivery_seconds", "キュー追加から送信完了までの時間（秒）"
+)
+
+# asyncio版の送信で、他の送信が終わるのを待つ間隔（秒）
+_LOCK_POLL_SECONDS = 0.05
+
+
+def _header_float(headers, name: str) -> Optional[float]:
+    value = headers.get(name) if headers is not None else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class WebhookRateLimiter:
+    """Webhookのレート制限バケットの状態"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+
+    def delay(self) -> float:
+        """次の送信まで待つべき秒数"""
+        now = self.clock()
+        wait = max(0.0, self.blocked_until - now)
+        if self.remaining is not None and self.remaining <= 0:
+            wait = max(wait, self.reset_at - now)
+        return wait
+
+    def reserve(self):
+        """送信前にバケットを1つ消費したものとして扱う（応答前の連続送信を防ぐ）"""
+        if self.remaining is not None:
+            self.remaining -= 1
+
+    def update(self, status: int, headers, body=None) -> Optional[float]:
+        """応答のレート制限情報を反映し、429の場合は再送までの秒数を返す"""
+        now = self.clock()
+
+        remaining = _header_float(headers, "X-RateLimit-Remaining")
+        reset_after = _header_float(headers, "X-RateLimit-Reset-After")
+        if remaining is not None:
+            self.remaining = int(remaining)
+        if reset_after is not None:
+            self.reset_at = now + reset_after
+
+        if status != 429:
+            return None
+
+        retry_after = None
+        if isinstance(body, dict):
+            retry_after = body.get("retry_after")
+        if retry_after is None:
+            retry_after = _header_float(headers, "Retry-After")
+        if retry_after is None:
+            retry_after = reset_after if reset_after is not None else 1.0
+
+        retry_after = float(retry_after)
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+        return retry_after
+
+
+@dataclass
+class DeliveryStats:
+    """配信統計"""
+
+    delivered: int = 0
+    failed: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    max_depth: int = 0
+    total_latency: float = 0.0  # 送信できたメッセージの遅延の合計（秒）
+    max_latency: float = 0.0
+
+    def record_latency(self, latency: float):
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    @property
+    def average_latency(self) -> float:
+        return self.total_latency / self.delivered if self.delivered else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "max_depth": self.max_depth,
+            "average_latency": round(self.average_latency, 3),
+            "max_latency": round(self.max_latency, 3),
+        }
+
+
+@dataclass
+class Delivery:
+    """キューに追加したメッセージ（enqueueが返すハンドル、送信結果を保持）"""
+
+    payload: dict
+    enqueued_at: float
+    attempts: int = 0
+    delivered: Optional[bool] = None  # 送信待ちはNone、送信できればTrue、失敗はFalse
+
+
+class WebhookDeliveryQueue:
+    """Webhookへの送信キュー（レート制限に合わせて順番に送信）"""
+
+    def __init__(self, webhook_url: str, transport, max_retries: int = 5):
+        self.webhook_url = webhook_url
+        self.transport = transport
+        self.max_retries = max_retries
+        self.limiter = WebhookRateLimiter()
+        self.stats = DeliveryStats()
+        self._queue: Deque[Delivery] = deque()
+        # 同期版・asyncio版のどちらの送信も同じロックで1つずつ行う
+        self._lock = threading.Lock()
+
+    @property
+    def depth(self) -> int:
+        """キューに残っているメッセージ数"""
+        return len(self._queue)
+
+    def enqueue(self, payload: dict) -> Delivery:
+        """メッセージをキューに追加し、送信結果を確認するハンドルを返す
+
+        他の呼び出し元のflushが送信する場合もあるため、送信できたかは
+        flushの戻り値ではなくハンドルのdeliveredで判定する。
+        """
+        delivery = Delivery(payload=payload, enqueued_at=time.monotonic())
+        self._queue.append(delivery)
+        self.stats.max_depth = max(self.stats.max_depth, len(self._queue))
+        return delivery
+
+    def send(self, payload: dict) -> bool:
+        """メッセージを追加して送信完了まで待つ"""
+        delivery = self.enqueue(payload)
+        self.flush()
+        return bool(delivery.delivered)
+
+    def flush(self) -> int:
+        """キューを空になるまで送信し、送信できた件数を返す"""
+        delivered = 0
+        with self._lock:
+            while self._queue:
+                entry = self._queue[0]
+                wait = self.limiter.delay()
+                if wait > 0:
+                    logger.info(f"Discordレート制限のため{wait:.2f}秒待機します")
+                    time.sleep(wait)
+
+                self.limiter.reserve()
+                started = time.perf_counter()
+                try:
+                    response = self.transport.post(self.webhook_url, json=entry.payload)
+                    status, headers = response.status_code, response.headers
+                    body = self._parse_body(status, response.text)
+                except Exception as e:
+                    logger.error(f"Discord通知送信エラー: {e}")
+                    status, headers, body = None, None, None
+                REQUEST_SECONDS.observe(time.perf_counter() - started)
+
+                delivered += self._handle_result(entry, status, headers, body)
+
+        self._log_stats()
+        return delivered
+
+    async def flush_async(self, session) -> int:
+        """キューを空になるまで送信（asyncio版、aiohttpのセッションを使用）"""
+        # イベントループを止めないよう、ロックが空くまで待機を譲りながら取得する
+        while not self._lock.acquire(blocking=False):
+            await asyncio.sleep(_LOCK_POLL_SECONDS)
+
+        delivered = 0
+        try:
+            while self._queue:
+                entry = self._queue[0]
+                wait = self.limiter.delay()
+                if wait > 0:
+                    logger.info(f"Discordレート制限のため{wait:.2f}秒待機します")
+                    await asyncio.sleep(wait)
+
+                self.limiter.reserve()
+                started = time.perf_counter()
+                try:
+                    async with session.post(
+                        self.webhook_url, json=entry.payload
+                    ) as response:
+                        status, headers = response.status, response.headers
+                        body = self._parse_body(status, await response.text())
+                except Exception as e:
+                    logger.error(f"Discord通知送信エラー: {e}")
+                    status, headers, body = None, None, None
+                REQUEST_SECONDS.observe(time.perf_counter() - started)
+
+                delivered += self._handle_result(entry, status, headers, body)
+        finally:
+            self._lock.release()
+
+        self._log_stats()
+        return delivered
+
+    @staticmethod
+    def _parse_body(status: int, text: str):
+        if status != 429 or not text:
+            return None
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
+
+    def _handle_result(self, entry: Delivery, status, headers, body) -> int:
+        """送信結果を反映（キュー先頭の取り出し・再送判定）し、送信できた件数を返す"""
+        entry.attempts += 1
+        RESPONSES.inc(status=status if status is not None else "error")
+        retry_after = self.limiter.update(status, headers, body) if status else None
+
+        if status is not None and 200 <= status < 300:
+            self._queue.popleft()
+            entry.delivered = True
+            latency = time.monotonic() - entry.enqueued_at
+            self.stats.delivered += 1
+            self.stats.record_latency(latency)
+            DELIVERY_SECONDS.observe(latency)
+            logger.info("Discord通知送信成功")
+            return 1
+
+        if status == 429:
+            self.stats.rate_limited += 1
+            logger.warning(
+                f"Discordレート制限 (429): {retry_after:.2f}秒後に再送します"
+            )
+
+        retryable = status is None or status == 429 or status >= 500
+        if retryable and entry.attempts < self.max_retries:
+            self.stats.retries += 1
+            if status != 429:
+                # 429以外の一時的な失敗は試行回数に応じて待つ
+                self.limiter.blocked_until = max(
+                    self.limiter.blocked_until, time.monotonic() + entry.attempts
+                )
+            return 0
+
+        self._queue.popleft()
+        entry.delivered = False
+        self.stats.failed += 1
+        logger.error(f"Discord通知送信失敗: {status}")
+        return 0
+
+    def _log_stats(self):
+        stats = self.stats
+        logger.info(
+            f"Discord配信キュー: 送信{stats.delivered}件, 失敗{stats.failed}件, "
+            f"429 {stats.rate_limited}回, 平均遅延{stats.average_latency:.2f}秒, "
+            f"残り{self.depth}件"
+        )
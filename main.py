@@ -10,8 +10,6 @@ import sys
 
 from dotenv import load_dotenv
 
-from api.stock_api import StockPriceAPI
-from bot.discord_bot import DiscordStockBot
 from utils.config import Config
 
 # 環境変数を読み込み
@@ -29,6 +27,12 @@ logger = logging.getLogger(__name__)
 
 def main():
     """メイン関数 - GitHub Actions用単発実行"""
+    # 株価取得・通知の依存パッケージ（yfinance・pandas・NumPy・requests）は実行時に読み込む
+    from api.stock_api import StockPriceAPI
+    from bot.discord_bot import DiscordStockBot
+    from utils.metrics import write_metrics
+
+    config = None
     try:
         # 設定を読み込み
         config = Config()
@@ -48,6 +52,11 @@ def main():
         logger.error(f"アプリケーション実行中にエラーが発生しました: {e}")
         sys.exit(1)
 
+    finally:
+        # 処理時間・回数の集計を書き出す（METRICS_SUMMARY_PATH / METRICS_PROMETHEUS_PATH）
+        if config is not None:
+            write_metrics(config)
+
 
 if __name__ == "__main__":
     main()
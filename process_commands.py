@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Command Processor - 溜まった株式管理コマンドを1プロセスでまとめて処理
+
+GitHub Actionsでは --pending-file で通知とIssueのクローズを保留し、
+stocks.jsonのpushが成功した後に --finalize で実行する。
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from contextlib import ExitStack
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from utils.command_queue import (
+    GitHubIssueQueue,
+    build_result_embed,
+    clear_queue_file,
+    commands_from_issue,
+    group_results,
+    issue_comment,
+    read_queue_file,
+    send_result_notification,
+)
+from utils.discord_commands import DiscordCommandParser
+from utils.file_utils import atomic_write_json, file_lock
+from utils.stock_manager import StockManager
+
+logger = logging.getLogger(__name__)
+
+# 監視リストを変更するコマンド
+MUTATING_ACTIONS = {"add", "remove", "clear"}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="株式管理コマンドをまとめて処理")
+    parser.add_argument(
+        "--issues",
+        action="store_true",
+        help="discord-commandラベルの付いたオープンなIssueを処理",
+    )
+    parser.add_argument(
+        "--queue-file", help="コマンドのキューファイル（JSONまたはJSONL）"
+    )
+    parser.add_argument(
+        "--data-file", default="data/stocks.json", help="監視銘柄リストのファイル"
+    )
+    parser.add_argument(
+        "--no-notify", action="store_true", help="Discordに処理結果を送信しない"
+    )
+    parser.add_argument(
+        "--pending-file",
+        help="通知とIssueのクローズを行わず、内容をこのファイルに保存する",
+    )
+    parser.add_argument(
+        "--finalize",
+        metavar="PENDING_FILE",
+        help="--pending-fileで保存した通知を送信し、Issueをクローズする",
+    )
+    return parser.parse_args(argv)
+
+
+def _write_github_output(name: str, value: str):
+    """GitHub Actionsのステップ出力を設定"""
+    path = os.getenv("GITHUB_OUTPUT")
+    if path:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"{name}={value}\n")
+
+
+def _issue_queue() -> GitHubIssueQueue:
+    from utils.http_client import get_shared_transport
+
+    return GitHubIssueQueue(
+        os.getenv("GITHUB_REPOSITORY", ""),
+        os.getenv("GITHUB_TOKEN", ""),
+        get_shared_transport(),
+    )
+
+
+def _deliver(pending: Dict, issue_queue: Optional[GitHubIssueQueue], notify: bool):
+    """処理結果をDiscordに通知し、処理したIssueにコメントしてクローズ
+
+    コマンドを読み取れなかったIssueは開いたまま残し、キューから外す。
+    """
+    webhook_url = os.getenv("DISCORD_WEBHOOK_URL", "")
+    if pending["embed"] and webhook_url and notify:
+        from utils.http_client import get_shared_transport
+
+        send_result_notification(pending["embed"], webhook_url, get_shared_transport())
+
+    if issue_queue is not None:
+        for number, comment in pending["issues"].items():
+            issue_queue.close(int(number), comment)
+        for number, comment in pending.get("rejected", {}).items():
+            issue_queue.reject(int(number), comment)
+
+
+def finalize(pending_file: str, notify: bool = True) -> int:
+    """保留した通知とIssueのクローズを実行（変更のpush後に呼び出す）"""
+    if not os.path.exists(pending_file):
+        logger.info("保留中の通知はありません")
+        return 0
+
+    with open(pending_file, "r", encoding="utf-8") as f:
+        pending = json.load(f)
+
+    rejected = pending.get("rejected", {})
+    _deliver(pending, _issue_queue() if pending["issues"] or rejected else None, notify)
+    os.remove(pending_file)
+    logger.info(f"{len(pending['issues'])}件のIssueをクローズしました")
+    if rejected:
+        logger.warning(f"コマンドのない{len(rejected)}件のIssueを開いたまま残しました")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """キューに溜まったコマンドを処理し、終了コードを返す"""
+    args = parse_args(argv)
+    if args.finalize:
+        return finalize(args.finalize, notify=not args.no_notify)
+    if not args.issues and not args.queue_file:
+        logger.error("--issues または --queue-file を指定してください")
+        return 2
+
+    parser = DiscordCommandParser()
+    stock_manager = StockManager(args.data_file)
+
+    with ExitStack() as stack:
+        commands = []
+        sources = []  # (Issue番号, コマンド数)
+
+        issue_queue = None
+        if args.issues:
+            issue_queue = _issue_queue()
+            for issue in issue_queue.open_issues():
+                issue_commands = commands_from_issue(issue, parser)
+                commands.extend(issue_commands)
+                sources.append((issue["number"], len(issue_commands)))
+
+        if args.queue_file:
+            # 処理が終わるまでキューファイルへの追加を待たせる
+            stack.enter_context(file_lock(args.queue_file))
+            queued = read_queue_file(args.queue_file, parser)
+            commands.extend(queued)
+            sources.append((None, len(queued)))
+
+        if not commands and all(number is None for number, _ in sources):
+            logger.info("処理するコマンドはありません")
+            _write_github_output("changed", "false")
+            return 0
+
+        results = parser.apply_commands(commands, stock_manager)
+        for result in results:
+            logger.info(f"[{result.command.action}] {result.message}")
+
+        changed = any(
+            result.success and result.command.action in MUTATING_ACTIONS
+            for result in results
+        )
+        _write_github_output("changed", "true" if changed else "false")
+
+        grouped = group_results(results, sources)
+        pending = {
+            "embed": build_result_embed(results, stock_manager) if results else None,
+            "issues": {
+                str(number): issue_comment(issue_results)
+                for number, issue_results in grouped.items()
+                if issue_results
+            },
+            # コマンドを読み取れなかったIssueはクローズしない
+            "rejected": {
+                str(number): issue_comment([])
+                for number, issue_results in grouped.items()
+                if not issue_results
+            },
+        }
+
+        # 処理済みのキューを片付ける
+        if args.queue_file:
+            clear_queue_file(args.queue_file)
+
+        if args.pending_file:
+            # 変更のpushが成功するまで通知・クローズしない（--finalizeで実行）
+            atomic_write_json(args.pending_file, pending)
+            logger.info(f"通知とIssueのクローズを保留しました: {args.pending_file}")
+        else:
+            _deliver(pending, issue_queue, notify=not args.no_notify)
+
+    failed = sum(1 for result in results if not result.success)
+    logger.info(f"{len(results)}件のコマンドを処理しました（失敗 {failed}件）")
+    return 0
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+    sys.exit(main())
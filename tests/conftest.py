@@ -0,0 +1,32 @@
+"""
+テスト共通ヘルパー
+"""
+
+from datetime import datetime
+
+from api.stock_api import StockPrice
+
+
+def make_price(symbol, market="us", price=100.0, previous_close=None, **kwargs):
+    """テスト用の株価データを作成
+
+    previous_closeを指定した場合は前日比（change・change_percent）をそこから計算する。
+    """
+    fields = {
+        "name": symbol,
+        "change": 1.0,
+        "change_percent": 1.0,
+        "volume": 1000,
+        "timestamp": datetime.now(),
+    }
+    if previous_close:
+        fields["change"] = price - previous_close
+        fields["change_percent"] = fields["change"] / previous_close * 100
+    fields.update(kwargs)
+    return StockPrice(
+        symbol=symbol,
+        price=price,
+        market=market,
+        previous_close=previous_close,
+        **fields,
+    )
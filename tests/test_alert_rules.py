@@ -0,0 +1,219 @@
+"""
+アラートルールエンジン テスト
+"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from conftest import make_price
+
+from api.alert_rules import (
+    GAP,
+    PERCENT,
+    PRICE_CROSS,
+    VOLUME_SPIKE,
+    AlertRule,
+    AlertRuleSet,
+    CooldownTracker,
+)
+from utils.config import Config, StockConfig
+
+
+class TestAlertRuleSet(unittest.TestCase):
+    """アラートルールエンジン テストクラス"""
+
+    def test_percent_rule_precedence(self):
+        """銘柄 > 市場 > 全体 の順で変動率の閾値を適用するテスト"""
+        rules = AlertRuleSet(
+            [
+                AlertRule(PERCENT, 5.0),
+                AlertRule(PERCENT, 1.0, market="jp"),
+                AlertRule(PERCENT, 10.0, symbol="JJJ"),
+            ]
+        )
+        prices = [
+            make_price("AAA", price=103.0, previous_close=100.0),  # 3% < 5%
+            make_price("BBB", market="jp", price=103.0, previous_close=100.0),
+            make_price("JJJ", market="jp", price=103.0, previous_close=100.0),
+        ]
+
+        hits = rules.evaluate(prices)
+
+        self.assertEqual([hit.price.symbol for hit in hits], ["BBB"])
+        self.assertEqual(hits[0].reasons, ("変動率 +3.00%",))
+
+    def test_price_cross(self):
+        """前日終値と現在値の間の価格をまたいだ銘柄を検出するテスト"""
+        rules = AlertRuleSet(
+            [
+                AlertRule(PRICE_CROSS, 100.0, symbol="UP"),
+                AlertRule(PRICE_CROSS, 100.0, symbol="DOWN"),
+                AlertRule(PRICE_CROSS, 100.0, symbol="FLAT"),
+            ]
+        )
+        prices = [
+            make_price("UP", price=101.0, previous_close=99.0),
+            make_price("DOWN", price=99.0, previous_close=101.0),
+            make_price("FLAT", price=102.0, previous_close=101.0),
+        ]
+
+        hits = rules.evaluate(prices)
+
+        self.assertEqual([hit.price.symbol for hit in hits], ["UP", "DOWN"])
+        self.assertEqual(hits[0].reasons, ("100.00 を上抜け",))
+        self.assertEqual(hits[1].reasons, ("100.00 を下抜け",))
+
+    def test_volume_spike_and_gap(self):
+        """出来高急増と窓開けを検出し、前日データがない銘柄は対象外とするテスト"""
+        rules = AlertRuleSet([AlertRule(VOLUME_SPIKE, 3.0), AlertRule(GAP, 2.0)])
+        prices = [
+            make_price("VOL", volume=4000, previous_volume=1000),
+            make_price("GAP", open_price=101.0, previous_close=98.0),
+            make_price("NONE", volume=4000),
+        ]
+
+        hits = {hit.price.symbol: hit.reasons for hit in rules.evaluate(prices)}
+
+        self.assertEqual(
+            hits, {"VOL": ("出来高 前日比4.0倍",), "GAP": ("ギャップ +3.06%",)}
+        )
+
+    def test_from_config_loads_rule_file(self):
+        """設定の閾値とルールファイルを読み込むテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "alert_rules.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"rules": [{"type": "gap", "value": 2, "market": "jp"}]}, f)
+
+            config = Config()
+            config.price_change_threshold = 4.0
+            config.stocks = []
+            config.alert_rules_path = path
+            rules = AlertRuleSet.from_config(config)
+
+        self.assertEqual(
+            rules.rules, [AlertRule(PERCENT, 4.0), AlertRule(GAP, 2.0, market="jp")]
+        )
+
+    def test_from_config_uses_stock_thresholds(self):
+        """銘柄設定の閾値を銘柄のルールとし、ルールファイルで上書きできるテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "alert_rules.json")
+            with open(path, "w", encoding="utf-8") as f:
+                rules = [
+                    {"type": "percent", "value": 1, "symbol": "BBB"},
+                    {"type": "percent", "value": 2, "market": "jp"},
+                ]
+                json.dump({"rules": rules}, f)
+
+            config = Config()
+            config.price_change_threshold = 5.0
+            config.stocks = [
+                StockConfig(symbol="AAA", name="A", market="us", threshold=2.0),
+                StockConfig(symbol="BBB", name="B", market="us", threshold=3.0),
+                StockConfig(symbol="CCC", name="C", market="us"),
+                StockConfig(symbol="DDD", name="D", market="jp"),
+            ]
+            config.alert_rules_path = path
+            rules = AlertRuleSet.from_config(config)
+
+        prices = [
+            make_price("AAA", price=102.5, previous_close=100.0),
+            make_price("BBB", price=101.5, previous_close=100.0),
+            make_price("CCC", price=102.5, previous_close=100.0),
+            make_price("DDD", market="jp", price=102.5, previous_close=100.0),
+        ]
+        self.assertEqual(
+            [hit.price.symbol for hit in rules.evaluate(prices)],
+            ["AAA", "BBB", "DDD"],
+        )
+
+    def test_from_config_loads_shipped_rule_file(self):
+        """既定ではリポジトリのルールファイル（data/alert_rules.json）を読み込むテスト"""
+        config = Config()
+        config.stocks = [StockConfig(symbol="AAA", name="A", market="us")]
+
+        self.assertEqual(config.alert_rules_path, "data/alert_rules.json")
+        self.assertTrue(os.path.exists(config.alert_rules_path))
+        with patch.object(
+            AlertRuleSet, "load_rules", wraps=AlertRuleSet.load_rules
+        ) as mock_load:
+            rules = AlertRuleSet.from_config(config)
+
+        mock_load.assert_called_once_with("data/alert_rules.json")
+        shipped = AlertRuleSet.load_rules("data/alert_rules.json")
+        for rule in shipped:
+            self.assertIn(rule, rules.rules)
+        self.assertIn(
+            AlertRule(PERCENT, config.price_change_threshold, symbol="AAA"), rules.rules
+        )
+
+    def test_unknown_rule_type(self):
+        """不明なルールの種類でエラーになるテスト"""
+        with self.assertRaises(ValueError):
+            AlertRuleSet([AlertRule("moon", 1.0)])
+
+    def test_evaluates_large_watchlist_quickly(self):
+        """1万銘柄・数十ルールを一括で判定できるテスト"""
+        prices = [
+            make_price(
+                f"S{i}",
+                market=("us", "jp", "eu")[i % 3],
+                price=100.0 + i % 7,
+                previous_close=100.0,
+                previous_volume=500,
+            )
+            for i in range(10000)
+        ]
+        rules = AlertRuleSet(
+            [AlertRule(PERCENT, 5.0), AlertRule(VOLUME_SPIKE, 3.0)]
+            + [AlertRule(PERCENT, 4.0, market=m) for m in ("us", "jp")]
+            + [AlertRule(PRICE_CROSS, 103.5, symbol=f"S{i}") for i in range(30)]
+        )
+        rules.evaluate(prices)  # 初回は銘柄リストに対するコンパイルを含む
+
+        started = time.perf_counter()
+        hits = rules.evaluate(prices)
+        elapsed = time.perf_counter() - started
+
+        self.assertGreater(len(hits), 0)
+        self.assertLess(elapsed, 1.0)
+
+
+class TestCooldownTracker(unittest.TestCase):
+    """アラートのクールダウン テストクラス"""
+
+    def test_ready_mask(self):
+        """クールダウン中の銘柄だけを除外するテスト"""
+        tracker = CooldownTracker(cooldown=1800)
+        tracker.record(["AAA"], now=1000.0)
+        tracker.record(["BBB"], now=0.0)
+
+        mask = tracker.ready_mask(["AAA", "BBB", "CCC"], now=2000.0)
+
+        self.assertEqual(mask.tolist(), [False, True, True])
+
+    def test_cooldown_spans_days(self):
+        """1日以上前のアラートはクールダウン対象外とするテスト"""
+        tracker = CooldownTracker(cooldown=1800)
+        tracker.record(["AAA"], now=0.0)
+
+        # 1日と10分後（timedelta.secondsでは600秒になる）
+        self.assertTrue(tracker.ready_mask(["AAA"], now=86400.0 + 600)[0])
+
+    def test_grows_beyond_initial_capacity(self):
+        """初期容量を超える銘柄を記録できるテスト"""
+        tracker = CooldownTracker()
+        symbols = [f"S{i}" for i in range(100)]
+        tracker.record(symbols, now=time.time())
+
+        self.assertFalse(tracker.ready_mask(symbols).any())
+        self.assertIn("S99", tracker)
+
+
+if __name__ == "__main__":
+    unittest.main()
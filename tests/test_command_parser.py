@@ -0,0 +1,104 @@
+"""
+Discord コマンドパーサー テスト
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from utils.discord_commands import DiscordCommandParser
+from utils.file_utils import atomic_write_json
+from utils.stock_manager import StockManager
+
+
+class TestDiscordCommandParser(unittest.TestCase):
+    """Discord コマンドパーサー テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        self.parser = DiscordCommandParser()
+
+    def test_parse_single_command(self):
+        """1コマンドの解析テスト"""
+        command = self.parser.parse_command("!add-stock 369A.T エータイ", "user")
+        self.assertEqual(
+            (command.action, command.symbol, command.name, command.market),
+            ("add", "369A.T", "エータイ", "jp"),
+        )
+
+        command = self.parser.parse_command("!add_stock AAPL Apple Inc. us")
+        self.assertEqual((command.name, command.market), ("Apple Inc.", "us"))
+
+        self.assertEqual(self.parser.parse_command("!list-stocks").action, "list")
+        self.assertIsNone(self.parser.parse_command("invalid command"))
+        with self.assertRaises(ValueError):
+            self.parser.parse_command("!remove-stock AAPL MSFT")
+
+    def test_parse_batch(self):
+        """複数行・カンマ区切りのコマンドを解析するテスト"""
+        body = """
+## 株式追加リクエスト
+!add-stock AAPL,msft,NVDA us
+!add-stock 7203.T トヨタ自動車
+!remove-stock BTC-USD
+!unknown-command
+"""
+        commands = self.parser.parse_commands(body, "user")
+
+        self.assertEqual(
+            [(c.action, c.symbol, c.name, c.market) for c in commands],
+            [
+                ("add", "AAPL", "AAPL", "us"),
+                ("add", "MSFT", "MSFT", "us"),
+                ("add", "NVDA", "NVDA", "us"),
+                ("add", "7203.T", "トヨタ自動車", "jp"),
+                ("remove", "BTC-USD", "", ""),
+            ],
+        )
+
+    def test_parse_symbols_with_spaces(self):
+        """カンマの後に空白がある複数銘柄を解析するテスト"""
+        commands = self.parser.parse_commands(
+            "!add-stock AAPL, MSFT ,NVDA us\n!remove-stock 7203.T, BTC-USD ETH-USD"
+        )
+
+        self.assertEqual(
+            [(c.action, c.symbol, c.market) for c in commands],
+            [
+                ("add", "AAPL", "us"),
+                ("add", "MSFT", "us"),
+                ("add", "NVDA", "us"),
+                ("remove", "7203.T", ""),
+                ("remove", "BTC-USD", ""),
+                ("remove", "ETH-USD", ""),
+            ],
+        )
+        self.assertEqual(self.parser.parse_commands("!add-stock ,AAPL"), [])
+
+    def test_apply_commands_writes_once(self):
+        """コマンドをまとめて実行し、1回だけ書き込むテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = StockManager(os.path.join(tmpdir, "stocks.json"))
+            manager.add_stock("BTC-USD", "Bitcoin", "crypto")
+            commands = self.parser.parse_commands(
+                "!add-stock AAPL,MSFT us\n!add-stock AAPL\n!remove-stock BTC-USD"
+            )
+
+            with patch(
+                "utils.stock_manager.atomic_write_json", wraps=atomic_write_json
+            ) as mock_write:
+                results = self.parser.apply_commands(commands, manager)
+
+            self.assertEqual(mock_write.call_count, 1)
+            self.assertEqual([r.success for r in results], [True, True, False, True])
+            self.assertEqual(
+                results[2].message, "株式 AAPL は既に監視リストに存在します"
+            )
+            self.assertEqual(
+                [s.symbol for s in manager.get_all_stocks()], ["AAPL", "MSFT"]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+"""
+コマンドキュー テスト
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+import process_commands
+from utils.command_queue import (
+    GitHubIssueQueue,
+    append_queue_file,
+    build_result_embed,
+    commands_from_issue,
+    read_queue_file,
+)
+from utils.discord_commands import DiscordCommandParser
+from utils.file_utils import atomic_write_json
+from utils.stock_manager import StockManager
+
+
+class TestCommandQueue(unittest.TestCase):
+    """コマンドキュー テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        self.parser = DiscordCommandParser()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmpdir.name, "stocks.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_commands_from_issue(self):
+        """Issueの本文・タイトルからコマンドを取り出すテスト"""
+        generated = self.parser.format_github_issue(
+            self.parser.parse_command("!add-stock AAPL Apple us", "alice")
+        )
+        commands = commands_from_issue(generated, self.parser)
+        self.assertEqual(
+            [(c.action, c.symbol, c.name, c.market, c.user) for c in commands],
+            [("add", "AAPL", "Apple", "us", "alice")],
+        )
+
+        batch = {
+            "title": "Batch",
+            "body": "!add-stock MSFT,NVDA us\n!remove-stock AAPL",
+            "user": {"login": "bob"},
+        }
+        commands = commands_from_issue(batch, self.parser)
+        self.assertEqual(
+            [(c.action, c.symbol, c.user) for c in commands],
+            [("add", "MSFT", "bob"), ("add", "NVDA", "bob"), ("remove", "AAPL", "bob")],
+        )
+
+    def test_batch_issue_round_trip(self):
+        """複数銘柄のコマンドから作成したIssueで全てのコマンドを読み戻すテスト"""
+        commands = self.parser.parse_commands(
+            "!add-stock AAPL, MSFT, NVDA us\n!remove-stock 7203.T", "alice"
+        )
+        issue = self.parser.format_github_issues(commands)
+
+        self.assertIn("action-add", issue["labels"])
+        self.assertIn("action-remove", issue["labels"])
+        self.assertEqual(commands_from_issue(issue, self.parser), commands)
+
+        single = self.parser.parse_commands("!add-stock AAPL Apple Inc. us", "bob")
+        issue = self.parser.format_github_issues(single)
+        self.assertTrue(issue["title"].startswith("Add Stock: AAPL"))
+        self.assertEqual(commands_from_issue(issue, self.parser), single)
+
+    def test_read_queue_files(self):
+        """JSON・JSONLのキューファイルを読み込むテスト"""
+        jsonl = os.path.join(self.tmpdir.name, "queue.jsonl")
+        append_queue_file(jsonl, "!add-stock AAPL,MSFT us", "alice")
+        append_queue_file(jsonl, "!remove-stock NVDA")
+        self.assertEqual(
+            [(c.symbol, c.user) for c in read_queue_file(jsonl, self.parser)],
+            [("AAPL", "alice"), ("MSFT", "alice"), ("NVDA", "Unknown")],
+        )
+
+        path = os.path.join(self.tmpdir.name, "queue.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"commands": ["!list-stocks"]}, f)
+        self.assertEqual(
+            [c.action for c in read_queue_file(path, self.parser)], ["list"]
+        )
+
+    def test_result_embed(self):
+        """処理結果を1つの埋め込みにまとめるテスト"""
+        manager = StockManager(self.data_file)
+        commands = self.parser.parse_commands(
+            "!add-stock AAPL Apple us\n!remove-stock NONE\n!list-stocks"
+        )
+        results = self.parser.apply_commands(commands, manager)
+
+        embed = build_result_embed(results, manager)
+
+        self.assertEqual(embed["title"], "⚠️ 一部失敗")
+        self.assertEqual(embed["fields"][0]["name"], "実行結果")
+        self.assertEqual(embed["fields"][0]["value"].count("\n"), 2)
+        self.assertEqual(embed["fields"][1]["name"], "🇺🇸 米国株")
+        self.assertEqual(embed["fields"][1]["value"], "- AAPL: Apple")
+
+    def test_github_issue_queue(self):
+        """IssueのページングとPR除外、クローズのテスト"""
+        transport = Mock()
+        full_page = [{"number": i, "title": ""} for i in range(100)]
+        transport.get.side_effect = [
+            Mock(json=Mock(return_value=full_page)),
+            Mock(json=Mock(return_value=[{"number": 100, "pull_request": {}}])),
+        ]
+        queue = GitHubIssueQueue("owner/repo", "token", transport)
+
+        self.assertEqual(len(queue.open_issues()), 100)
+        self.assertEqual(transport.get.call_count, 2)
+
+        queue.close(5, "done")
+        transport.post.assert_called_once()
+        self.assertEqual(transport.request.call_args[0][0], "PATCH")
+        self.assertTrue(transport.request.call_args[0][1].endswith("/issues/5"))
+
+        queue.reject(6, "invalid")
+        self.assertEqual(
+            transport.post.call_args[1]["json"], {"labels": ["discord-command-invalid"]}
+        )
+        self.assertEqual(transport.request.call_args[0][0], "DELETE")
+        self.assertTrue(
+            transport.request.call_args[0][1].endswith(
+                "/issues/6/labels/discord-command"
+            )
+        )
+
+    def test_cli_drains_queue_file_in_one_write(self):
+        """CLIがキューファイルのコマンドを1回の書き込みで処理して空にするテスト"""
+        queue_file = os.path.join(self.tmpdir.name, "queue.jsonl")
+        for message in ["!add-stock AAPL,MSFT us", "!add-stock 7203.T トヨタ"]:
+            append_queue_file(queue_file, message)
+        output = os.path.join(self.tmpdir.name, "github_output")
+
+        with patch.dict(
+            os.environ, {"GITHUB_OUTPUT": output, "DISCORD_WEBHOOK_URL": ""}
+        ), patch(
+            "utils.stock_manager.atomic_write_json", wraps=atomic_write_json
+        ) as mock_write:
+            code = process_commands.main(
+                ["--queue-file", queue_file, "--data-file", self.data_file]
+            )
+
+        self.assertEqual(code, 0)
+        # 初回作成時の空リスト書き込み + コマンド適用の1回
+        self.assertEqual(mock_write.call_count, 2)
+        self.assertEqual(StockManager(self.data_file).get_stock_count(), 3)
+        self.assertEqual(read_queue_file(queue_file, self.parser), [])
+        with open(output, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "changed=true\n")
+
+    def test_cli_defers_notification_until_finalize(self):
+        """--pending-fileでは通知・クローズを保留し、--finalizeで実行するテスト"""
+        queue_file = os.path.join(self.tmpdir.name, "queue.jsonl")
+        append_queue_file(queue_file, "!add-stock AAPL us")
+        pending_file = os.path.join(self.tmpdir.name, "pending.json")
+        env = {"DISCORD_WEBHOOK_URL": "https://example.invalid/webhook"}
+
+        with patch.dict(os.environ, env), patch(
+            "process_commands.send_result_notification"
+        ) as mock_send:
+            code = process_commands.main(
+                [
+                    "--queue-file",
+                    queue_file,
+                    "--data-file",
+                    self.data_file,
+                    "--pending-file",
+                    pending_file,
+                ]
+            )
+            self.assertEqual(code, 0)
+            mock_send.assert_not_called()
+            self.assertEqual(StockManager(self.data_file).get_stock_count(), 1)
+
+            # Issueの結果も保留ファイルに含まれる
+            with open(pending_file, encoding="utf-8") as f:
+                pending = json.load(f)
+            pending["issues"] = {"5": "done"}
+            atomic_write_json(pending_file, pending)
+
+            with patch("process_commands._issue_queue") as mock_queue:
+                code = process_commands.main(["--finalize", pending_file])
+
+        self.assertEqual(code, 0)
+        mock_send.assert_called_once()
+        mock_queue.return_value.close.assert_called_once_with(5, "done")
+        self.assertFalse(os.path.exists(pending_file))
+        # 保留ファイルがなければ何もしない
+        self.assertEqual(process_commands.main(["--finalize", pending_file]), 0)
+
+    def test_cli_keeps_issues_without_commands_open(self):
+        """コマンドを読み取れないIssueはクローズせずに残すテスト"""
+        issues = [
+            {"number": 1, "title": "質問", "body": "監視銘柄を増やしたい"},
+            {"number": 2, "title": "", "body": "!add-stock AAPL us"},
+        ]
+        with patch.dict(os.environ, {"DISCORD_WEBHOOK_URL": ""}), patch(
+            "process_commands._issue_queue"
+        ) as mock_queue:
+            mock_queue.return_value.open_issues.return_value = issues
+            code = process_commands.main(["--issues", "--data-file", self.data_file])
+
+        self.assertEqual(code, 0)
+        queue = mock_queue.return_value
+        queue.close.assert_called_once()
+        self.assertEqual(queue.close.call_args[0][0], 2)
+        queue.reject.assert_called_once()
+        self.assertEqual(queue.reject.call_args[0][0], 1)
+        self.assertIn("開いたまま", queue.reject.call_args[0][1])
+
+    def test_cli_requires_source(self):
+        """処理対象の指定がない場合はエラーになるテスト"""
+        self.assertEqual(process_commands.main(["--data-file", self.data_file]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,7 @@ import unittest
 from datetime import datetime
 from unittest.mock import MagicMock, Mock, patch
 
+from api.market_snapshot import MarketSnapshot
 from api.stock_api import StockPrice
 from bot.discord_bot import DiscordStockBot
 from utils.config import Config
@@ -77,9 +78,11 @@ class TestDiscordStockBot(unittest.TestCase):
         result = self.bot._should_send_alert(alert)
         self.assertFalse(result)
 
-    @patch("bot.discord_bot.requests.post")
-    def test_send_discord_message(self, mock_post):
+    def test_send_discord_message(self):
         """Discord メッセージ送信テスト"""
+        mock_post = MagicMock()
+        self.bot.delivery.transport = Mock(post=mock_post)
+
         # レスポンスのモック
         mock_post.return_value.status_code = 204
 
@@ -99,6 +102,161 @@ class TestDiscordStockBot(unittest.TestCase):
         self.assertEqual(args[0], self.config.notification.webhook_url)
         self.assertEqual(kwargs["json"]["embeds"][0], embed)
 
+    def test_check_price_alerts_packs_embeds(self):
+        """同時に発生したアラートを10件ずつまとめて送信するテスト"""
+        alerts = [
+            StockPrice(
+                symbol=f"TEST{i}",
+                name=f"Test Stock {i}",
+                price=100.0,
+                change=10.0,
+                change_percent=10.0,
+                volume=1000000,
+                timestamp=datetime.now(),
+                market="us",
+            )
+            for i in range(40)
+        ]
+        snapshot = MarketSnapshot(
+            prices=tuple(alerts), thresholds={a.symbol: 5.0 for a in alerts}
+        )
+        mock_post = MagicMock()
+        mock_post.return_value.status_code = 204
+        mock_post.return_value.headers = {}
+        self.bot.delivery.transport = Mock(post=mock_post)
+
+        self.bot._check_price_alerts(snapshot)
+
+        self.assertEqual(mock_post.call_count, 4)
+        sent = [len(call.kwargs["json"]["embeds"]) for call in mock_post.call_args_list]
+        self.assertEqual(sent, [10, 10, 10, 10])
+
+    def test_failed_alert_is_not_cooled_down(self):
+        """送信に失敗したアラートはクールダウンを記録せず次回に再送するテスト"""
+        alert = StockPrice(
+            symbol="TEST",
+            name="Test Stock",
+            price=100.0,
+            change=10.0,
+            change_percent=10.0,
+            volume=1000000,
+            timestamp=datetime.now(),
+            market="us",
+        )
+        snapshot = MarketSnapshot(prices=(alert,), thresholds={"TEST": 5.0})
+        mock_post = MagicMock()
+        mock_post.return_value.status_code = 400
+        mock_post.return_value.headers = {}
+        self.bot.delivery.transport = Mock(post=mock_post)
+
+        self.bot._check_price_alerts(snapshot)
+        self.assertTrue(self.bot._should_send_alert(alert))
+
+        mock_post.return_value.status_code = 204
+        self.bot._check_price_alerts(snapshot)
+        self.assertFalse(self.bot._should_send_alert(alert))
+        self.assertEqual(mock_post.call_count, 2)
+
+    def test_regular_update_delta_mode(self):
+        """差分通知モードで変化した銘柄のみ送信するテスト"""
+        import os
+        import tempfile
+
+        def make_snapshot(*values):
+            prices = tuple(
+                StockPrice(
+                    symbol=symbol,
+                    name=symbol,
+                    price=price,
+                    change=0.0,
+                    change_percent=change_percent,
+                    volume=0,
+                    timestamp=datetime.now(),
+                    market="us",
+                )
+                for symbol, price, change_percent in values
+            )
+            return MarketSnapshot(prices=prices, thresholds={})
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.config.notification.mode = "delta"
+            self.config.notification.delta_epsilon = 0.1
+            self.config.notification.state_path = os.path.join(tmpdir, "state.json")
+
+            mock_post = MagicMock()
+            mock_post.return_value.status_code = 204
+            mock_post.return_value.headers = {}
+
+            bot = DiscordStockBot(self.config, self.stock_api)
+            bot.delivery.transport = Mock(post=mock_post)
+            bot._send_regular_update(
+                make_snapshot(("AAA", 100.0, 1.0), ("BBB", 50.0, 2.0))
+            )
+            self.assertEqual(mock_post.call_count, 1)
+
+            # 単発実行をまたいで前回の送信状態を引き継ぐ
+            bot = DiscordStockBot(self.config, self.stock_api)
+            bot.delivery.transport = Mock(post=mock_post)
+            bot._send_regular_update(
+                make_snapshot(("AAA", 100.05, 1.05), ("BBB", 55.0, 12.0))
+            )
+            self.assertEqual(mock_post.call_count, 2)
+            embed = mock_post.call_args.kwargs["json"]["embeds"][0]
+            self.assertIn("BBB", embed["fields"][0]["value"])
+            self.assertNotIn("AAA", embed["fields"][0]["value"])
+            self.assertEqual(embed["footer"]["text"], "変化なし: 1銘柄")
+
+            # 変化がなければ送信しない
+            bot._send_regular_update(
+                make_snapshot(("AAA", 100.0, 1.0), ("BBB", 55.0, 12.0))
+            )
+            self.assertEqual(mock_post.call_count, 2)
+
+    def test_run_async_shares_snapshot_and_stops(self):
+        """asyncioランタイムのテスト（スナップショット共有・並行実行・停止）"""
+        import asyncio
+
+        stock = StockPrice(
+            symbol="TEST",
+            name="Test Stock",
+            price=100.0,
+            change=10.0,
+            change_percent=10.0,
+            volume=1000000,
+            timestamp=datetime.now(),
+            market="us",
+        )
+        self.stock_api.get_snapshot.return_value = MarketSnapshot(
+            prices=(stock,), thresholds={"TEST": 5.0}
+        )
+        sent = []
+
+        async def scenario():
+            alert_sent = asyncio.Event()
+
+            async def fake_flush(session):
+                while self.bot.delivery.depth:
+                    entry = self.bot.delivery._queue.popleft()
+                    title = entry.payload["embeds"][0]["title"]
+                    sent.append(title)
+                    if title == "📊 株価定期更新":
+                        # 定期通知の送信が詰まってもアラートは遅れない
+                        await asyncio.sleep(60)
+                    else:
+                        alert_sent.set()
+
+            with patch.object(self.bot.delivery, "flush_async", fake_flush):
+                runner = asyncio.create_task(self.bot.run_async())
+                await asyncio.wait_for(alert_sent.wait(), timeout=5)
+                self.bot.stop()
+                await asyncio.wait_for(runner, timeout=2)
+
+        asyncio.run(scenario())
+
+        self.assertEqual(sorted(sent), ["📊 株価定期更新", "🚨 急上昇アラート"])
+        self.stock_api.get_snapshot.assert_called_once()
+        self.assertFalse(self.bot.running)
+
     def test_format_stock_list(self):
         """株価リストフォーマットテスト"""
         stocks = [
@@ -0,0 +1,82 @@
+"""
+埋め込みメッセージ分割・詰め込み テスト
+"""
+
+import unittest
+
+from bot.embed_packer import (
+    MAX_FIELD_VALUE_LENGTH,
+    MAX_FIELDS_PER_EMBED,
+    MAX_MESSAGE_LENGTH,
+    embed_length,
+    pack_embeds,
+    split_embed,
+    split_field_lines,
+)
+
+
+class TestEmbedPacker(unittest.TestCase):
+    """埋め込みメッセージ分割・詰め込み テストクラス"""
+
+    def test_pack_alerts(self):
+        """40件のアラートを10件ずつ4リクエストにまとめるテスト"""
+        embeds = [{"title": f"alert {i}", "description": "x" * 50} for i in range(40)]
+
+        payloads = pack_embeds(embeds)
+
+        self.assertEqual([len(p["embeds"]) for p in payloads], [10, 10, 10, 10])
+        self.assertEqual(
+            [e["title"] for p in payloads for e in p["embeds"]],
+            [e["title"] for e in embeds],
+        )
+
+    def test_pack_respects_message_length(self):
+        """1メッセージの合計文字数上限で分割するテスト"""
+        embeds = [{"title": "t", "description": "x" * 2500} for _ in range(3)]
+
+        payloads = pack_embeds(embeds)
+
+        self.assertEqual([len(p["embeds"]) for p in payloads], [2, 1])
+
+    def test_split_field_lines(self):
+        """フィールド値の文字数上限で分割するテスト"""
+        lines = [f"📈 **Stock {i:03d}**: $100.00 (+1.00%)" for i in range(200)]
+
+        fields = split_field_lines("🇺🇸 米国株", lines)
+
+        self.assertGreater(len(fields), 1)
+        self.assertTrue(all(len(f["value"]) <= MAX_FIELD_VALUE_LENGTH for f in fields))
+        self.assertEqual(fields[0]["name"], "🇺🇸 米国株")
+        self.assertEqual(fields[1]["name"], "🇺🇸 米国株（続き）")
+        self.assertEqual("\n".join(f["value"] for f in fields).split("\n"), lines)
+
+    def test_split_embed(self):
+        """大きな埋め込みをフィールド数・文字数の上限内に分割するテスト"""
+        embed = {
+            "title": "📊 株価定期更新",
+            "description": "説明",
+            "footer": {"text": "変化なし: 3"},
+            "fields": [
+                {"name": f"field {i}", "value": "x" * 900, "inline": False}
+                for i in range(30)
+            ],
+        }
+
+        embeds = split_embed(embed)
+
+        self.assertGreater(len(embeds), 1)
+        for part in embeds:
+            self.assertLessEqual(len(part["fields"]), MAX_FIELDS_PER_EMBED)
+            self.assertLessEqual(embed_length(part), MAX_MESSAGE_LENGTH)
+            self.assertEqual(part["title"], embed["title"])
+        self.assertEqual(embeds[0]["description"], "説明")
+        self.assertNotIn("description", embeds[1])
+        self.assertEqual(
+            [e.get("footer") for e in embeds[:-1]], [None] * (len(embeds) - 1)
+        )
+        self.assertEqual(embeds[-1]["footer"], {"text": "変化なし: 3"})
+        self.assertEqual(sum(len(e["fields"]) for e in embeds), 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
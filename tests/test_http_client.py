@@ -0,0 +1,74 @@
+"""
+共有HTTPトランスポート テスト
+"""
+
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.http_client import HTTPTransport
+from utils.metrics import REGISTRY
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    """keep-aliveで応答するテスト用ハンドラ"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHTTPTransport(unittest.TestCase):
+    """共有HTTPトランスポート テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        REGISTRY.reset()
+        self.addCleanup(REGISTRY.reset)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_reuse(self):
+        """接続再利用カウンタのテスト"""
+        transport = HTTPTransport()
+
+        for _ in range(3):
+            response = transport.get(self.url)
+            self.assertEqual(response.text, "ok")
+
+        self.assertEqual(transport.stats.requests, 3)
+        self.assertEqual(transport.stats.new_connections, 1)
+        self.assertEqual(transport.stats.reused_connections, 2)
+        transport.close()
+
+        # メトリクスとして書き出される
+        host = "127.0.0.1"
+        self.assertEqual(REGISTRY.counter("http_requests_total").value(host=host), 3)
+        self.assertEqual(
+            REGISTRY.counter("http_new_connections_total").value(host=host), 1
+        )
+        self.assertEqual(REGISTRY.summary()["connection_reuse_ratio"], 0.6667)
+
+    def test_default_timeout(self):
+        """タイムアウトが既定で設定されるテスト"""
+        transport = HTTPTransport(connect_timeout=1.5, read_timeout=3.0)
+        self.assertEqual(transport.timeout, (1.5, 3.0))
+        transport.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
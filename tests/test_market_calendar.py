@@ -0,0 +1,110 @@
+"""
+取引カレンダー テスト
+"""
+
+import unittest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from utils import market_calendar
+from utils.market_calendar import (
+    is_market_open,
+    is_quote_final,
+    last_close,
+    next_open,
+)
+
+JST = ZoneInfo("Asia/Tokyo")
+
+
+class TestMarketCalendar(unittest.TestCase):
+    """取引カレンダー テストクラス"""
+
+    def test_jp_session(self):
+        """東証の取引時間テスト"""
+        # 2026-10-16 (金)
+        self.assertTrue(is_market_open("jp", datetime(2026, 10, 16, 10, 0, tzinfo=JST)))
+        self.assertFalse(
+            is_market_open("jp", datetime(2026, 10, 16, 23, 0, tzinfo=JST))
+        )
+        # 週末
+        self.assertFalse(
+            is_market_open("jp", datetime(2026, 10, 17, 10, 0, tzinfo=JST))
+        )
+
+    def test_jp_holidays(self):
+        """東証の休場日をまたぐ次の寄り付きテスト"""
+        # シルバーウィーク（9/21〜9/23休場）前の金曜夜
+        at = datetime(2026, 9, 18, 20, 0, tzinfo=JST)
+        self.assertEqual(next_open("jp", at), datetime(2026, 9, 24, 9, 0, tzinfo=JST))
+        self.assertEqual(
+            last_close("jp", datetime(2026, 9, 22, 12, 0, tzinfo=JST)),
+            datetime(2026, 9, 18, 15, 30, tzinfo=JST),
+        )
+
+    def test_us_session_in_jst(self):
+        """米国市場は日本時間9:00には引けているテスト"""
+        at = datetime(2026, 10, 16, 9, 0, tzinfo=JST)
+        self.assertFalse(is_market_open("us", at))
+        self.assertTrue(is_market_open("us", datetime(2026, 10, 16, 23, 0, tzinfo=JST)))
+
+    def test_crypto_always_open(self):
+        """暗号通貨は常時取引テスト"""
+        at = datetime(2026, 10, 17, 3, 0, tzinfo=JST)
+        self.assertTrue(is_market_open("crypto", at))
+        self.assertIsNone(next_open("crypto", at))
+        self.assertFalse(is_quote_final("crypto", at, at))
+
+    def test_forex_weekend(self):
+        """為替は週末のみ休場テスト"""
+        ny = ZoneInfo("America/New_York")
+        self.assertTrue(
+            is_market_open("forex", datetime(2026, 10, 14, 3, 0, tzinfo=ny))
+        )
+        self.assertFalse(
+            is_market_open("forex", datetime(2026, 10, 17, 12, 0, tzinfo=ny))
+        )
+        self.assertEqual(
+            next_open("forex", datetime(2026, 10, 17, 12, 0, tzinfo=ny)),
+            datetime(2026, 10, 18, 17, 0, tzinfo=ny),
+        )
+
+    def test_is_quote_final(self):
+        """終値確定後に取得した株価のみ再利用できるテスト"""
+        now = datetime(2026, 10, 16, 23, 0, tzinfo=JST)
+        after_close = datetime(2026, 10, 16, 16, 0, tzinfo=JST)
+        during_session = datetime(2026, 10, 16, 14, 0, tzinfo=JST)
+
+        self.assertTrue(is_quote_final("jp", after_close, now))
+        self.assertFalse(is_quote_final("jp", during_session, now))
+        # 取引時間中は常に再取得
+        self.assertFalse(
+            is_quote_final("jp", after_close, datetime(2026, 10, 19, 10, 0, tzinfo=JST))
+        )
+
+    def test_hk_holidays_2027(self):
+        """香港市場の2027年の休場日（旧正月）テスト"""
+        hkt = ZoneInfo("Asia/Hong_Kong")
+        self.assertFalse(
+            is_market_open("asia", datetime(2027, 2, 9, 10, 0, tzinfo=hkt))
+        )
+        self.assertEqual(
+            next_open("asia", datetime(2027, 2, 5, 20, 0, tzinfo=hkt)),
+            datetime(2027, 2, 10, 9, 30, tzinfo=hkt),
+        )
+
+    def test_warns_past_listed_holidays(self):
+        """休場日の掲載がない年を判定すると市場ごとに1回警告するテスト"""
+        market_calendar._warned_markets.discard("jp")
+        self.addCleanup(market_calendar._warned_markets.discard, "jp")
+        at = datetime(2028, 1, 5, 10, 0, tzinfo=JST)
+
+        with self.assertLogs("utils.market_calendar", "WARNING") as logs:
+            is_market_open("jp", at)
+            is_market_open("jp", at)
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("2027年", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
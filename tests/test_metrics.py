@@ -0,0 +1,150 @@
+"""
+メトリクス テスト
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from api.quote_providers import RateLimitError, ReplayProvider
+from api.stock_api import StockPriceAPI
+from bot.webhook_queue import WebhookDeliveryQueue
+from utils.config import Config, StockConfig
+from utils.metrics import REGISTRY, MetricsRegistry, write_metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """メトリクス テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        REGISTRY.reset()
+        self.addCleanup(REGISTRY.reset)
+
+    def test_prometheus_format(self):
+        """カウンターとヒストグラムをPrometheusのテキスト形式で出力するテスト"""
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "リクエスト数")
+        counter.inc(status=200)
+        counter.inc(2, status=429)
+        histogram = registry.histogram("latency_seconds", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 3.0):
+            histogram.observe(value, job="tick")
+
+        text = registry.to_prometheus()
+
+        self.assertIn("# HELP requests_total リクエスト数", text)
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn('requests_total{status="429"} 2', text)
+        self.assertIn('latency_seconds_bucket{job="tick",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{job="tick",le="1.0"} 2', text)
+        self.assertIn('latency_seconds_bucket{job="tick",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_count{job="tick"} 3', text)
+        self.assertIn('latency_seconds_sum{job="tick"} 3.55', text)
+        self.assertIs(registry.counter("requests_total"), counter)
+
+    def test_histogram_quantiles(self):
+        """バケットからの分位点推定テスト"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("fetch_seconds")
+        for _ in range(98):
+            histogram.observe(0.02)
+        histogram.observe(4.0)
+        histogram.observe(8.0)
+
+        self.assertLessEqual(histogram.quantile(0.5), 0.025)
+        self.assertGreater(histogram.quantile(0.995), 5.0)
+        self.assertLessEqual(histogram.quantile(1.0), 8.0)
+        self.assertIsNone(histogram.quantile(0.5, job="none"))
+
+    @patch("api.stock_api.time.sleep")
+    def test_fetch_and_delivery_metrics(self, mock_sleep):
+        """株価取得・キャッシュ・配信のメトリクスを記録してJSONに書き出すテスト"""
+        config = Config()
+        config.stocks = [
+            StockConfig(symbol="AAA", name="Stock A", market="us"),
+            StockConfig(symbol="BBB", name="Stock B", market="us"),
+        ]
+        config.fetch.batch_size = 1
+        config.fetch.max_workers = 1
+        config.cache.path = ""
+        config.history.path = ""
+
+        # AAAは429の後に取得成功、BBBは毎回空のデータ（しきい値未満のため毎回リトライ）
+        price = ReplayProvider({"AAA": [{"close": 100.0, "volume": 1}]}).fetch(
+            "AAA", "Stock A", "us"
+        )
+        provider = ReplayProvider({})
+        provider.fetch = Mock(side_effect=[RateLimitError("429"), price] + [None] * 6)
+        api = StockPriceAPI(config, transport=Mock(read_timeout=1.0), provider=provider)
+        api.get_all_prices()
+        api.get_all_prices()  # キャッシュから取得
+
+        transport = Mock()
+        transport.post.return_value = Mock(status_code=204, headers={}, text="")
+        WebhookDeliveryQueue("https://example.invalid/webhook", transport).send(
+            {"content": "hello"}
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config.metrics.summary_path = os.path.join(tmpdir, "out", "summary.json")
+            config.metrics.prometheus_path = os.path.join(tmpdir, "out", "metrics.prom")
+            write_metrics(config)
+
+            with open(config.metrics.summary_path, encoding="utf-8") as f:
+                summary = json.load(f)
+            with open(config.metrics.prometheus_path, encoding="utf-8") as f:
+                prometheus = f.read()
+
+        counters = summary["counters"]
+
+        def value(name, **labels):
+            return sum(
+                entry["value"]
+                for entry in counters[name]
+                if all(entry["labels"].get(k) == v for k, v in labels.items())
+            )
+
+        self.assertEqual(value("stock_fetch_rate_limited_total"), 1)
+        self.assertEqual(value("stock_fetch_empty_total"), 6)
+        self.assertEqual(value("stock_fetch_retries_total"), 5)
+        self.assertEqual(value("stock_fetch_skipped_total"), 0)
+        self.assertEqual(value("stock_fetch_results_total", result="ok"), 1)
+        self.assertEqual(value("stock_fetch_results_total", result="failed"), 2)
+        self.assertEqual(value("price_cache_lookups_total", result="hit"), 1)
+        self.assertEqual(value("price_cache_lookups_total", result="miss"), 3)
+        self.assertEqual(summary["cache_hit_ratio"], 0.25)
+        self.assertEqual(value("webhook_responses_total", status="204"), 1)
+        self.assertEqual(summary["histograms"]["stock_fetch_seconds"][0]["count"], 3)
+        self.assertEqual(summary["histograms"]["stock_snapshot_seconds"][0]["count"], 2)
+        self.assertIn("webhook_request_seconds_count 1", prometheus)
+
+    @patch("api.stock_api.time.sleep")
+    def test_batch_miss_counted_once(self, mock_sleep):
+        """一括取得で取得できず個別取得した銘柄のキャッシュミスを1回だけ数えるテスト"""
+        config = Config()
+        config.stocks = [
+            StockConfig(symbol="AAA", name="Stock A", market="us"),
+            StockConfig(symbol="BBB", name="Stock B", market="us"),
+        ]
+        config.fetch.batch_size = 10
+        config.fetch.max_workers = 1
+        config.cache.path = ""
+        config.history.path = ""
+
+        # BBBは一括取得の結果に含まれず、個別取得に回る
+        provider = ReplayProvider({"AAA": [{"close": 100.0, "volume": 1}]})
+        api = StockPriceAPI(config, transport=Mock(read_timeout=1.0), provider=provider)
+        api.get_all_prices()
+
+        lookups = {
+            entry["labels"]["result"]: entry["value"]
+            for entry in REGISTRY.summary()["counters"]["price_cache_lookups_total"]
+        }
+        self.assertEqual(lookups, {"miss": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
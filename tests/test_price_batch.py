@@ -0,0 +1,106 @@
+"""
+株価バッチ テスト
+"""
+
+import gc
+import tracemalloc
+import unittest
+from datetime import datetime
+
+import numpy as np
+from conftest import make_price
+
+from api.alert_rules import AlertRule, AlertRuleSet
+from api.market_snapshot import MarketSnapshot
+from api.price_batch import PriceBatch
+from api.stock_api import StockPrice
+
+
+class TestPriceBatch(unittest.TestCase):
+    """株価バッチ テストクラス"""
+
+    def test_round_trip(self):
+        """StockPriceとの相互変換で値が変わらないテスト"""
+        prices = [
+            make_price("AAA", previous_close=99.0, previous_volume=900),
+            make_price("BBB", market="jp", open_price=101.0),
+        ]
+
+        batch = PriceBatch.from_prices(prices)
+
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.to_prices(), prices)
+        self.assertEqual(batch[1], prices[1])
+        self.assertIsNone(batch[1].previous_close)
+        self.assertIsNone(batch[1].previous_volume)
+        self.assertEqual(batch[-1].market, "jp")
+
+    def test_columns_are_typed(self):
+        """列が型付き配列で、行ビューはPythonの数値を返すテスト"""
+        batch = PriceBatch.from_prices(
+            [make_price("AAA", price=np.float64(10.0)), make_price("AAA")]
+        )
+
+        self.assertEqual(batch.price.dtype, np.float64)
+        self.assertEqual(batch.volume.dtype, np.int64)
+        self.assertEqual(batch.symbol_code.tolist(), [0, 0])
+        self.assertIs(type(batch[0].price), float)
+        self.assertIs(type(batch[0].volume), int)
+        with self.assertRaises(ValueError):
+            batch.price[0] = 1.0
+
+    def test_rows_have_no_instance_dict(self):
+        """行ビューがインスタンス辞書を持たないテスト"""
+        row = PriceBatch.from_prices([make_price("AAA")])[0]
+
+        self.assertFalse(hasattr(row, "__dict__"))
+        with self.assertRaises(IndexError):
+            PriceBatch.from_prices([])[0]
+
+    def test_snapshot_alerts_match_list(self):
+        """バッチとStockPriceのリストでアラート判定結果が同じになるテスト"""
+        prices = [
+            make_price("AAA", price=105.0, previous_close=99.0),
+            make_price("BBB", previous_volume=100),
+            make_price("CCC"),
+        ]
+        rules = AlertRuleSet(
+            [AlertRule("price_cross", 100.0), AlertRule("volume_spike", 5.0)]
+        )
+        snapshot = MarketSnapshot.build([], prices)
+
+        self.assertIsInstance(snapshot.prices, PriceBatch)
+        self.assertEqual(
+            [(hit.price.symbol, hit.reasons) for hit in snapshot.alert_hits(rules)],
+            [(hit.price.symbol, hit.reasons) for hit in rules.evaluate(prices)],
+        )
+
+    def test_memory_per_quote(self):
+        """メモリ使用量が小さく、GC対象のオブジェクト数が銘柄数に比例しないテスト"""
+        n = 5000
+        prices = [
+            StockPrice(
+                symbol="AAA",
+                name="AAA Inc.",
+                price=np.float64(i),
+                change=np.float64(1.0),
+                change_percent=1.0,
+                volume=i,
+                timestamp=datetime.now(),
+                market="us",
+            )
+            for i in range(n)
+        ]
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        batch = PriceBatch.from_prices(prices)
+        batch_bytes = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        self.assertLessEqual(batch_bytes / n, 100)
+        self.assertLess(len(gc.get_referents(batch)), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
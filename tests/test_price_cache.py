@@ -0,0 +1,138 @@
+"""
+永続株価キャッシュ テスト
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from conftest import make_price
+
+from api.price_cache import PersistentPriceCache
+from api.stock_api import StockPriceAPI
+from utils.config import Config, StockConfig
+
+
+class TestPersistentPriceCache(unittest.TestCase):
+    """永続株価キャッシュ テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cache", "prices.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_save_and_load(self):
+        """保存した株価を別インスタンスで読み込むテスト"""
+        PersistentPriceCache(self.path).save([make_price("AAA"), make_price("BBB")])
+
+        loaded = PersistentPriceCache(self.path).load([("AAA", "us"), ("BBB", "jp")])
+
+        self.assertEqual(list(loaded), [("AAA", "us")])
+        self.assertEqual(loaded[("AAA", "us")].name, "AAA")
+        self.assertEqual(loaded[("AAA", "us")].price, 100.0)
+
+    def test_migrates_old_schema(self):
+        """以前の列構成のファイルに列を追加して読み書きするテスト"""
+        import sqlite3
+
+        os.makedirs(os.path.dirname(self.path))
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE quotes (symbol TEXT NOT NULL, market TEXT NOT NULL,"
+            " name TEXT NOT NULL, price REAL NOT NULL, change REAL NOT NULL,"
+            " change_percent REAL NOT NULL, volume INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL, PRIMARY KEY (symbol, market)) WITHOUT ROWID"
+        )
+        conn.commit()
+        conn.close()
+
+        price = make_price("AAA")
+        price.previous_close = 99.0
+        cache = PersistentPriceCache(self.path)
+        cache.save([price])
+
+        loaded = cache.load([("AAA", "us")])
+        self.assertEqual(loaded[("AAA", "us")].previous_close, 99.0)
+        self.assertIsNone(loaded[("AAA", "us")].open_price)
+
+    def test_expired_entries_are_ignored(self):
+        """有効期限切れのエントリを返さないテスト"""
+        cache = PersistentPriceCache(self.path, ttl=60)
+        cache.save([make_price("BTC-USD", market="crypto")])
+
+        self.assertEqual(cache.load([("BTC-USD", "crypto")], now=time.time() + 120), {})
+
+    def test_load_many_symbols(self):
+        """バインド変数の上限を超える銘柄数を分割して読み込むテスト"""
+        cache = PersistentPriceCache(self.path)
+        symbols = [f"S{i}" for i in range(1200)]
+        cache.save([make_price(symbol, market="crypto") for symbol in symbols])
+
+        loaded = cache.load([(symbol, "crypto") for symbol in symbols])
+
+        self.assertEqual(len(loaded), 1200)
+
+    def test_closed_market_entries_outlive_ttl(self):
+        """休場中は終値確定後の株価を有効期限後も返すテスト"""
+        jst = ZoneInfo("Asia/Tokyo")
+        fetched = datetime(2026, 10, 16, 16, 0, tzinfo=jst)
+        cache = PersistentPriceCache(self.path, ttl=60)
+        cache.save([make_price("^N225", market="jp", timestamp=fetched)])
+
+        # 週末（土曜）は月曜の寄り付きまで有効
+        saturday = datetime(2026, 10, 17, 12, 0, tzinfo=jst).timestamp()
+        monday = datetime(2026, 10, 19, 10, 0, tzinfo=jst).timestamp()
+        self.assertIn(("^N225", "jp"), cache.load([("^N225", "jp")], now=saturday))
+        self.assertEqual(cache.load([("^N225", "jp")], now=monday), {})
+
+    def test_api_reuses_quotes_across_runs(self):
+        """単発実行をまたいで株価を再利用するテスト"""
+        config = Config()
+        config.stocks = [StockConfig(symbol="AAA", name="AAA Inc.", market="us")]
+        config.fetch.batch_size = 1
+        config.cache.path = self.path
+
+        first = StockPriceAPI(config)
+        with patch.object(
+            first, "_fetch_with_retry", return_value=make_price("AAA")
+        ) as mock_fetch:
+            first.get_all_prices()
+        mock_fetch.assert_called_once()
+
+        second = StockPriceAPI(config)
+        with patch.object(second, "_fetch_with_retry") as mock_fetch:
+            prices = second.get_all_prices()
+        mock_fetch.assert_not_called()
+        self.assertEqual([p.symbol for p in prices], ["AAA"])
+
+    def test_api_does_not_refresh_expired_memory_entries(self):
+        """継続実行中は期限切れのメモリキャッシュを永続キャッシュで上書きしないテスト"""
+        config = Config()
+        config.stocks = [StockConfig(symbol="BTC-USD", name="BTC", market="crypto")]
+        config.fetch.batch_size = 1
+        config.cache.path = self.path
+        config.cache.memory_ttl = 60
+
+        api = StockPriceAPI(config)
+        with patch.object(
+            api,
+            "_fetch_with_retry",
+            return_value=make_price("BTC-USD", market="crypto"),
+        ) as mock_fetch:
+            api.get_all_prices()
+            # メモリの有効期限（60秒）切れ、永続キャッシュの有効期限（600秒）内
+            api.cache.clock = lambda: time.time() + 120
+            api.get_all_prices()
+
+        self.assertEqual(mock_fetch.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+株価履歴ストア テスト
+"""
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from conftest import make_price
+
+from utils.price_history import PriceHistoryStore
+
+
+class TestPriceHistoryStore(unittest.TestCase):
+    """株価履歴ストア テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.base = datetime(2026, 10, 16, 9, 0)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _ms(self, minutes):
+        return int((self.base + timedelta(minutes=minutes)).timestamp() * 1000)
+
+    def test_append_and_range_scan(self):
+        """追記した履歴を別インスタンスから範囲検索するテスト"""
+        store = PriceHistoryStore(self.tmpdir.name)
+        for minute in range(10):
+            at = self.base + timedelta(minutes=minute)
+            store.append(
+                [
+                    make_price("AAA", price=100.0 + minute, timestamp=at),
+                    make_price(
+                        "7203.T", market="jp", price=2000.0 + minute, timestamp=at
+                    ),
+                ]
+            )
+
+        reopened = PriceHistoryStore(self.tmpdir.name)
+        self.assertEqual(len(reopened), 20)
+
+        history = reopened.history("AAA", "us", start=self._ms(3), end=self._ms(6))
+        self.assertEqual(list(history["price"]), [103.0, 104.0, 105.0])
+        self.assertNotIn("symbol_id", history)
+
+        window = reopened.scan(start=self._ms(8))
+        self.assertEqual(len(window["price"]), 4)
+
+        self.assertEqual(len(reopened.history("ZZZ", "us")["price"]), 0)
+
+    def test_symbol_index_follows_appends(self):
+        """銘柄の索引が検索後の追記にも追従するテスト"""
+        store = PriceHistoryStore(self.tmpdir.name)
+        for minute in range(3):
+            at = self.base + timedelta(minutes=minute)
+            store.append([make_price("AAA", price=100.0 + minute, timestamp=at)])
+        self.assertEqual(
+            list(store.history("AAA", "us")["price"]), [100.0, 101.0, 102.0]
+        )
+
+        for minute in range(3, 6):
+            at = self.base + timedelta(minutes=minute)
+            store.append(
+                [
+                    make_price("AAA", price=100.0 + minute, timestamp=at),
+                    make_price("BBB", price=1.0, timestamp=at),
+                ]
+            )
+
+        history = store.history("AAA", "us", start=self._ms(2), end=self._ms(5))
+        self.assertEqual(list(history["price"]), [102.0, 103.0, 104.0])
+        self.assertEqual(len(store.history("BBB", "us")["price"]), 3)
+        self.assertEqual(len(store.history("BBB", "us", end=self._ms(3))["price"]), 0)
+
+    def test_out_of_order_rows_are_dropped(self):
+        """保存済みより古い行を追記しないテスト"""
+        store = PriceHistoryStore(self.tmpdir.name)
+        store.append(
+            [make_price("AAA", price=100.0, timestamp=self.base + timedelta(minutes=5))]
+        )
+
+        added = store.append(
+            [
+                make_price("AAA", price=90.0, timestamp=self.base),
+                make_price(
+                    "AAA", price=110.0, timestamp=self.base + timedelta(minutes=6)
+                ),
+            ]
+        )
+
+        self.assertEqual(added, 1)
+        self.assertEqual(list(store.history("AAA", "us")["price"]), [100.0, 110.0])
+
+    def test_torn_append_is_repaired(self):
+        """途中で中断した追記を再オープン時に切り詰めるテスト"""
+        store = PriceHistoryStore(self.tmpdir.name)
+        store.append([make_price("AAA", price=100.0, timestamp=self.base)])
+        with open(store._column_path("price"), "ab") as f:
+            f.write(b"\x00" * 8)
+
+        reopened = PriceHistoryStore(self.tmpdir.name)
+
+        self.assertEqual(len(reopened), 1)
+        self.assertEqual(reopened._column_rows("price"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+株価メモリキャッシュ テスト
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from conftest import make_price
+
+from api.quote_cache import FRESH, STALE, QuoteCache
+from api.quote_providers import ReplayProvider
+from api.stock_api import StockPriceAPI
+from utils.config import Config, StockConfig
+
+
+class FakeClock:
+    """テスト用の時計"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestQuoteCache(unittest.TestCase):
+    """株価メモリキャッシュ テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        self.clock = FakeClock()
+
+    def test_lru_eviction(self):
+        """上限を超えると最も長く参照されていない銘柄から捨てるテスト"""
+        cache = QuoteCache(max_entries=2, clock=self.clock)
+        cache.put("A", make_price("A", market="crypto"))
+        cache.put("B", make_price("B", market="crypto"))
+        self.assertIsNotNone(cache.get("A"))  # Aを参照したのでBが最も古い
+
+        cache.put("C", make_price("C", market="crypto"))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIn("A", cache)
+        self.assertNotIn("B", cache)
+        self.assertIn("C", cache)
+
+    def test_ttl_per_market_and_age(self):
+        """市場ごとの有効期限と、日をまたいだ経過時間の計算のテスト"""
+        cache = QuoteCache(ttl=60, market_ttls={"fast": 10}, clock=self.clock)
+        cache.put("A", make_price("A", market="crypto"))
+        cache.put("F", make_price("F", market="fast"))
+
+        self.clock.now += 30
+        self.assertIsNotNone(cache.get("A"))
+        self.assertIsNone(cache.get("F"))
+
+        # 1日と10秒経過した株価は期限切れ（timedelta.secondsでは10秒になる）
+        cache.put("A", make_price("A", market="crypto"))
+        self.clock.now += 86400 + 10
+        self.assertEqual(cache.age("A"), 86410)
+        self.assertIsNone(cache.get("A"))
+
+    def test_stale_window(self):
+        """期限切れでもstale_ttl以内は再検証中の値として返すテスト"""
+        cache = QuoteCache(ttl=60, stale_ttl=300, clock=self.clock)
+        cache.put("A", make_price("A", market="crypto"))
+
+        self.assertEqual(cache.lookup("A")[1], FRESH)
+        self.clock.now += 120
+        self.assertEqual(cache.lookup("A")[1], STALE)
+        self.clock.now += 300
+        self.assertEqual(cache.lookup("A"), (None, None))
+
+    def test_stale_while_revalidate(self):
+        """期限切れの株価を待たずに返し、バックグラウンドで更新するテスト"""
+        config = Config()
+        config.stocks = [StockConfig(symbol="AAA", name="Stock A", market="crypto")]
+        config.fetch.batch_size = 1
+        config.cache.path = ""
+        config.history.path = ""
+
+        provider = ReplayProvider(
+            {"AAA": [{"close": 90.0}, {"close": 100.0}, {"close": 110.0}]}
+        )
+        replay_fetch = provider.fetch
+        release = threading.Event()
+
+        def slow_fetch(symbol, name, market):
+            if provider.calls:  # 2回目以降（更新）は解放されるまで待つ
+                release.wait(5)
+            return replay_fetch(symbol, name, market)
+
+        provider.fetch = slow_fetch
+        api = StockPriceAPI(config, transport=Mock(read_timeout=1.0), provider=provider)
+        api.cache.clock = self.clock
+        api.start_background_refresh()
+        self.addCleanup(api.stop_background_refresh)
+
+        self.assertEqual(api.get_all_prices()[0].price, 100.0)
+
+        self.clock.now += config.cache.memory_ttl + 1
+        started = time.monotonic()
+        prices = api.get_all_prices()
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(prices[0].price, 100.0)
+
+        release.set()
+        api.stop_background_refresh()
+        self.assertEqual(api.get_all_prices()[0].price, 110.0)
+        self.assertEqual(provider.calls["AAA"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
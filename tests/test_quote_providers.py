@@ -0,0 +1,212 @@
+"""
+株価取得元 テスト
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from api.quote_providers import (
+    RateLimitError,
+    ReplayProvider,
+    YahooChartProvider,
+    create_provider,
+)
+from api.stock_api import StockPriceAPI
+from utils.config import Config, StockConfig
+from utils.metrics import REGISTRY
+from utils.rate_limiter import AdaptiveRateLimiter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHART_PAYLOAD = {
+    "chart": {
+        "result": [
+            {
+                "meta": {"symbol": "AAPL", "currency": "USD"},
+                "timestamp": [1760400000, 1760486400, 1760572800],
+                "indicators": {
+                    "quote": [
+                        {
+                            "open": [98.0, 101.0, 104.0],
+                            "close": [99.0, 100.0, None],
+                            "volume": [900, 1000, None],
+                        }
+                    ]
+                },
+            }
+        ],
+        "error": None,
+    }
+}
+
+
+def _response(status, payload=None):
+    response = Mock(status_code=status)
+    response.json.return_value = payload
+    if status >= 400:
+        import requests
+
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            response=response
+        )
+    return response
+
+
+class TestQuoteProviders(unittest.TestCase):
+    """株価取得元 テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        self.config = Config()
+        self.config.stocks = [
+            StockConfig(symbol="AAA", name="Stock A", market="us"),
+            StockConfig(symbol="BBB", name="Stock B", market="jp"),
+        ]
+
+    def test_parse_chart(self):
+        """チャートAPIのJSONから未確定の日足を除いて株価を作成するテスト"""
+        price = YahooChartProvider.parse_chart("AAPL", "Apple", "us", CHART_PAYLOAD)
+
+        self.assertEqual(price.price, 100.0)
+        self.assertEqual(price.previous_close, 99.0)
+        self.assertEqual(price.previous_volume, 900)
+        self.assertEqual(price.open_price, 101.0)
+        self.assertEqual(price.volume, 1000)
+        self.assertAlmostEqual(price.change_percent, 100 / 99 * 100 - 100)
+        self.assertIsInstance(price.volume, int)
+
+        empty = {"chart": {"result": None, "error": {"code": "Not Found"}}}
+        self.assertIsNone(YahooChartProvider.parse_chart("X", "X", "us", empty))
+
+    @patch("api.stock_api.time.sleep")
+    def test_chart_provider_retries_rate_limit(self, mock_sleep):
+        """チャートAPIの429はリトライし、404はリトライしないテスト"""
+        transport = Mock(read_timeout=10.0)
+        transport.get.side_effect = [_response(429), _response(200, CHART_PAYLOAD)]
+        self.config.fetch.rate_limit = 0  # 送信ペースの調整はtest_rate_limiterで確認
+        api = StockPriceAPI(
+            self.config, transport=transport, provider=YahooChartProvider(transport)
+        )
+
+        price = api.get_stock_price("AAPL", "Apple", "us")
+
+        self.assertEqual(price.price, 100.0)
+        self.assertEqual(transport.get.call_count, 2)
+        mock_sleep.assert_called_once()
+
+        transport.get.side_effect = [_response(404)]
+        self.assertIsNone(api.get_stock_price("NONE", "None", "us"))
+        self.assertEqual(transport.get.call_count, 3)
+
+        with self.assertRaises(RateLimitError):
+            transport.get.side_effect = [_response(429)]
+            YahooChartProvider(transport).fetch("AAPL", "Apple", "us")
+
+    @patch("api.stock_api.time.sleep")
+    @patch("api.quote_providers.yf.download")
+    @patch("api.quote_providers.yf.Ticker")
+    def test_yfinance_rate_limit(self, mock_ticker, mock_download, mock_sleep):
+        """yfinanceのYFRateLimitErrorをレート制限として扱い、送信レートを下げるテスト"""
+        from yfinance.exceptions import YFRateLimitError
+
+        REGISTRY.reset()
+        self.addCleanup(REGISTRY.reset)
+        mock_download.side_effect = YFRateLimitError()
+        mock_ticker.return_value.history.side_effect = YFRateLimitError()
+        api = StockPriceAPI(self.config, transport=Mock(read_timeout=1.0))
+        api.rate_limiter = AdaptiveRateLimiter(5.0, burst=5, sleep=Mock())
+
+        self.assertEqual(api.get_all_prices(), [])
+
+        # 一括取得1回 + 個別取得（2銘柄 x 3回）がすべてレート制限
+        rate_limited = REGISTRY.counter("stock_fetch_rate_limited_total")
+        self.assertEqual(rate_limited.value(provider="yfinance"), 7)
+        self.assertEqual(api.rate_limiter.rate, 2.5)
+        # レート制限は銘柄の失敗として記録しない
+        self.assertEqual(api.symbol_health.records, {})
+
+    def test_replay_provider(self):
+        """フィクスチャの日足を1日ずつ再生するテスト"""
+        provider = ReplayProvider(
+            {
+                "AAA": [
+                    {"close": 100.0, "volume": 10},
+                    {"close": 110.0, "volume": 20, "open": 105.0},
+                    {"close": 99.0, "volume": 30},
+                ]
+            }
+        )
+
+        first = provider.fetch("AAA", "Stock A", "us")
+        self.assertEqual((first.price, first.previous_close), (110.0, 100.0))
+        self.assertEqual(first.open_price, 105.0)
+        self.assertAlmostEqual(first.change_percent, 10.0)
+
+        second = provider.fetch("AAA", "Stock A", "us")
+        third = provider.fetch("AAA", "Stock A", "us")
+        self.assertEqual(second.price, 99.0)
+        self.assertEqual(third.price, 99.0)
+        self.assertEqual(provider.calls["AAA"], 3)
+        self.assertIsNone(provider.fetch("ZZZ", "Unknown", "us"))
+
+    def test_replay_from_config(self):
+        """設定で選択したreplay取得元でスナップショットを作成するテスト"""
+        fixture = {
+            "AAA": [{"close": 100.0, "volume": 10}, {"close": 103.0, "volume": 20}],
+            "BBB": [{"close": 50.0, "volume": 10}, {"close": 45.0, "volume": 20}],
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "quotes.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(fixture, f)
+
+            self.config.fetch.provider = "replay"
+            self.config.fetch.fixture_path = path
+            api = StockPriceAPI(self.config, transport=Mock(read_timeout=1.0))
+
+        self.assertIsInstance(api.provider, ReplayProvider)
+        snapshot = api.get_snapshot()
+        self.assertEqual([p.price for p in snapshot.prices], [103.0, 45.0])
+        self.assertEqual([p.symbol for p in snapshot.alerts()], ["BBB"])
+
+    def test_unknown_provider(self):
+        """未対応の取得元を指定するとエラーになるテスト"""
+        self.config.fetch.provider = "bloomberg"
+        with self.assertRaises(ValueError):
+            create_provider(self.config, Mock(read_timeout=1.0))
+
+    def test_chart_provider_avoids_pandas(self):
+        """yahoo_chartで株価を取得してもpandasを読み込まないテスト"""
+        code = (
+            "import sys\n"
+            "from unittest.mock import Mock\n"
+            "from api.quote_providers import YahooChartProvider\n"
+            "from utils.config import Config\n"
+            "from api.stock_api import StockPriceAPI\n"
+            f"payload = {CHART_PAYLOAD!r}\n"
+            "transport = Mock(read_timeout=1.0)\n"
+            "transport.get.return_value = Mock(status_code=200, json=lambda: payload)\n"
+            "api = StockPriceAPI(Config(), transport, YahooChartProvider(transport))\n"
+            "assert api.get_stock_price('AAPL', 'Apple', 'us').price == 100.0\n"
+            "print('pandas' in sys.modules)\n"
+        )
+        with tempfile.TemporaryDirectory() as cwd:
+            result = subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=cwd,
+                capture_output=True,
+                text=True,
+                check=True,
+                env=dict(os.environ, PYTHONPATH=ROOT),
+            )
+
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+株価取得シミュレーター テスト
+"""
+
+import unittest
+
+from benchmarks.fetch_throughput import percentile, run
+from benchmarks.quote_simulator import (
+    EMPTY,
+    ERROR,
+    OK,
+    RATE_LIMITED,
+    FaultInjector,
+    FaultProfile,
+)
+
+
+class TestQuoteSimulator(unittest.TestCase):
+    """株価取得シミュレーター テストクラス"""
+
+    def test_injector_is_deterministic(self):
+        """同じシードなら同じ障害を同じ順に注入するテスト"""
+        profile = FaultProfile(
+            latency_ms=1.0, error_rate=0.2, rate_limit_rate=0.2, empty_rate=0.2, seed=7
+        )
+        injector_a, injector_b = FaultInjector(profile), FaultInjector(profile)
+        outcomes_a = [injector_a.decide(f"S{i}") for i in range(200)]
+        outcomes_b = [injector_b.decide(f"S{i}") for i in range(200)]
+
+        self.assertEqual(outcomes_a, outcomes_b)
+        kinds = {outcome for outcome, _ in outcomes_a}
+        self.assertEqual(kinds, {OK, ERROR, RATE_LIMITED, EMPTY})
+
+    def test_max_rps_rejects_bursts(self):
+        """許容リクエスト数を超えた分は429になるテスト"""
+        injector = FaultInjector(FaultProfile(latency_ms=0.0, max_rps=5))
+        outcomes = [injector.decide("AAA")[0] for _ in range(10)]
+
+        self.assertEqual(outcomes.count(OK), 5)
+        self.assertEqual(outcomes.count(RATE_LIMITED), 5)
+        self.assertEqual(injector.stats.retries, 9)
+
+    def test_benchmark_counts_retries(self):
+        """障害を注入した取得でリトライ回数と失敗銘柄を集計するテスト"""
+        profile = FaultProfile(
+            latency_ms=1.0, error_rate=0.1, rate_limit_rate=0.1, empty_rate=0.1
+        )
+        for mode in ("provider", "http"):
+            with self.subTest(mode=mode):
+                result = run(200, profile, mode=mode, workers=4, backoff_scale=0.0)
+
+                self.assertEqual(result["symbols"], 200)
+                self.assertGreater(result["retries"], 0)
+                self.assertEqual(result["requests"], 200 + result["retries"])
+                self.assertLess(result["failed"], 40)
+                self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+                self.assertGreater(result["throughput"], 0)
+
+    def test_percentile(self):
+        """最近傍順位法のパーセンタイルテスト"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3.0], 99), 3.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+レート制限 テスト
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+
+from api.quote_providers import YahooChartProvider
+from api.stock_api import StockPriceAPI
+from benchmarks.fetch_throughput import run
+from benchmarks.quote_simulator import FaultProfile
+from utils.config import Config, _parse_number_map
+from utils.rate_limiter import AdaptiveRateLimiter, get_rate_limiter
+
+
+class FakeClock:
+    """sleepで進むテスト用の時計"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    """レート制限 テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        self.clock = FakeClock()
+
+    def limiter(self, rate: float, burst: int = 1, **kwargs) -> AdaptiveRateLimiter:
+        return AdaptiveRateLimiter(
+            rate, burst=burst, clock=self.clock, sleep=self.clock.sleep, **kwargs
+        )
+
+    def test_token_bucket(self):
+        """バーストを使い切ると1/rate秒間隔で送信するテスト"""
+        limiter = self.limiter(10.0, burst=3)
+
+        waits = [limiter.acquire() for _ in range(5)]
+
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 0.1)
+        self.assertAlmostEqual(waits[4], 0.1)
+        self.assertAlmostEqual(self.clock.now, 0.2)
+
+    def test_aimd(self):
+        """429でレートを半減し（同時の429は1回分）、成功が続くと上限まで戻すテスト"""
+        limiter = self.limiter(8.0, burst=4, increase=1.0)
+
+        self.assertTrue(limiter.on_throttle())
+        self.assertFalse(limiter.on_throttle())  # cooldown以内
+        self.assertEqual(limiter.rate, 4.0)
+        # 貯まっていたトークンは捨てる
+        self.assertAlmostEqual(limiter.acquire(), 0.25)
+
+        for _ in range(100):
+            limiter.acquire()
+            limiter.on_success()
+        self.assertEqual(limiter.rate, 8.0)
+
+        for _ in range(20):
+            self.clock.now += 1.0
+            limiter.on_throttle()
+        self.assertEqual(limiter.rate, limiter.min_rate)
+
+    def test_shared_per_host(self):
+        """ホストごとに共有し、ホスト別の上限と無効化を設定できるテスト"""
+        config = Config()
+        config.fetch.rate_limit = 2.0
+        config.fetch.host_rate_limits = _parse_number_map(
+            "fast.example=50, off.example=0"
+        )
+
+        limiter = get_rate_limiter(config, "default.example")
+        self.assertIs(get_rate_limiter(config, "default.example"), limiter)
+        self.assertEqual(limiter.max_rate, 2.0)
+        self.assertEqual(get_rate_limiter(config, "fast.example").max_rate, 50.0)
+        self.assertIsNone(get_rate_limiter(config, "off.example"))
+        self.assertIsNone(get_rate_limiter(config, ""))
+
+    @patch("api.stock_api.time.sleep")
+    def test_stock_api_slows_down_on_429(self, mock_sleep):
+        """株価取得の429でホストの送信レートを下げるテスト"""
+        config = Config()
+        config.stocks = []
+        transport = Mock(read_timeout=1.0)
+        ok = Mock(status_code=200)
+        ok.json.return_value = {
+            "chart": {
+                "result": [
+                    {"indicators": {"quote": [{"close": [100.0], "volume": [1]}]}}
+                ]
+            }
+        }
+        transport.get.side_effect = [Mock(status_code=429), ok]
+        provider = YahooChartProvider(transport)
+        api = StockPriceAPI(config, transport=transport, provider=provider)
+        self.assertEqual(api.rate_limiter.host, "query1.finance.yahoo.com")
+        api.rate_limiter = self.limiter(4.0)
+
+        price = api.get_stock_price("AAPL", "Apple", "us")
+
+        self.assertEqual(price.price, 100.0)
+        # 429で4.0から半減し、再試行の成功で少し戻る（上限の5%/秒）
+        self.assertAlmostEqual(api.rate_limiter.rate, 2.0 + 0.2 / 2.0)
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+    def test_benchmark_avoids_throttling(self):
+        """上限のあるシミュレーターに対して429で失敗する銘柄を出さないテスト"""
+        profile = FaultProfile(latency_ms=1.0, max_rps=50.0, seed=1)
+
+        baseline = run(150, profile)
+        result = run(150, profile, rate_limit=100.0)
+
+        self.assertGreater(baseline["failed"], 0)
+        self.assertEqual(result["failed"], 0)
+        self.assertLess(result["rate_limited"], baseline["rate_limited"])
+        self.assertLess(result["final_rate"], 100.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
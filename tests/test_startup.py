@@ -0,0 +1,34 @@
+"""
+起動時の遅延インポート テスト
+"""
+
+import unittest
+
+from benchmarks.startup_time import ENTRY_PATHS, measure
+from utils.lazy_import import LazyModule
+
+
+class TestStartup(unittest.TestCase):
+    """起動時の遅延インポート テストクラス"""
+
+    def test_entry_paths_do_not_load_heavy_modules(self):
+        """各エントリーポイントの読み込みで重い依存パッケージを読み込まないテスト"""
+        for entry in ENTRY_PATHS:
+            with self.subTest(entry=entry.name):
+                result = measure(entry, runs=1)
+                self.assertFalse(
+                    set(result["heavy_modules"]) & set(entry.forbidden),
+                    result["heavy_modules"],
+                )
+
+    def test_lazy_module_imports_on_first_access(self):
+        """属性に初めてアクセスした時にインポートするテスト"""
+        module = LazyModule("json")
+        self.assertIn("not loaded", repr(module))
+
+        self.assertEqual(module.dumps([1]), "[1]")
+        self.assertIn("(loaded)", repr(module))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,7 +18,7 @@ class TestStockPriceAPI(unittest.TestCase):
         self.config = Config()
         self.api = StockPriceAPI(self.config)
 
-    @patch("api.stock_api.yf.Ticker")
+    @patch("api.quote_providers.yf.Ticker")
     def test_get_stock_price_success(self, mock_ticker):
         """株価取得成功テスト"""
         # モックデータの準備
@@ -45,7 +45,7 @@ class TestStockPriceAPI(unittest.TestCase):
         self.assertEqual(result.change, 5.0)
         self.assertEqual(result.change_percent, 5.0)
 
-    @patch("api.stock_api.yf.Ticker")
+    @patch("api.quote_providers.yf.Ticker")
     def test_get_stock_price_failure(self, mock_ticker):
         """株価取得失敗テスト"""
         # モックデータの準備
@@ -64,6 +64,175 @@ class TestStockPriceAPI(unittest.TestCase):
         # 検証
         self.assertIsNone(result)
 
+    @patch("api.quote_providers.yf.Ticker")
+    @patch("api.quote_providers.yf.download")
+    def test_get_all_prices_batched(self, mock_download, mock_ticker):
+        """一括取得テスト（取得できなかった銘柄は個別取得にフォールバック）"""
+        import pandas as pd
+
+        self.config.stocks = [
+            StockConfig(symbol="AAA", name="Stock A", market="us"),
+            StockConfig(symbol="BBB", name="Stock B", market="jp"),
+            StockConfig(symbol="CCC", name="Stock C", market="us"),
+        ]
+        self.config.fetch.batch_size = 50
+
+        # 市場ごとに営業日が異なるため、BBBには欠損行がある
+        columns = pd.MultiIndex.from_product([["AAA", "BBB"], ["Close", "Volume"]])
+        mock_download.return_value = pd.DataFrame(
+            [[100.0, 1000, None, None], [110.0, 1100, 200.0, 2000]],
+            columns=columns,
+        )
+
+        mock_ticker_instance = Mock()
+        mock_ticker.return_value = mock_ticker_instance
+        mock_ticker_instance.history.return_value = pd.DataFrame(
+            {"Close": [50.0, 45.0], "Volume": [500, 600]}
+        )
+
+        prices = self.api.get_all_prices()
+
+        mock_download.assert_called_once()
+        self.assertEqual(mock_download.call_args[0][0], ["AAA", "BBB", "CCC"])
+        mock_ticker.assert_called_once_with("CCC")
+
+        self.assertEqual([p.symbol for p in prices], ["AAA", "BBB", "CCC"])
+        self.assertAlmostEqual(prices[0].change_percent, 10.0)
+        self.assertEqual(prices[1].price, 200.0)
+        self.assertEqual(prices[1].change, 0.0)
+        self.assertAlmostEqual(prices[2].change_percent, -10.0)
+
+    @patch("api.quote_providers.yf.Ticker")
+    @patch("api.quote_providers.yf.download")
+    def test_get_all_prices_batch_disabled(self, mock_download, mock_ticker):
+        """一括取得無効時は個別取得のみ行うテスト"""
+        import pandas as pd
+
+        self.config.stocks = [StockConfig(symbol="AAA", name="Stock A", market="us")]
+        self.config.fetch.batch_size = 1
+
+        mock_ticker_instance = Mock()
+        mock_ticker.return_value = mock_ticker_instance
+        mock_ticker_instance.history.return_value = pd.DataFrame(
+            {"Close": [100.0, 105.0], "Volume": [1000, 1100]}
+        )
+
+        prices = self.api.get_all_prices()
+
+        mock_download.assert_not_called()
+        self.assertEqual(len(prices), 1)
+        self.assertIsInstance(prices[0], StockPrice)
+
+    def test_get_all_prices_parallel(self):
+        """並列取得テスト（銘柄リスト順・銘柄単位のエラー分離）"""
+        import threading
+
+        self.config.stocks = [
+            StockConfig(symbol=f"S{i}", name=f"Stock {i}", market="us")
+            for i in range(8)
+        ]
+        self.config.fetch.batch_size = 1
+        self.config.fetch.max_workers = 8
+
+        # 8銘柄の取得が同時に進まない限り待ちがタイムアウトする
+        barrier = threading.Barrier(8, timeout=5)
+
+        def fake_fetch(symbol, name, market):
+            barrier.wait()
+            if symbol == "S3":
+                raise RuntimeError("network down")
+            return StockPrice(
+                symbol=symbol,
+                name=name,
+                price=100.0,
+                change=0.0,
+                change_percent=0.0,
+                volume=0,
+                timestamp=datetime.now(),
+                market=market,
+            )
+
+        with patch.object(self.api, "_fetch_with_retry", side_effect=fake_fetch):
+            prices = self.api.get_all_prices()
+
+        self.assertFalse(barrier.broken)
+        self.assertEqual(
+            [p.symbol for p in prices], [f"S{i}" for i in range(8) if i != 3]
+        )
+
+    def test_get_snapshot_alerts(self):
+        """スナップショットのアラート判定テスト（銘柄ごとの閾値）"""
+        self.config.stocks = [
+            StockConfig(symbol="AAA", name="Stock A", market="us", threshold=5.0),
+            StockConfig(symbol="BBB", name="Stock B", market="jp", threshold=2.0),
+            StockConfig(symbol="CCC", name="Stock C", market="us", threshold=5.0),
+        ]
+
+        def make_price(symbol, market, change_percent):
+            return StockPrice(
+                symbol=symbol,
+                name=symbol,
+                price=100.0,
+                change=change_percent,
+                change_percent=change_percent,
+                volume=0,
+                timestamp=datetime.now(),
+                market=market,
+            )
+
+        fetched = [make_price("AAA", "us", 3.0), make_price("BBB", "jp", -3.0), None]
+        with patch.object(self.api, "_fetch_watchlist", return_value=fetched) as mock:
+            snapshot = self.api.get_snapshot()
+
+        mock.assert_called_once()
+        self.assertEqual([p.symbol for p in snapshot.prices], ["AAA", "BBB"])
+        self.assertEqual([p.symbol for p in snapshot.alerts()], ["BBB"])
+        self.assertEqual([p.symbol for p in snapshot.by_market("us")], ["AAA"])
+        with self.assertRaises(Exception):
+            snapshot.prices = ()
+
+        # check_price_alertsは設定のルールを一度だけ作成して再利用する
+        from api.alert_rules import AlertRuleSet
+
+        with patch.object(
+            self.api, "_fetch_watchlist", return_value=fetched
+        ), patch.object(
+            AlertRuleSet, "from_config", wraps=AlertRuleSet.from_config
+        ) as mock_rules:
+            first = self.api.check_price_alerts()
+            second = self.api.check_price_alerts()
+
+        mock_rules.assert_called_once()
+        self.assertEqual([p.symbol for p in first], ["BBB"])
+        self.assertEqual([p.symbol for p in second], ["BBB"])
+
+    def test_history_records_fresh_fetches_only(self):
+        """新たに取得した株価のみ履歴に追記するテスト"""
+        import tempfile
+
+        self.config.stocks = [StockConfig(symbol="AAA", name="Stock A", market="us")]
+        self.config.fetch.batch_size = 1
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.config.history.path = tmpdir
+            api = StockPriceAPI(self.config)
+            fetched = StockPrice(
+                symbol="AAA",
+                name="Stock A",
+                price=100.0,
+                change=1.0,
+                change_percent=1.0,
+                volume=10,
+                timestamp=datetime.now(),
+                market="us",
+            )
+
+            with patch.object(api, "_fetch_with_retry", return_value=fetched):
+                api.get_all_prices()
+                api.get_all_prices()  # キャッシュから取得
+
+            self.assertEqual(len(api.history_store), 1)
+
     def test_cache_functionality(self):
         """キャッシュ機能テスト"""
         # キャッシュにデータを設定
@@ -79,10 +248,11 @@ class TestStockPriceAPI(unittest.TestCase):
         )
 
         cache_key = "TEST_us"
-        self.api.cache[cache_key] = {"data": test_price, "timestamp": datetime.now()}
+        self.api.cache.put(cache_key, test_price)
 
         # キャッシュが有効であることを確認
         self.assertTrue(self.api._is_cache_valid(cache_key))
+        self.assertFalse(self.api._is_cache_valid("NONE_us"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+"""
+株式管理 テスト
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from utils.file_utils import atomic_write_json
+from utils.stock_manager import StockManager
+
+
+def _write_stocks(path, stocks):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"stocks": stocks}, f)
+
+
+def _add_in_process(path, prefix):
+    manager = StockManager(path)
+    for i in range(20):
+        manager.add_stock(f"{prefix}{i:02d}", prefix, "us")
+
+
+class TestStockManager(unittest.TestCase):
+    """株式管理 テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "stocks.json")
+        _write_stocks(
+            self.path,
+            [
+                {"symbol": "7203.T", "name": "トヨタ", "market": "jp"},
+                {"symbol": "AAPL", "name": "Apple", "market": "us"},
+                {"symbol": "MSFT", "name": "Microsoft", "market": "us"},
+            ],
+        )
+        self.manager = StockManager(self.path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_lookups(self):
+        """シンボル・市場別の検索とサマリーのテスト"""
+        self.assertEqual(self.manager.get_stock_by_symbol("AAPL").name, "Apple")
+        self.assertIsNone(self.manager.get_stock_by_symbol("NONE"))
+        self.assertTrue(self.manager.stock_exists("7203.T"))
+        self.assertEqual(
+            [s.symbol for s in self.manager.get_stocks_by_market("us")],
+            ["AAPL", "MSFT"],
+        )
+        self.assertEqual(self.manager.get_stock_count(), 3)
+        self.assertEqual(self.manager.get_market_summary(), {"jp": 1, "us": 2})
+
+    def test_parses_file_once(self):
+        """ファイルが変わらなければ何度呼び出しても1回しか読み込まないテスト"""
+        with patch("utils.stock_manager.json.load", wraps=json.load) as mock_load:
+            for _ in range(10):
+                self.manager.stock_exists("AAPL")
+                self.manager.get_stocks_by_market("us")
+                self.manager.get_stock_count()
+                self.manager.get_market_summary()
+
+        self.assertEqual(mock_load.call_count, 1)
+
+    def test_reloads_when_file_changes(self):
+        """別プロセスがファイルを更新した場合に読み直すテスト"""
+        self.manager.get_stock_count()
+        _write_stocks(
+            self.path, [{"symbol": "BTC-USD", "name": "BTC", "market": "crypto"}]
+        )
+
+        self.assertEqual(self.manager.get_stock_count(), 1)
+        self.assertEqual(self.manager.get_market_summary(), {"crypto": 1})
+
+    def test_add_and_remove_update_index(self):
+        """追加・削除後に読み直さずに索引が更新されるテスト"""
+        self.assertTrue(self.manager.add_stock("NVDA", "NVIDIA", "us"))
+        self.assertFalse(self.manager.add_stock("NVDA", "NVIDIA", "us"))
+        self.assertTrue(self.manager.remove_stock("AAPL"))
+        self.assertFalse(self.manager.remove_stock("AAPL"))
+
+        with patch("utils.stock_manager.json.load") as mock_load:
+            summary = self.manager.get_market_summary()
+        mock_load.assert_not_called()
+        self.assertEqual(summary, {"jp": 1, "us": 2})
+
+        # 別インスタンスからも同じ内容が見える
+        reloaded = StockManager(self.path)
+        self.assertEqual(
+            [s.symbol for s in reloaded.get_all_stocks()], ["7203.T", "MSFT", "NVDA"]
+        )
+
+    def test_add_many_writes_once(self):
+        """まとめて追加した場合に1回だけ書き込み、並び順を保つテスト"""
+        with patch(
+            "utils.stock_manager.atomic_write_json",
+            wraps=atomic_write_json,
+        ) as mock_write:
+            results = self.manager.add_many(
+                [
+                    ("ZZZ", "Z", "us"),
+                    ("AAPL", "Apple", "us"),
+                    ("6758.T", "ソニー", "jp"),
+                ]
+            )
+
+        self.assertEqual(results, [True, False, True])
+        self.assertEqual(mock_write.call_count, 1)
+        self.assertEqual(
+            [s.symbol for s in StockManager(self.path).get_all_stocks()],
+            ["6758.T", "7203.T", "AAPL", "MSFT", "ZZZ"],
+        )
+
+    def test_remove_many(self):
+        """まとめて削除するテスト"""
+        self.assertEqual(self.manager.remove_many(["AAPL", "NONE"]), [True, False])
+        self.assertEqual(self.manager.get_market_summary(), {"jp": 1, "us": 1})
+
+    def test_transaction_rolls_back_on_error(self):
+        """トランザクション中に例外が発生した場合は書き込まないテスト"""
+        with self.assertRaises(RuntimeError):
+            with self.manager.transaction() as transaction:
+                transaction.add("NVDA", "NVIDIA", "us")
+                transaction.clear()
+                raise RuntimeError("abort")
+
+        self.assertEqual(StockManager(self.path).get_stock_count(), 3)
+
+    def test_concurrent_processes_do_not_lose_updates(self):
+        """複数プロセスから同時に追加しても更新が失われないテスト"""
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=_add_in_process, args=(self.path, prefix))
+            for prefix in ("P", "Q", "R")
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=30)
+
+        self.assertEqual(StockManager(self.path).get_stock_count(), 63)
+
+
+if __name__ == "__main__":
+    unittest.main()
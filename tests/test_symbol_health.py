@@ -0,0 +1,154 @@
+"""
+銘柄の取得失敗記録 テスト
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from api.quote_providers import RateLimitError, ReplayProvider
+from api.stock_api import StockPriceAPI
+from api.symbol_health import EMPTY, SymbolHealth
+from utils.config import Config, StockConfig
+
+
+class FakeClock:
+    """テスト用の時計"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSymbolHealth(unittest.TestCase):
+    """銘柄の取得失敗記録 テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        self.clock = FakeClock()
+
+    def test_exponential_backoff(self):
+        """しきい値に達すると取得を止め、失敗のたびにバックオフが倍になるテスト"""
+        health = SymbolHealth(threshold=2, backoff=10, max_backoff=30, clock=self.clock)
+
+        # しきい値未満の失敗では取得を止めず、リトライも減らさない
+        health.record_failure("AAA", "us", EMPTY)
+        self.assertFalse(health.is_blocked("AAA", "us"))
+        self.assertEqual(health.attempts("AAA", "us", 3), 3)
+
+        delays = []
+        for _ in range(4):
+            health.record_failure("AAA", "us", EMPTY)
+            delays.append(health.records["AAA_us"].retry_at - self.clock.now)
+
+        self.assertEqual(delays, [10, 20, 30, 30])
+        self.assertTrue(health.is_blocked("AAA", "us"))
+        self.assertEqual(health.attempts("AAA", "us", 3), 1)
+        self.clock.now += 30
+        self.assertFalse(health.is_blocked("AAA", "us"))
+
+        health.record_success("AAA", "us")
+        self.assertEqual(health.records, {})
+        self.assertEqual(health.attempts("AAA", "us", 3), 3)
+
+    def test_broken_symbols_and_persistence(self):
+        """しきい値に達した銘柄の報告と、ファイルへの保存・読み込みのテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "health.json")
+            health = SymbolHealth(path, threshold=2, clock=self.clock)
+            health.record_failure("AAA", "us", EMPTY)
+            self.assertIsNone(health.summary())
+            health.record_failure("AAA", "us", EMPTY)
+            health.record_failure("BBB", "jp", EMPTY)
+            health.save()
+
+            loaded = SymbolHealth(path, threshold=2, clock=self.clock)
+
+        self.assertEqual(loaded.records, health.records)
+        self.assertEqual([entry["key"] for entry in loaded.broken()], ["AAA_us"])
+        self.assertEqual(loaded.summary(), "AAA_us (2回, empty)")
+
+    @patch("api.stock_api.time.sleep")
+    def test_failing_symbol_is_skipped(self, mock_sleep):
+        """連続失敗した銘柄はバックオフ中は取得せず、明けたら1回だけ試すテスト"""
+        config = Config()
+        config.stocks = [
+            StockConfig(symbol="AAA", name="Stock A", market="us"),
+            StockConfig(symbol="GONE", name="Delisted", market="us"),
+        ]
+        config.fetch.batch_size = 1
+        config.fetch.failure_threshold = 2
+        config.cache.path = ""
+        config.history.path = ""
+
+        replay = ReplayProvider({"AAA": [{"close": 100.0, "volume": 1}]})
+        provider = ReplayProvider({})
+        provider.fetch = Mock(
+            side_effect=lambda symbol, name, market: (
+                replay.fetch(symbol, name, market) if symbol == "AAA" else None
+            )
+        )
+        api = StockPriceAPI(config, transport=Mock(read_timeout=1.0), provider=provider)
+        api.symbol_health.clock = self.clock
+
+        def gone_calls():
+            return sum(1 for c in provider.fetch.call_args_list if c.args[0] == "GONE")
+
+        # 1回目の失敗では取得を止めない
+        self.assertEqual(len(api.get_all_prices()), 1)
+        self.assertEqual(gone_calls(), 3)
+        self.assertFalse(api.symbol_health.is_blocked("GONE", "us"))
+        self.assertEqual(len(api.get_all_prices()), 1)
+        self.assertEqual(gone_calls(), 6)
+
+        # しきい値に達したのでバックオフ中は取得しない
+        self.assertEqual(len(api.get_all_prices()), 1)
+        self.assertEqual(gone_calls(), 6)
+
+        # バックオフ明けはリトライせず1回だけ試す
+        mock_sleep.reset_mock()
+        self.clock.now += config.fetch.failure_backoff
+        api.get_all_prices()
+        self.assertEqual(gone_calls(), 7)
+        mock_sleep.assert_not_called()
+        self.assertEqual(api.symbol_health.records["GONE_us"].failures, 3)
+
+    def test_blocked_symbol_uses_cache(self):
+        """取得停止中の銘柄でも有効なキャッシュの株価は返すテスト"""
+        config = Config()
+        config.stocks = [StockConfig(symbol="AAA", name="Stock A", market="us")]
+        config.cache.path = ""
+        config.history.path = ""
+
+        provider = ReplayProvider({"AAA": [{"close": 100.0, "volume": 1}]})
+        api = StockPriceAPI(config, transport=Mock(read_timeout=1.0), provider=provider)
+        cached = provider.fetch("AAA", "Stock A", "us")
+        api.cache.put("AAA_us", cached)
+        for _ in range(config.fetch.failure_threshold):
+            api.symbol_health.record_failure("AAA", "us", EMPTY)
+
+        self.assertEqual(api.get_all_prices(), [cached])
+        self.assertEqual(provider.calls["AAA"], 1)
+
+    @patch("api.stock_api.time.sleep")
+    def test_rate_limit_is_not_a_failure(self, mock_sleep):
+        """429（レート制限）は銘柄の失敗として記録しないテスト"""
+        config = Config()
+        config.stocks = []
+        config.cache.path = ""
+        config.history.path = ""
+
+        provider = ReplayProvider({})
+        provider.fetch = Mock(side_effect=RateLimitError("429"))
+        api = StockPriceAPI(config, transport=Mock(read_timeout=1.0), provider=provider)
+
+        self.assertIsNone(api._fetch_with_retry("AAA", "Stock A", "us"))
+        self.assertEqual(provider.fetch.call_count, 3)
+        self.assertEqual(api.symbol_health.records, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
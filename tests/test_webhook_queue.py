@@ -0,0 +1,124 @@
+"""
+Discord Webhook配信キュー テスト
+"""
+
+import asyncio
+import unittest
+from unittest.mock import Mock, patch
+
+from bot.webhook_queue import WebhookDeliveryQueue
+
+
+def _response(status, headers=None, text=""):
+    return Mock(status_code=status, headers=headers or {}, text=text)
+
+
+class TestWebhookDeliveryQueue(unittest.TestCase):
+    """Discord Webhook配信キュー テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        self.transport = Mock()
+        self.queue = WebhookDeliveryQueue(
+            "https://example.invalid/webhook", self.transport
+        )
+
+    @patch("bot.webhook_queue.time.sleep")
+    def test_retry_after_429(self, mock_sleep):
+        """429応答のretry_afterに従って再送するテスト"""
+        self.transport.post.side_effect = [
+            _response(429, text='{"retry_after": 1.5, "global": false}'),
+            _response(204),
+        ]
+
+        self.assertTrue(self.queue.send({"content": "hello"}))
+
+        self.assertEqual(self.transport.post.call_count, 2)
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 1.5, places=1)
+        self.assertEqual(self.queue.stats.rate_limited, 1)
+        self.assertEqual(self.queue.stats.delivered, 1)
+        self.assertEqual(self.queue.depth, 0)
+
+    @patch("bot.webhook_queue.time.sleep")
+    def test_waits_for_bucket_reset(self, mock_sleep):
+        """バケットを使い切ったら429を受ける前にリセットまで待つテスト"""
+        self.transport.post.side_effect = [
+            _response(
+                204, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "2.0"}
+            ),
+            _response(
+                204, {"X-RateLimit-Remaining": "4", "X-RateLimit-Reset-After": "2.0"}
+            ),
+        ]
+
+        self.queue.enqueue({"content": "1"})
+        self.queue.enqueue({"content": "2"})
+        self.assertEqual(self.queue.depth, 2)
+        self.assertEqual(self.queue.flush(), 2)
+
+        mock_sleep.assert_called_once()
+        self.assertGreater(mock_sleep.call_args[0][0], 1.5)
+        self.assertEqual(self.queue.stats.rate_limited, 0)
+        self.assertEqual(self.queue.stats.max_depth, 2)
+
+    def test_client_error_is_not_retried(self):
+        """4xx応答は再送しないテスト"""
+        self.transport.post.return_value = _response(400)
+
+        self.assertFalse(self.queue.send({"content": "bad"}))
+
+        self.transport.post.assert_called_once()
+        self.assertEqual(self.queue.stats.failed, 1)
+        self.assertEqual(self.queue.depth, 0)
+
+    def test_delivery_handles(self):
+        """他の呼び出し元のflushで送信されたメッセージの結果をハンドルで確認するテスト"""
+        self.transport.post.side_effect = [_response(204), _response(400)]
+
+        first = self.queue.enqueue({"content": "1"})
+        second = self.queue.enqueue({"content": "2"})
+        self.assertIsNone(first.delivered)
+
+        # 別のジョブのflushが両方を送信する
+        self.assertEqual(self.queue.flush(), 1)
+        self.assertTrue(first.delivered)
+        self.assertFalse(second.delivered)
+
+    def test_latency_stats_are_aggregated(self):
+        """配信遅延を件数によらず合計と最大値で集計するテスト"""
+        self.transport.post.return_value = _response(204)
+
+        for i in range(3):
+            self.assertTrue(self.queue.send({"content": str(i)}))
+
+        summary = self.queue.stats.summary()
+        self.assertEqual(summary["delivered"], 3)
+        self.assertGreaterEqual(summary["max_latency"], summary["average_latency"])
+        self.assertFalse(hasattr(self.queue.stats, "latencies"))
+
+    def test_async_flush_waits_for_sync_flush(self):
+        """asyncio版の送信が同期版の送信と同じロックを待つテスト"""
+        response = Mock(status=204, headers={})
+        response.text = Mock(side_effect=lambda: asyncio.sleep(0, ""))
+        context = Mock()
+        context.__aenter__ = Mock(side_effect=lambda: asyncio.sleep(0, response))
+        context.__aexit__ = Mock(side_effect=lambda *args: asyncio.sleep(0, False))
+        session = Mock()
+        session.post.return_value = context
+
+        async def run():
+            self.queue.enqueue({"content": "hello"})
+            self.queue._lock.acquire()
+            task = asyncio.ensure_future(self.queue.flush_async(session))
+            await asyncio.sleep(0.1)
+            session.post.assert_not_called()
+            self.queue._lock.release()
+            return await task
+
+        self.assertEqual(asyncio.run(run()), 1)
+        self.assertEqual(self.queue.depth, 0)
+        self.assertFalse(self.queue._lock.locked())
+
+
+if __name__ == "__main__":
+    unittest.main()
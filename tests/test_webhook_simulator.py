@@ -0,0 +1,81 @@
+"""
+Discord Webhookスタンドイン テスト
+"""
+
+import json
+import unittest
+
+from benchmarks.delivery_throughput import run
+from benchmarks.webhook_simulator import SimulatedWebhookServer, WebhookProfile
+from bot.webhook_queue import WebhookDeliveryQueue
+from utils.http_client import HTTPTransport
+
+
+class TestWebhookSimulator(unittest.TestCase):
+    """Discord Webhookスタンドイン テストクラス"""
+
+    def setUp(self):
+        """テストセットアップ"""
+        self.transport = HTTPTransport()
+        self.addCleanup(self.transport.close)
+
+    def test_rate_limit_responses(self):
+        """バケットを使い切ると429とretry_afterを返すテスト"""
+        profile = WebhookProfile(limit=2, reset_after=5.0)
+        with SimulatedWebhookServer(profile) as server:
+            responses = [
+                self.transport.post(server.webhook_url, json={"content": str(i)})
+                for i in range(3)
+            ]
+
+        self.assertEqual([r.status_code for r in responses], [204, 204, 429])
+        self.assertEqual(responses[0].headers["X-RateLimit-Remaining"], "1")
+        self.assertEqual(responses[0].text, "")
+        body = json.loads(responses[2].text)
+        self.assertGreater(body["retry_after"], 4.0)
+        self.assertFalse(body["global"])
+        self.assertEqual(server.stats.delivered, 2)
+        self.assertEqual(server.stats.rate_limited, 1)
+
+    def test_rejects_oversized_payloads(self):
+        """埋め込みの上限・本文サイズの上限を超えると拒否するテスト"""
+        too_many = {"embeds": [{"title": str(i)} for i in range(11)]}
+        too_long = {"embeds": [{"description": "x" * 6001}]}
+        profile = WebhookProfile(limit=10, max_body_bytes=1000)
+        with SimulatedWebhookServer(profile) as server:
+            statuses = [
+                self.transport.post(server.webhook_url, json=payload).status_code
+                for payload in (too_many, too_long, {"content": "ok"})
+            ]
+
+        self.assertEqual(statuses, [400, 413, 204])
+        self.assertEqual(server.stats.rejected, 2)
+
+    def test_delivery_queue_waits_for_bucket(self):
+        """配信キューがレート制限ヘッダに従い429を受けずに送信するテスト"""
+        profile = WebhookProfile(limit=3, reset_after=0.2)
+        with SimulatedWebhookServer(profile) as server:
+            queue = WebhookDeliveryQueue(server.webhook_url, self.transport)
+            for i in range(7):
+                queue.enqueue({"content": str(i)})
+            delivered = queue.flush()
+
+        self.assertEqual(delivered, 7)
+        self.assertEqual(server.stats.delivered, 7)
+        self.assertEqual(server.stats.rate_limited, 0)
+
+    def test_end_to_end_benchmark(self):
+        """定期通知とアラートを取得から配信まで計測するテスト"""
+        result = run(300, WebhookProfile(reset_after=0.1, rate_limit_rate=0.1))
+
+        self.assertEqual(result["prices"], 300)
+        self.assertGreater(result["regular_messages"], 1)
+        self.assertGreater(result["alert_messages"], 0)
+        self.assertEqual(result["rejected"], 0)
+        self.assertEqual(result["failed"], 0)
+        self.assertGreater(result["bytes"], 0)
+        self.assertGreaterEqual(result["fetch_to_delivery_s"], result["fetch_s"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,296 @@
+"""
+コマンドキュー - GitHub Issueやキューファイルに溜まったコマンドをまとめて処理
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bot.embed_packer import pack_embeds, split_embed, split_field_lines
+from utils.discord_commands import (
+    DEFAULT_MARKET,
+    CommandResult,
+    DiscordCommandParser,
+    StockCommand,
+)
+from utils.file_utils import atomic_write_json, file_lock
+
+logger = logging.getLogger(__name__)
+
+COMMAND_LABEL = "discord-command"
+# コマンドを読み取れなかったIssueに付け替えるラベル
+INVALID_LABEL = "discord-command-invalid"
+
+# 監視銘柄一覧の市場見出し
+MARKET_LABELS = {
+    "jp": "🇯🇵 日本株",
+    "us": "🇺🇸 米国株",
+    "crypto": "₿ 暗号通貨",
+    "forex": "💱 為替",
+    "eu": "🇪🇺 欧州株",
+    "asia": "🌏 アジア株",
+    "ca": "🇨🇦 カナダ株",
+    "au": "🇦🇺 オーストラリア株",
+}
+
+_REQUESTER_PATTERN = re.compile(r"\*\*リクエスト者\*\*: (.+)")
+_MARKET_PATTERN = re.compile(r"\*\*市場\*\*: (\S+)")
+_ADD_TITLE_PATTERN = re.compile(r"Add Stock: ([A-Z0-9\.\^-]+) \((.+?)\)")
+_REMOVE_TITLE_PATTERN = re.compile(r"Remove Stock: ([A-Z0-9\.\^-]+)")
+
+
+def commands_from_issue(
+    issue: Dict, parser: DiscordCommandParser
+) -> List[StockCommand]:
+    """discord-command Issueからコマンドを取り出す
+
+    本文にコマンド行（!add-stock など）があればそれを使い、なければ
+    DiscordCommandParser.format_github_issue が作成したタイトルから判定する。
+    """
+    title = issue.get("title") or ""
+    body = issue.get("body") or ""
+    requester = _REQUESTER_PATTERN.search(body)
+    user = (
+        requester.group(1).strip()
+        if requester
+        else (issue.get("user") or {}).get("login", "Unknown")
+    )
+
+    commands = parser.parse_commands(body, user)
+    if commands:
+        return commands
+
+    if match := _ADD_TITLE_PATTERN.search(title):
+        market = _MARKET_PATTERN.search(body)
+        return [
+            StockCommand(
+                action="add",
+                symbol=match.group(1),
+                name=match.group(2),
+                market=market.group(1) if market else DEFAULT_MARKET,
+                user=user,
+            )
+        ]
+    if match := _REMOVE_TITLE_PATTERN.search(title):
+        return [
+            StockCommand(
+                action="remove", symbol=match.group(1), name="", market="", user=user
+            )
+        ]
+    if "List Current Stocks" in title:
+        return [StockCommand(action="list", symbol="", name="", market="", user=user)]
+    if "Clear All Stocks" in title:
+        return [StockCommand(action="clear", symbol="", name="", market="", user=user)]
+
+    return []
+
+
+class GitHubIssueQueue:
+    """discord-commandラベルの付いたオープンなIssueをキューとして扱う"""
+
+    API_URL = "https://api.github.com"
+    PER_PAGE = 100
+
+    def __init__(self, repository: str, token: str, transport):
+        self.repository = repository
+        self.transport = transport
+        self.headers = {
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {token}",
+        }
+
+    def _url(self, path: str) -> str:
+        return f"{self.API_URL}/repos/{self.repository}/{path}"
+
+    def open_issues(self) -> List[Dict]:
+        """未処理のコマンドIssueを古い順に取得"""
+        issues = []
+        page = 1
+        while True:
+            response = self.transport.get(
+                self._url("issues"),
+                headers=self.headers,
+                params={
+                    "state": "open",
+                    "labels": COMMAND_LABEL,
+                    "sort": "created",
+                    "direction": "asc",
+                    "per_page": self.PER_PAGE,
+                    "page": page,
+                },
+            )
+            response.raise_for_status()
+            batch = response.json()
+            # プルリクエストもIssue APIで返るため除外
+            issues.extend(issue for issue in batch if "pull_request" not in issue)
+            if len(batch) < self.PER_PAGE:
+                return issues
+            page += 1
+
+    def close(self, number: int, comment: str):
+        """結果をコメントしてIssueを閉じる"""
+        self.transport.post(
+            self._url(f"issues/{number}/comments"),
+            headers=self.headers,
+            json={"body": comment},
+        ).raise_for_status()
+        self.transport.request(
+            "PATCH",
+            self._url(f"issues/{number}"),
+            headers=self.headers,
+            json={"state": "closed"},
+        ).raise_for_status()
+
+    def reject(self, number: int, comment: str):
+        """コメントしてIssueを開いたまま残し、ラベルを付け替えてキューから外す"""
+        self.transport.post(
+            self._url(f"issues/{number}/comments"),
+            headers=self.headers,
+            json={"body": comment},
+        ).raise_for_status()
+        self.transport.post(
+            self._url(f"issues/{number}/labels"),
+            headers=self.headers,
+            json={"labels": [INVALID_LABEL]},
+        ).raise_for_status()
+        self.transport.request(
+            "DELETE",
+            self._url(f"issues/{number}/labels/{COMMAND_LABEL}"),
+            headers=self.headers,
+        ).raise_for_status()
+
+
+def read_queue_file(path, parser: DiscordCommandParser) -> List[StockCommand]:
+    """キューファイル（JSONまたはJSONL）からコマンドを読み込み
+
+    各要素はコマンド文字列、または {"message": "...", "user": "..."}。
+    JSONの場合は要素のリスト、または {"commands": [...]}。
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+
+    text = path.read_text(encoding="utf-8").strip()
+    if not text:
+        return []
+
+    if path.suffix == ".jsonl":
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        data = json.loads(text)
+        entries = data.get("commands", []) if isinstance(data, dict) else data
+
+    commands = []
+    for entry in entries:
+        if isinstance(entry, str):
+            commands.extend(parser.parse_commands(entry))
+        else:
+            commands.extend(
+                parser.parse_commands(
+                    entry.get("message", ""), entry.get("user", "Unknown")
+                )
+            )
+    return commands
+
+
+def clear_queue_file(path):
+    """処理済みのキューファイルを空にする（呼び出し側でロックを取得）"""
+    path = Path(path)
+    if not path.exists():
+        return
+    if path.suffix == ".jsonl":
+        path.write_text("", encoding="utf-8")
+    else:
+        atomic_write_json(path, {"commands": []})
+
+
+def append_queue_file(path, message: str, user: str = "Unknown"):
+    """JSONLのキューファイルにコマンドを追加"""
+    with file_lock(path):
+        with open(path, "a", encoding="utf-8") as f:
+            entry = {"message": message, "user": user}
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def _watchlist_fields(stock_manager) -> List[Dict]:
+    fields = []
+    by_market: Dict[str, List[str]] = {}
+    for stock in stock_manager.get_all_stocks():
+        by_market.setdefault(stock.market, []).append(f"- {stock.symbol}: {stock.name}")
+    for market, lines in by_market.items():
+        fields.extend(split_field_lines(MARKET_LABELS.get(market, market), lines))
+    return fields
+
+
+def build_result_embed(results: List[CommandResult], stock_manager) -> Dict:
+    """処理結果をまとめた1つの埋め込みメッセージを作成"""
+    failed = sum(1 for result in results if not result.success)
+    if not failed:
+        title, color = "✅ 処理完了", 0x00FF00
+    elif failed == len(results):
+        title, color = "❌ 処理失敗", 0xFF0000
+    else:
+        title, color = "⚠️ 一部失敗", 0xFFA500
+
+    lines = [
+        f"{'✅' if result.success else '❌'} `{result.command.action}` {result.message}"
+        for result in results
+    ]
+    fields = split_field_lines("実行結果", lines)
+
+    # 一覧表示のコマンドがあれば処理後の監視銘柄を表示
+    if any(result.command.action == "list" for result in results):
+        fields.extend(_watchlist_fields(stock_manager))
+        if stock_manager.get_stock_count() == 0:
+            fields.append(
+                {"name": "監視銘柄", "value": "監視銘柄が設定されていません。"}
+            )
+
+    return {
+        "title": title,
+        "description": f"{len(results)}件のコマンドを処理しました（失敗 {failed}件）",
+        "color": color,
+        "fields": fields,
+    }
+
+
+def send_result_notification(embed: Dict, webhook_url: str, transport) -> bool:
+    """処理結果をDiscordに送信（上限を超える場合は分割）"""
+    from bot.webhook_queue import WebhookDeliveryQueue
+
+    delivery = WebhookDeliveryQueue(webhook_url, transport)
+    deliveries = [delivery.enqueue(p) for p in pack_embeds(split_embed(embed))]
+    delivery.flush()
+    return all(d.delivered for d in deliveries)
+
+
+def issue_comment(results: Iterable[CommandResult]) -> str:
+    """Issueに残す処理結果のコメント"""
+    results = list(results)
+    if not results:
+        return (
+            "⚠️ コマンドが見つかりませんでした。Issueは開いたままにしています。\n\n"
+            f"本文を修正して `{COMMAND_LABEL}` ラベルを付け直すと再処理されます。"
+        )
+
+    lines = [
+        f"- {'✅' if result.success else '❌'} {result.message}" for result in results
+    ]
+    return "コマンドを処理しました。Discord通知を確認してください。\n\n" + "\n".join(
+        lines
+    )
+
+
+def group_results(
+    results: List[CommandResult], sources: List[Tuple[Optional[int], int]]
+) -> Dict[int, List[CommandResult]]:
+    """Issue番号ごとに処理結果をまとめる（sourcesは(Issue番号, コマンド数)のリスト）"""
+    grouped: Dict[int, List[CommandResult]] = {}
+    position = 0
+    for number, count in sources:
+        if number is not None:
+            grouped[number] = results[position : position + count]
+        position += count
+    return grouped
@@ -3,7 +3,7 @@
 """
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict, List
 
 
@@ -24,6 +24,81 @@ class NotificationConfig:
     webhook_url: str
     interval: int = 300  # 定時通知間隔（秒）
     timezone: str = "Asia/Tokyo"
+    mode: str = "full"  # 'full'（全銘柄）or 'delta'（変化した銘柄のみ）
+    delta_epsilon: float = 0.1  # 差分通知で変化ありとみなす閾値（%）
+    state_path: str = ""  # 差分通知の前回送信状態の保存先（空の場合は保存しない）
+
+
+@dataclass
+class FetchConfig:
+    """株価取得設定"""
+
+    batch_size: int = 50  # 一括取得する銘柄数（1以下で一括取得を無効化）
+    max_workers: int = 8  # 個別取得の最大並列数
+    provider: str = "yfinance"  # 株価取得元（yfinance / yahoo_chart / replay）
+    fixture_path: str = ""  # replayで再生するフィクスチャ（JSON）のパス
+    health_path: str = ""  # 銘柄ごとの取得失敗の記録の保存先（空の場合は保存しない）
+    failure_threshold: int = 3  # 取得を停止する連続失敗回数
+    failure_backoff: float = 300  # 取得停止後に見送る秒数（以降の失敗のたびに倍）
+    failure_backoff_max: float = 86400  # 取得を見送る秒数の上限
+    rate_limit: float = 5.0  # 取得元ホストごとの毎秒リクエスト数の上限（0以下で無制限）
+    rate_limit_burst: int = 5  # 連続して送信できるリクエスト数
+    # ホスト別の上限（rate_limitより優先）
+    host_rate_limits: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class HTTPConfig:
+    """HTTP通信設定"""
+
+    connect_timeout: float = 5.0  # 接続タイムアウト（秒）
+    read_timeout: float = 10.0  # 読み込みタイムアウト（秒）
+    pool_maxsize: int = 10  # ホストごとの最大接続数
+
+
+@dataclass
+class CacheConfig:
+    """株価キャッシュ設定"""
+
+    path: str = ""  # 永続キャッシュのファイルパス（空の場合は無効）
+    ttl: int = 600  # 永続キャッシュの有効期限（秒）
+    memory_ttl: float = 60  # メモリキャッシュの有効期限（秒）
+    # 市場別のメモリキャッシュの有効期限（memory_ttlより優先）
+    market_ttls: Dict[str, float] = field(default_factory=dict)
+    max_entries: int = 5000  # メモリキャッシュの最大銘柄数（超えた分はLRUで破棄）
+    # 継続実行時に期限切れの株価を即座に返し、バックグラウンドで更新する
+    stale_while_revalidate: bool = False
+    stale_ttl: float = 600  # 期限切れの株価を返してよい経過秒数の上限
+
+
+@dataclass
+class HistoryConfig:
+    """株価履歴設定"""
+
+    path: str = ""  # 株価履歴の保存ディレクトリ（空の場合は記録しない）
+
+
+@dataclass
+class MetricsConfig:
+    """メトリクス出力設定"""
+
+    summary_path: str = ""  # JSONサマリーの出力先（空の場合は出力しない）
+    prometheus_path: str = ""  # Prometheusテキスト形式の出力先（空の場合は出力しない）
+
+
+def _parse_number_map(value: str) -> Dict[str, float]:
+    """「キー=数値」のカンマ区切り（例: ``jp=60,crypto=30``）を辞書に変換"""
+    numbers = {}
+    for item in value.split(","):
+        key, sep, number = item.strip().rpartition("=")
+        if sep and key:
+            numbers[key.strip()] = float(number)
+    return numbers
+
+
+def _env_flag(name: str) -> bool:
+    """真偽値の環境変数（true / 1 / yes で有効）"""
+    return os.getenv(name, "").strip().lower() in ("true", "1", "yes")
 
 
 class Config:
@@ -34,9 +109,51 @@ class Config:
             webhook_url=os.getenv("DISCORD_WEBHOOK_URL", ""),
             interval=int(os.getenv("NOTIFICATION_INTERVAL", "300")),
             timezone=os.getenv("TIMEZONE", "Asia/Tokyo"),
+            mode=os.getenv("NOTIFICATION_MODE", "full"),
+            delta_epsilon=float(os.getenv("NOTIFICATION_DELTA_EPSILON", "0.1")),
+            state_path=os.getenv("NOTIFICATION_STATE_PATH", ""),
         )
 
         self.price_change_threshold = float(os.getenv("PRICE_CHANGE_THRESHOLD", "5.0"))
+        # 銘柄・市場ごとのアラートルール（JSON、ファイルがなければ銘柄ごとの閾値のみ）
+        self.alert_rules_path = os.getenv("ALERT_RULES_PATH", "data/alert_rules.json")
+
+        self.fetch = FetchConfig(
+            batch_size=int(os.getenv("FETCH_BATCH_SIZE", "50")),
+            max_workers=int(os.getenv("FETCH_MAX_WORKERS", "8")),
+            provider=os.getenv("QUOTE_PROVIDER", "yfinance"),
+            fixture_path=os.getenv("QUOTE_FIXTURE_PATH", ""),
+            health_path=os.getenv("SYMBOL_HEALTH_PATH", ""),
+            failure_threshold=int(os.getenv("SYMBOL_FAILURE_THRESHOLD", "3")),
+            failure_backoff=float(os.getenv("SYMBOL_FAILURE_BACKOFF", "300")),
+            failure_backoff_max=float(os.getenv("SYMBOL_FAILURE_BACKOFF_MAX", "86400")),
+            rate_limit=float(os.getenv("QUOTE_RATE_LIMIT", "5.0")),
+            rate_limit_burst=int(os.getenv("QUOTE_RATE_BURST", "5")),
+            host_rate_limits=_parse_number_map(os.getenv("QUOTE_RATE_LIMITS", "")),
+        )
+
+        self.http = HTTPConfig(
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "5.0")),
+            read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "10.0")),
+            pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE", "10")),
+        )
+
+        self.cache = CacheConfig(
+            path=os.getenv("PRICE_CACHE_PATH", ""),
+            ttl=int(os.getenv("PRICE_CACHE_TTL", "600")),
+            memory_ttl=float(os.getenv("QUOTE_CACHE_TTL", "60")),
+            market_ttls=_parse_number_map(os.getenv("QUOTE_CACHE_MARKET_TTLS", "")),
+            max_entries=int(os.getenv("QUOTE_CACHE_MAX_ENTRIES", "5000")),
+            stale_while_revalidate=_env_flag("QUOTE_CACHE_STALE_WHILE_REVALIDATE"),
+            stale_ttl=float(os.getenv("QUOTE_CACHE_STALE_TTL", "600")),
+        )
+
+        self.history = HistoryConfig(path=os.getenv("PRICE_HISTORY_DIR", ""))
+
+        self.metrics = MetricsConfig(
+            summary_path=os.getenv("METRICS_SUMMARY_PATH", ""),
+            prometheus_path=os.getenv("METRICS_PROMETHEUS_PATH", ""),
+        )
 
         # 監視対象株式の設定
         self.stocks = self._load_stock_config()
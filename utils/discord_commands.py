@@ -17,21 +17,53 @@ class StockCommand:
     user: str
 
 
+@dataclass
+class CommandResult:
+    """コマンドの実行結果"""
+
+    command: StockCommand
+    success: bool
+    message: str
+
+
+# 対応している市場
+MARKETS = ("jp", "us", "crypto", "eu", "asia", "ca", "au")
+
+DEFAULT_MARKET = "jp"
+
+# シンボルの区切り（カンマ・空白）
+_SYMBOL_SEPARATOR = re.compile(r"[,\s]+")
+# !add-stock の引数の先頭にあるシンボル列（"AAPL,MSFT" や "AAPL, MSFT"）と残り
+_SYMBOL_LIST = re.compile(r"([^\s,]+(?:\s*,\s*[^\s,]+)*),?\s*(.*)")
+
+# コマンドの正規化した表記
+_COMMAND_NAMES = {
+    "add": "!add-stock",
+    "remove": "!remove-stock",
+    "list": "!list-stocks",
+    "clear": "!clear-stocks",
+}
+
+
 class DiscordCommandParser:
     """Discord コマンドパーサー"""
-    
+
     def __init__(self):
-        self.command_patterns = {
-            'add': re.compile(r'^!add[-_]?stock\s+([A-Z0-9\.\^-]+)(?:\s+(.+?))?(?:\s+(jp|us|crypto|eu|asia|ca|au))?$', re.IGNORECASE),
-            'remove': re.compile(r'^!remove[-_]?stock\s+([A-Z0-9\.\^-]+)$', re.IGNORECASE),
-            'list': re.compile(r'^!list[-_]?stocks?$', re.IGNORECASE),
-            'clear': re.compile(r'^!clear[-_]?stocks?$', re.IGNORECASE),
+        self.symbol_pattern = re.compile(r"^[A-Z0-9\.\^-]+$", re.IGNORECASE)
+        # コマンド名（!・区切り文字・複数形を除いたもの）ごとの解析処理
+        self.handlers = {
+            "addstock": self._parse_add,
+            "removestock": self._parse_remove,
+            "liststock": self._parse_list,
+            "clearstock": self._parse_clear,
         }
-    
-    def parse_command(self, message: str, username: str = "Unknown") -> Optional[StockCommand]:
+
+    def parse_command(
+        self, message: str, username: str = "Unknown"
+    ) -> Optional[StockCommand]:
         """
         Discordメッセージからコマンドを解析
-        
+
         対応コマンド:
         - !add-stock AAPL Apple us
         - !add-stock 369A.T エータイ jp
@@ -43,60 +75,181 @@ class DiscordCommandParser:
         - !remove-stock AAPL
         - !list-stocks
         - !clear-stocks
-        
+
         市場指定なしの場合は日本株 (jp) として処理されます。
+        複数のコマンドになるメッセージは ValueError になります（parse_commands を使用）。
         """
-        message = message.strip()
-        
-        # add-stock コマンド
-        if match := self.command_patterns['add'].match(message):
-            symbol = match.group(1).upper()
-            name = match.group(2) if match.group(2) else symbol
-            market = match.group(3) if match.group(3) else "jp"  # デフォルトは日本
-            
-            return StockCommand(
+        commands = self._parse_line(message.strip(), username)
+        if len(commands) > 1:
+            raise ValueError(
+                f"複数のコマンドが含まれています（{len(commands)}件）: {message.strip()}"
+            )
+        return commands[0] if commands else None
+
+    def parse_commands(
+        self, message: str, username: str = "Unknown"
+    ) -> List[StockCommand]:
+        """
+        複数行のメッセージ（Issue本文など）から全てのコマンドを解析
+
+        1行に1コマンドで、!で始まらない行は無視します。
+        シンボルはカンマ区切りで複数指定できます（名前はシンボルと同じになります）:
+        - !add-stock AAPL,MSFT,NVDA us
+        - !add-stock AAPL, MSFT, NVDA us
+        - !remove-stock AAPL MSFT（削除は空白区切りも可）
+        """
+        commands = []
+        for line in message.splitlines():
+            commands.extend(self._parse_line(line.strip(), username))
+        return commands
+
+    def _parse_line(self, line: str, username: str) -> List[StockCommand]:
+        """1行のコマンドを解析（コマンド名で解析処理を選択）"""
+        if not line.startswith("!"):
+            return []
+
+        name, _, args = line[1:].partition(" ")
+        key = name.lower().replace("-", "").replace("_", "").removesuffix("s")
+        handler = self.handlers.get(key)
+        if handler is None:
+            return []
+
+        return handler(args.strip(), username)
+
+    def _split_symbols(self, text: str) -> Optional[List[str]]:
+        """カンマ・空白区切りのシンボルを分割（不正なシンボルがあればNone）"""
+        symbols = [symbol.upper() for symbol in _SYMBOL_SEPARATOR.split(text) if symbol]
+        if not symbols or not all(self.symbol_pattern.match(s) for s in symbols):
+            return None
+        return symbols
+
+    def _parse_add(self, args: str, username: str) -> List[StockCommand]:
+        """!add-stock シンボル[,シンボル...] [名前] [市場]"""
+        if not args:
+            return []
+
+        # 先頭のカンマ区切りのシンボル列（カンマの前後の空白は許可）と残りに分ける
+        match = _SYMBOL_LIST.match(args)
+        symbols = self._split_symbols(match.group(1)) if match else None
+        if symbols is None:
+            return []
+
+        rest = match.group(2)
+        market = DEFAULT_MARKET  # デフォルトは日本
+        head, _, last = rest.rpartition(" ")
+        if last.lower() in MARKETS:
+            market, rest = last.lower(), head.strip()
+
+        return [
+            StockCommand(
                 action="add",
                 symbol=symbol,
-                name=name,
+                name=rest if rest and len(symbols) == 1 else symbol,
                 market=market,
-                user=username
-            )
-        
-        # remove-stock コマンド
-        elif match := self.command_patterns['remove'].match(message):
-            symbol = match.group(1).upper()
-            
-            return StockCommand(
-                action="remove",
-                symbol=symbol,
-                name="",
-                market="",
-                user=username
+                user=username,
             )
-        
-        # list-stocks コマンド
-        elif self.command_patterns['list'].match(message):
-            return StockCommand(
-                action="list",
-                symbol="",
-                name="",
-                market="",
-                user=username
-            )
-        
-        # clear-stocks コマンド
-        elif self.command_patterns['clear'].match(message):
-            return StockCommand(
-                action="clear",
-                symbol="",
-                name="",
-                market="",
-                user=username
+            for symbol in symbols
+        ]
+
+    def _parse_remove(self, args: str, username: str) -> List[StockCommand]:
+        """!remove-stock シンボル[,シンボル...]"""
+        symbols = self._split_symbols(args)
+        if symbols is None:
+            return []
+
+        return [
+            StockCommand(
+                action="remove", symbol=symbol, name="", market="", user=username
             )
-        
-        return None
-    
-    
+            for symbol in symbols
+        ]
+
+    def _parse_list(self, args: str, username: str) -> List[StockCommand]:
+        """!list-stocks"""
+        if args:
+            return []
+        return [
+            StockCommand(action="list", symbol="", name="", market="", user=username)
+        ]
+
+    def _parse_clear(self, args: str, username: str) -> List[StockCommand]:
+        """!clear-stocks"""
+        if args:
+            return []
+        return [
+            StockCommand(action="clear", symbol="", name="", market="", user=username)
+        ]
+
+    def apply_commands(
+        self, commands: List[StockCommand], stock_manager
+    ) -> List[CommandResult]:
+        """コマンドを順番に実行し、監視リストへの変更を1回で書き込む"""
+        results = []
+        with stock_manager.transaction() as transaction:
+            for command in commands:
+                if command.action == "add":
+                    success = transaction.add(
+                        command.symbol, command.name, command.market
+                    )
+                    message = (
+                        f"株式 {command.symbol} ({command.name}) を監視リストに追加しました"
+                        if success
+                        else f"株式 {command.symbol} は既に監視リストに存在します"
+                    )
+                elif command.action == "remove":
+                    success = transaction.remove(command.symbol)
+                    message = (
+                        f"株式 {command.symbol} を監視リストから削除しました"
+                        if success
+                        else f"株式 {command.symbol} は監視リストに存在しません"
+                    )
+                elif command.action == "clear":
+                    count = transaction.clear()
+                    success = True
+                    message = f"{count}銘柄を監視リストから削除しました"
+                else:
+                    success = True
+                    message = f"現在の監視銘柄: {len(transaction.stocks)}銘柄"
+
+                results.append(CommandResult(command, success, message))
+
+        return results
+
+    @staticmethod
+    def format_command_line(command: StockCommand) -> str:
+        """コマンドを正規化した1行（parse_commandsで読み戻せる形式）"""
+        line = _COMMAND_NAMES[command.action]
+        if command.action == "add":
+            return f"{line} {command.symbol} {command.name} {command.market}"
+        if command.action == "remove":
+            return f"{line} {command.symbol}"
+        return line
+
+    def format_github_issues(self, commands: List[StockCommand]) -> Dict[str, str]:
+        """複数コマンドをまとめたGitHub Issue用のフォーマット
+
+        本文には全てのコマンドを1行ずつ書き込む（commands_from_issueが読み取る）。
+        """
+        if len(commands) == 1:
+            issue = self.format_github_issue(commands[0])
+        else:
+            actions = list(dict.fromkeys(command.action for command in commands))
+            symbols = ", ".join(c.symbol for c in commands if c.symbol)
+            issue = {
+                "title": f"Stock Commands: {len(commands)}件"
+                + (f" ({symbols})" if symbols else ""),
+                "body": (
+                    "\n## 株式管理リクエスト（まとめて処理）\n\n"
+                    f"**リクエスト者**: {commands[0].user}\n"
+                ),
+                "labels": ["discord-command"]
+                + [f"action-{action}" for action in actions],
+            }
+
+        lines = "\n".join(self.format_command_line(c) for c in commands)
+        issue["body"] = f"{issue['body']}\n### コマンド\n{lines}\n"
+        return issue
+
     def format_github_issue(self, command: StockCommand) -> Dict[str, str]:
         """GitHub Issue用のフォーマット"""
         if command.action == "add":
@@ -0,0 +1,148 @@
+"""
+共有HTTPトランスポート - keep-alive接続プールとタイムアウト管理
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "共有HTTPトランスポートで送信したリクエスト数"
+)
+HTTP_NEW_CONNECTIONS = REGISTRY.counter(
+    "http_new_connections_total",
+    "新規に確立した接続数（リクエスト数との差が接続を再利用した数）",
+)
+
+
+@dataclass
+class TransportStats:
+    """接続再利用の統計"""
+
+    requests: int = 0
+    new_connections: int = 0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    @property
+    def reused_connections(self) -> int:
+        """既存接続を再利用したリクエスト数"""
+        return max(0, self.requests - self.new_connections)
+
+    def record_request(self, host: str = ""):
+        with self._lock:
+            self.requests += 1
+        HTTP_REQUESTS.inc(host=host)
+
+    def record_connection(self, host: str = ""):
+        with self._lock:
+            self.new_connections += 1
+        HTTP_NEW_CONNECTIONS.inc(host=host)
+
+
+def _counting_pool(base, stats: TransportStats):
+    """新規接続数を数える接続プールクラスを作成"""
+
+    class CountingPool(base):
+        def _new_conn(self):
+            stats.record_connection(self.host)
+            return super()._new_conn()
+
+    return CountingPool
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """新規接続を計測するHTTPAdapter"""
+
+    def __init__(self, stats: TransportStats, **kwargs):
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self._stats),
+            "https": _counting_pool(HTTPSConnectionPool, self._stats),
+        }
+
+
+class HTTPTransport:
+    """ホスト単位の接続プールを持つ共有HTTPトランスポート"""
+
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 10.0,
+        pool_maxsize: int = 10,
+        pool_connections: int = 10,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.stats = TransportStats()
+
+        # pool_maxsizeはホストごとの同時接続上限、pool_blockで上限を超えた分は待機させる
+        adapter = _CountingHTTPAdapter(
+            self.stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def timeout(self):
+        """requestsに渡す(接続, 読み込み)タイムアウト"""
+        return (self.connect_timeout, self.read_timeout)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """タイムアウト付きでリクエストを送信"""
+        kwargs.setdefault("timeout", self.timeout)
+        self.stats.record_request(urlsplit(url).hostname or "")
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """接続プールを閉じる"""
+        self.session.close()
+
+
+_shared_transport: Optional[HTTPTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_transport(config=None) -> HTTPTransport:
+    """プロセス内で共有するトランスポートを取得（初回呼び出し時に作成）"""
+    global _shared_transport
+
+    with _shared_lock:
+        if _shared_transport is None:
+            http_config = getattr(config, "http", None)
+            if http_config is not None:
+                _shared_transport = HTTPTransport(
+                    connect_timeout=http_config.connect_timeout,
+                    read_timeout=http_config.read_timeout,
+                    pool_maxsize=http_config.pool_maxsize,
+                )
+            else:
+                _shared_transport = HTTPTransport()
+            logger.debug("共有HTTPトランスポートを作成しました")
+
+        return _shared_transport
@@ -0,0 +1,31 @@
+"""
+遅延インポート - 重い依存パッケージを最初に使う時点で読み込む
+"""
+
+import importlib
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+    """属性に初めてアクセスした時にモジュールをインポートする代理オブジェクト
+
+    ``yf = LazyModule("yfinance")`` のようにモジュールの代わりに置く。
+    ``patch("api.quote_providers.yf.Ticker")`` のような属性の差し替えもそのまま使える。
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
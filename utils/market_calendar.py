@@ -0,0 +1,229 @@
+"""
+取引カレンダー - 市場ごとの取引時間と休場日
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, FrozenSet, Iterator, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+# 引け後に終値が確定して配信されるまでの猶予
+SETTLEMENT_DELAY = timedelta(minutes=20)
+
+# 休場日・取引時間を探索する範囲（最長の連休より長くとる）
+_SEARCH_DAYS = 14
+
+# 休場日の掲載切れを警告済みの市場
+_warned_markets = set()
+
+
+def _dates(*values: str) -> FrozenSet[date]:
+    return frozenset(date.fromisoformat(value) for value in values)
+
+
+@dataclass(frozen=True)
+class MarketSession:
+    """市場の取引時間（現地時間）と休場日"""
+
+    timezone: str
+    open: time
+    close: time
+    weekdays: FrozenSet[int] = frozenset(range(5))  # 取引開始日の曜日（月=0）
+    holidays: FrozenSet[date] = frozenset()
+
+    def sessions(self, start: date, days: int) -> Iterator[Tuple[datetime, datetime]]:
+        """startから指定日数分の(開始, 終了)を返す（終了が開始以前なら翌日終了）"""
+        tz = ZoneInfo(self.timezone)
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            if day.weekday() not in self.weekdays or day in self.holidays:
+                continue
+            opened = datetime.combine(day, self.open, tzinfo=tz)
+            closed = datetime.combine(day, self.close, tzinfo=tz)
+            if closed <= opened:
+                closed += timedelta(days=1)
+            yield opened, closed
+
+
+# 休場日は取引所の公表値（2026年〜2027年分、年次で更新が必要）
+# 掲載のない年は曜日のみで判定する
+# fmt: off
+MARKET_SESSIONS: Dict[str, MarketSession] = {
+    # 東京証券取引所
+    "jp": MarketSession(
+        timezone="Asia/Tokyo",
+        open=time(9, 0),
+        close=time(15, 30),
+        holidays=_dates(
+            "2026-01-01", "2026-01-02", "2026-01-12", "2026-02-11", "2026-02-23",
+            "2026-03-20", "2026-04-29", "2026-05-04", "2026-05-05", "2026-05-06",
+            "2026-07-20", "2026-08-11", "2026-09-21", "2026-09-22", "2026-09-23",
+            "2026-10-12", "2026-11-03", "2026-11-23", "2026-12-31",
+            "2027-01-01", "2027-01-11", "2027-02-11", "2027-02-23", "2027-03-22",
+            "2027-04-29", "2027-05-03", "2027-05-04", "2027-05-05", "2027-07-19",
+            "2027-08-11", "2027-09-20", "2027-09-23", "2027-10-11", "2027-11-03",
+            "2027-11-23", "2027-12-31",
+        ),
+    ),
+    # ニューヨーク証券取引所
+    "us": MarketSession(
+        timezone="America/New_York",
+        open=time(9, 30),
+        close=time(16, 0),
+        holidays=_dates(
+            "2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25",
+            "2026-06-19", "2026-07-03", "2026-09-07", "2026-11-26", "2026-12-25",
+            "2027-01-01", "2027-01-18", "2027-02-15", "2027-03-26", "2027-05-31",
+            "2027-06-18", "2027-07-05", "2027-09-06", "2027-11-25", "2027-12-24",
+        ),
+    ),
+    # ロンドン証券取引所
+    "eu": MarketSession(
+        timezone="Europe/London",
+        open=time(8, 0),
+        close=time(16, 30),
+        holidays=_dates(
+            "2026-01-01", "2026-04-03", "2026-04-06", "2026-05-04", "2026-05-25",
+            "2026-08-31", "2026-12-25", "2026-12-28",
+            "2027-01-01", "2027-03-26", "2027-03-29", "2027-05-03", "2027-05-31",
+            "2027-08-30", "2027-12-27", "2027-12-28",
+        ),
+    ),
+    # 香港証券取引所
+    "asia": MarketSession(
+        timezone="Asia/Hong_Kong",
+        open=time(9, 30),
+        close=time(16, 0),
+        holidays=_dates(
+            "2026-01-01", "2026-02-17", "2026-02-18", "2026-02-19", "2026-04-03",
+            "2026-04-06", "2026-04-07", "2026-05-01", "2026-05-25", "2026-06-19",
+            "2026-07-01", "2026-10-01", "2026-10-19", "2026-12-25",
+            "2027-01-01", "2027-02-08", "2027-02-09", "2027-03-26", "2027-03-29",
+            "2027-04-05", "2027-05-13", "2027-06-09", "2027-07-01", "2027-09-16",
+            "2027-10-01", "2027-10-08", "2027-12-27",
+        ),
+    ),
+    # トロント証券取引所
+    "ca": MarketSession(
+        timezone="America/Toronto",
+        open=time(9, 30),
+        close=time(16, 0),
+        holidays=_dates(
+            "2026-01-01", "2026-02-16", "2026-04-03", "2026-05-18", "2026-07-01",
+            "2026-08-03", "2026-09-07", "2026-10-12", "2026-12-25", "2026-12-28",
+            "2027-01-01", "2027-02-15", "2027-03-26", "2027-05-24", "2027-07-01",
+            "2027-08-02", "2027-09-06", "2027-10-11", "2027-12-27", "2027-12-28",
+        ),
+    ),
+    # オーストラリア証券取引所
+    "au": MarketSession(
+        timezone="Australia/Sydney",
+        open=time(10, 0),
+        close=time(16, 0),
+        holidays=_dates(
+            "2026-01-01", "2026-01-26", "2026-04-03", "2026-04-06", "2026-06-08",
+            "2026-12-25", "2026-12-28",
+            "2027-01-01", "2027-01-26", "2027-03-26", "2027-03-29", "2027-06-14",
+            "2027-12-27", "2027-12-28",
+        ),
+    ),
+    # 為替（日曜17時〜金曜17時 ニューヨーク時間）
+    "forex": MarketSession(
+        timezone="America/New_York",
+        open=time(17, 0),
+        close=time(17, 0),
+        weekdays=frozenset({6, 0, 1, 2, 3}),
+    ),
+}
+# fmt: on
+
+# 暗号通貨など、MARKET_SESSIONSにない市場は常時取引として扱う
+
+
+def _as_aware(at: Optional[datetime]) -> datetime:
+    if at is None:
+        return datetime.now(timezone.utc)
+    if at.tzinfo is None:
+        # naiveな日時はローカル時間とみなす（StockPrice.timestampと同じ扱い）
+        return at.astimezone()
+    return at
+
+
+def _check_holidays_listed(market: str, session: MarketSession, year: int):
+    """休場日の掲載がない年を判定しようとした場合に警告（市場ごとに1回）"""
+    if not session.holidays or market in _warned_markets:
+        return
+    last_year = max(holiday.year for holiday in session.holidays)
+    if year > last_year:
+        _warned_markets.add(market)
+        logger.warning(
+            f"市場 {market} の休場日は{last_year}年までしか登録されていません。"
+            f"{year}年は曜日のみで判定します（MARKET_SESSIONSの更新が必要です）"
+        )
+
+
+def _sessions_around(market: str, session: MarketSession, at: datetime):
+    local_date = at.astimezone(ZoneInfo(session.timezone)).date()
+    _check_holidays_listed(market, session, local_date.year)
+    start = local_date - timedelta(days=_SEARCH_DAYS)
+    return session.sessions(start, _SEARCH_DAYS * 2 + 1)
+
+
+def is_market_open(market: str, at: Optional[datetime] = None) -> bool:
+    """指定時刻に市場が取引中かチェック"""
+    session = MARKET_SESSIONS.get(market)
+    if session is None:
+        return True
+
+    at = _as_aware(at)
+    return any(
+        opened <= at < closed
+        for opened, closed in _sessions_around(market, session, at)
+    )
+
+
+def last_close(market: str, at: Optional[datetime] = None) -> Optional[datetime]:
+    """指定時刻以前で直近の引け時刻（常時取引の市場はNone）"""
+    session = MARKET_SESSIONS.get(market)
+    if session is None:
+        return None
+
+    at = _as_aware(at)
+    closes = [
+        closed for _, closed in _sessions_around(market, session, at) if closed <= at
+    ]
+    return max(closes) if closes else None
+
+
+def next_open(market: str, at: Optional[datetime] = None) -> Optional[datetime]:
+    """指定時刻より後で次の寄り付き時刻（常時取引の市場はNone）"""
+    session = MARKET_SESSIONS.get(market)
+    if session is None:
+        return None
+
+    at = _as_aware(at)
+    opens = [
+        opened for opened, _ in _sessions_around(market, session, at) if opened > at
+    ]
+    return min(opens) if opens else None
+
+
+def is_quote_final(
+    market: str, fetched_at: datetime, at: Optional[datetime] = None
+) -> bool:
+    """休場中で、取得済みの株価が直近の終値確定後のものかチェック
+
+    Trueの場合、その株価は次の寄り付きまで変わらないため再取得は不要。
+    """
+    at = _as_aware(at)
+    if is_market_open(market, at):
+        return False
+
+    closed = last_close(market, at)
+    if closed is None:
+        return False
+
+    return _as_aware(fetched_at) >= closed + SETTLEMENT_DELAY
@@ -0,0 +1,303 @@
+"""
+メトリクス - 株価取得・キャッシュ・配信の処理時間と回数を集計
+
+プロセス内で共有するREGISTRYにカウンターとヒストグラムを記録し、
+実行終了時にPrometheusのテキスト形式とJSONのサマリーに書き出す。
+"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from utils.file_utils import atomic_write_json
+
+# 処理時間（秒）のバケット
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """単調増加するカウンター（ラベルごと）"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = ""):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def total(self) -> float:
+        """全ラベルの合計"""
+        return sum(self._values.values())
+
+    def prometheus_lines(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+    def summary(self) -> List[Dict]:
+        return [
+            {"labels": dict(key), "value": value}
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+
+class Histogram:
+    """値の分布（ラベルごとのバケット数・合計・件数）"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str = "",
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[LabelKey, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.count += 1
+            series.sum += value
+            series.max = max(series.max, value)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """withブロックの処理時間を記録"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def count(self, **labels) -> int:
+        series = self._series.get(_label_key(labels))
+        return series.count if series else 0
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """バケット内を線形補間した分位点の推定値"""
+        series = self._series.get(_label_key(labels))
+        return self._quantile(series, q) if series else None
+
+    def _quantile(self, series: _HistogramSeries, q: float) -> float:
+        if series.count == 0:
+            return 0.0
+
+        rank = q * series.count
+        cumulative = 0
+        for index, count in enumerate(series.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else series.max
+                fraction = (rank - cumulative) / count
+                return min(series.max, lower + (upper - lower) * fraction)
+            cumulative += count
+        return series.max
+
+    def prometheus_lines(self) -> List[str]:
+        lines = []
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series.counts):
+                cumulative += count
+                labels = _format_labels(key, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(
+                f"{self.name}_sum{_format_labels(key)} {_format_value(series.sum)}"
+            )
+            lines.append(f"{self.name}_count{_format_labels(key)} {series.count}")
+        return lines
+
+    def summary(self) -> List[Dict]:
+        return [
+            {
+                "labels": dict(key),
+                "count": series.count,
+                "sum": round(series.sum, 6),
+                "avg": round(series.sum / series.count, 6) if series.count else 0.0,
+                "p50": round(self._quantile(series, 0.5), 6),
+                "p99": round(self._quantile(series, 0.99), 6),
+                "max": round(series.max, 6),
+            }
+            for key, series in sorted(self._series.items())
+        ]
+
+
+class MetricsRegistry:
+    """メトリクスの登録先（同じ名前で取得すると同じメトリクスを返す）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, object] = {}
+        self._info: Dict[str, object] = {}
+        self.started_at = datetime.now()
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get(name, lambda: Counter(name, help))
+
+    def histogram(
+        self, name: str, help: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get(name, lambda: Histogram(name, help, buckets))
+
+    def _get(self, name: str, factory):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = factory()
+        return metric
+
+    def set_info(self, name: str, value):
+        """サマリーに含める付加情報（JSONに変換できる値）を設定"""
+        with self._lock:
+            self._info[name] = value
+
+    def reset(self):
+        """記録した値を全て破棄（登録済みのメトリクスはそのまま使える、テスト用）"""
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.clear()
+            self._info.clear()
+            self.started_at = datetime.now()
+
+    def to_prometheus(self) -> str:
+        """Prometheusのテキスト形式"""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.prometheus_lines())
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict:
+        """実行結果のサマリー（JSON）"""
+        counters = {}
+        histograms = {}
+        for name, metric in sorted(self._metrics.items()):
+            target = counters if metric.kind == "counter" else histograms
+            target[name] = metric.summary()
+
+        summary = {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "counters": counters,
+            "histograms": histograms,
+        }
+        if self._info:
+            summary["info"] = dict(self._info)
+
+        lookups = self._metrics.get("price_cache_lookups_total")
+        if lookups is not None and lookups.total():
+            summary["cache_hit_ratio"] = round(
+                lookups.value(result="hit") / lookups.total(), 4
+            )
+
+        requests = self._metrics.get("http_requests_total")
+        connections = self._metrics.get("http_new_connections_total")
+        if requests is not None and connections is not None and requests.total():
+            reused = max(0, requests.total() - connections.total())
+            summary["connection_reuse_ratio"] = round(reused / requests.total(), 4)
+        return summary
+
+    def write(self, prometheus_path: str = "", summary_path: str = ""):
+        """指定されたパスにPrometheus形式・JSONサマリーを書き出す"""
+        if prometheus_path:
+            path = Path(prometheus_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(self.to_prometheus(), encoding="utf-8")
+        if summary_path:
+            atomic_write_json(summary_path, self.summary())
+
+
+# プロセス内で共有するレジストリ
+REGISTRY = MetricsRegistry()
+
+
+def write_metrics(config, registry: MetricsRegistry = REGISTRY):
+    """設定（config.metrics）の出力先にメトリクスを書き出す"""
+    metrics_config = getattr(config, "metrics", None)
+    if metrics_config is None:
+        return
+    registry.write(metrics_config.prometheus_path, metrics_config.summary_path)
@@ -0,0 +1,233 @@
+"""
+株価履歴ストア - 固定長の列ファイルに追記し、メモリマップで範囲検索
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.file_utils import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# 列名とデータ型（1行 = 各列ファイルの同じ位置の要素）
+COLUMNS = {
+    "symbol_id": np.dtype("<i4"),
+    "timestamp": np.dtype("<i8"),  # UNIXエポック（ミリ秒）
+    "price": np.dtype("<f8"),
+    "change": np.dtype("<f8"),
+    "volume": np.dtype("<i8"),
+}
+
+SYMBOLS_FILE = "symbols.json"
+
+
+class PriceHistoryStore:
+    """追記専用の列指向株価履歴
+
+    各列は ``<列名>.bin`` に固定長で保存し、シンボルは ``symbols.json`` の辞書で
+    整数IDに変換する。行はタイムスタンプ順に追記されるため、期間指定は二分探索で
+    絞り込み、読み込みはメモリマップで行う（全件をPythonオブジェクトにしない）。
+
+    途中への挿入は行わないため、保存済みの最終時刻より古い株価は破棄される。
+    銘柄ごとの検索はシンボルIDから行位置への索引（メモリ上）を使う。
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._symbols: List[str] = self._load_symbols()
+        self._symbol_ids: Dict[str, int] = {
+            key: index for index, key in enumerate(self._symbols)
+        }
+        self._repair()
+
+        # シンボルID -> 行位置（昇順）の索引。追記分は検索時に追加する
+        self._row_index: Dict[int, List[np.ndarray]] = {}
+        self._indexed_rows = 0
+
+    @staticmethod
+    def _key(symbol: str, market: str) -> str:
+        return f"{symbol}|{market}"
+
+    def _column_path(self, name: str) -> Path:
+        return self.directory / f"{name}.bin"
+
+    def _load_symbols(self) -> List[str]:
+        path = self.directory / SYMBOLS_FILE
+        if not path.exists():
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("symbols", [])
+
+    def _save_symbols(self):
+        atomic_write_json(self.directory / SYMBOLS_FILE, {"symbols": self._symbols})
+
+    def _column_rows(self, name: str) -> int:
+        path = self._column_path(name)
+        return path.stat().st_size // COLUMNS[name].itemsize if path.exists() else 0
+
+    def _repair(self):
+        """途中で中断した追記を取り除き、全列の行数を揃える"""
+        rows = len(self)
+        for name, dtype in COLUMNS.items():
+            path = self._column_path(name)
+            if path.exists() and path.stat().st_size != rows * dtype.itemsize:
+                logger.warning(f"株価履歴の列 {name} を{rows}行に切り詰めます")
+                with open(path, "r+b") as f:
+                    f.truncate(rows * dtype.itemsize)
+
+    def __len__(self) -> int:
+        return min(self._column_rows(name) for name in COLUMNS)
+
+    @property
+    def symbols(self) -> List[str]:
+        """登録済みのシンボル（'シンボル|市場'、インデックスがID）"""
+        return list(self._symbols)
+
+    def symbol_id(self, symbol: str, market: str) -> Optional[int]:
+        """シンボルのIDを取得（未登録ならNone）"""
+        return self._symbol_ids.get(self._key(symbol, market))
+
+    def last_timestamp(self) -> Optional[int]:
+        """最後に追記した行のタイムスタンプ（ミリ秒）"""
+        rows = len(self)
+        if rows == 0:
+            return None
+        column = self._open_column("timestamp", rows)
+        return int(column[rows - 1])
+
+    def append(self, prices: Iterable) -> int:
+        """株価をまとめて追記し、追記した行数を返す
+
+        追記専用のため、保存済みの最終時刻より古い株価は追記せずに破棄する。
+        """
+        records = sorted(prices, key=lambda price: price.timestamp)
+        if not records:
+            return 0
+
+        timestamps = np.array(
+            [int(price.timestamp.timestamp() * 1000) for price in records],
+            dtype=COLUMNS["timestamp"],
+        )
+
+        # 時刻順を保つため、保存済みの最終時刻より古い行は追記しない
+        last = self.last_timestamp()
+        if last is not None:
+            keep = timestamps >= last
+            if not keep.all():
+                logger.warning(
+                    f"保存済みより古い{int((~keep).sum())}件の株価履歴を破棄します"
+                )
+                records = [price for price, ok in zip(records, keep) if ok]
+                timestamps = timestamps[keep]
+            if not records:
+                return 0
+
+        new_symbols = False
+        ids = []
+        for price in records:
+            key = self._key(price.symbol, price.market)
+            if key not in self._symbol_ids:
+                self._symbol_ids[key] = len(self._symbols)
+                self._symbols.append(key)
+                new_symbols = True
+            ids.append(self._symbol_ids[key])
+
+        # シンボル辞書を先に保存し、列データが未登録IDを指さないようにする
+        if new_symbols:
+            self._save_symbols()
+
+        columns = {
+            "symbol_id": np.array(ids, dtype=COLUMNS["symbol_id"]),
+            "timestamp": timestamps,
+            "price": np.array([p.price for p in records], dtype=COLUMNS["price"]),
+            "change": np.array([p.change for p in records], dtype=COLUMNS["change"]),
+            "volume": np.array([p.volume for p in records], dtype=COLUMNS["volume"]),
+        }
+        for name, values in columns.items():
+            with open(self._column_path(name), "ab") as f:
+                f.write(values.tobytes())
+
+        return len(records)
+
+    def _open_column(self, name: str, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.memmap(
+            self._column_path(name), dtype=COLUMNS[name], mode="r", shape=(rows,)
+        )
+
+    def scan(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """期間内（start <= timestamp < end、ミリ秒）の全銘柄の行を列ごとに返す"""
+        rows = len(self)
+        columns = {name: self._open_column(name, rows) for name in COLUMNS}
+
+        timestamps = columns["timestamp"]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, "left"))
+        hi = rows if end is None else int(np.searchsorted(timestamps, end, "left"))
+
+        return {name: column[lo:hi] for name, column in columns.items()}
+
+    def _update_index(self, rows: int):
+        """索引に未登録の行（前回の検索以降に追記された行）を追加"""
+        if rows < self._indexed_rows:
+            self._row_index, self._indexed_rows = {}, 0
+        if rows == self._indexed_rows:
+            return
+
+        ids = np.asarray(self._open_column("symbol_id", rows)[self._indexed_rows :])
+        order = np.argsort(ids, kind="stable")  # 同じIDの中では行の順序を保つ
+        bounds = np.flatnonzero(np.diff(ids[order])) + 1
+        for group in np.split(order, bounds):
+            offsets = (group + self._indexed_rows).astype(np.intp)
+            self._row_index.setdefault(int(ids[group[0]]), []).append(offsets)
+        self._indexed_rows = rows
+
+    def _symbol_rows(self, symbol_id: int, rows: int) -> np.ndarray:
+        """シンボルの行位置（昇順）"""
+        self._update_index(rows)
+        chunks = self._row_index.get(symbol_id)
+        if not chunks:
+            return np.empty(0, dtype=np.intp)
+        if len(chunks) > 1:
+            self._row_index[symbol_id] = chunks = [np.concatenate(chunks)]
+        return chunks[0]
+
+    def history(
+        self,
+        symbol: str,
+        market: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """1銘柄の期間内の行を列ごとに返す（索引で該当行のみ読み込む）"""
+        rows = len(self)
+        symbol_id = self.symbol_id(symbol, market)
+        offsets = (
+            self._symbol_rows(symbol_id, rows)
+            if symbol_id is not None
+            else np.empty(0, dtype=np.intp)
+        )
+
+        # 期間は全体の時刻列で行範囲に変換し、銘柄の行位置を二分探索で絞り込む
+        if len(offsets) and (start is not None or end is not None):
+            timestamps = self._open_column("timestamp", rows)
+            lo = 0 if start is None else int(np.searchsorted(timestamps, start, "left"))
+            hi = rows if end is None else int(np.searchsorted(timestamps, end, "left"))
+            offsets = offsets[
+                np.searchsorted(offsets, lo, "left") : np.searchsorted(
+                    offsets, hi, "left"
+                )
+            ]
+
+        return {
+            name: np.asarray(self._open_column(name, rows)[offsets])
+            for name in COLUMNS
+            if name != "symbol_id"
+        }
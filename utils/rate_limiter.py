@@ -0,0 +1,130 @@
+"""
+株価取得元ホストごとのレート制限 - 全スレッドで共有するトークンバケット
+
+429を受けてからリトライで待つのではなく、リクエストの送信前に
+ホスト単位でペースを揃える。レートはAIMDで調整し、429を受けると半減、
+成功が続くと設定した上限まで少しずつ戻す。
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+WAIT_SECONDS = REGISTRY.histogram(
+    "quote_rate_limit_wait_seconds", "レート制限で送信を待った時間（秒）"
+)
+DECREASES = REGISTRY.counter(
+    "quote_rate_limit_decreases_total", "429を受けてレートを下げた回数"
+)
+
+
+class AdaptiveRateLimiter:
+    """AIMDでレートを調整するトークンバケット（スレッドセーフ）"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        host: str = "",
+        min_rate: float = 0.1,
+        increase: Optional[float] = None,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+        clock=time.monotonic,
+        sleep=None,
+    ):
+        self.host = host
+        self.max_rate = rate  # 設定された上限（成功が続くとここまで戻す）
+        self.rate = rate  # 現在のレート（毎秒リクエスト数）
+        self.burst = max(1, burst)
+        self.min_rate = min(min_rate, rate)
+        # 成功が続いた場合に1秒あたり増やすレート（既定は上限の5%、約20秒で全回復）
+        self.increase = increase if increase is not None else rate * 0.05
+        self.decrease = decrease  # 429を受けた場合にレートに掛ける係数
+        self.cooldown = cooldown  # 減速後、この秒数の間の429は同じ混雑として数えない
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(self.burst)
+        self._updated = clock()
+        self._decreased_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """1リクエスト分のトークンを予約し、送信できるまで待つ（待った秒数を返す）"""
+        with self._lock:
+            self._refill(self.clock())
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait > 0:
+            (self.sleep or time.sleep)(wait)
+        WAIT_SECONDS.observe(wait, host=self.host)
+        return wait
+
+    def on_success(self):
+        """成功したリクエストごとにレートを加算（1秒あたり約increase増える）"""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self._refill(self.clock())
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self) -> bool:
+        """429を受けた場合にレートを下げ、貯まったトークンを捨てる
+
+        同時に送信済みのリクエストがまとめて429を受けるため、
+        cooldown以内の429では下げない（下げた場合はTrueを返す）。
+        """
+        with self._lock:
+            now = self.clock()
+            if (
+                self._decreased_at is not None
+                and now - self._decreased_at < self.cooldown
+            ):
+                return False
+
+            self._refill(now)
+            previous = self.rate
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = min(self.tokens, 0.0)
+            self._decreased_at = now
+
+        DECREASES.inc(host=self.host)
+        logger.info(
+            f"レート制限を受けたため送信レートを下げます: {self.host} "
+            f"{previous:.2f} -> {self.rate:.2f}/秒"
+        )
+        return True
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(config, host: str) -> Optional[AdaptiveRateLimiter]:
+    """ホストのレート制限を取得（プロセス内で共有、上限が0以下または接続先がなければNone）"""
+    fetch_config = getattr(config, "fetch", None)
+    if not host or fetch_config is None:
+        return None
+
+    rate = fetch_config.host_rate_limits.get(host, fetch_config.rate_limit)
+    if rate <= 0:
+        return None
+
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = AdaptiveRateLimiter(
+                rate, burst=fetch_config.rate_limit_burst, host=host
+            )
+            logger.debug(f"レート制限を作成しました: {host} {rate}/秒")
+        return limiter
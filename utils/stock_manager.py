@@ -2,11 +2,15 @@
 株式管理ユーティリティ - 動的な株式リスト管理
 """
 
+import bisect
 import json
 import os
-from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.file_utils import atomic_write_json, file_lock
 
 
 @dataclass
@@ -17,103 +21,195 @@ class StockEntry:
     market: str
 
 
+def _sort_key(stock: StockEntry) -> Tuple[str, str]:
+    """保存順（市場順、シンボル順）"""
+    return stock.market, stock.symbol
+
+
+class StockTransaction:
+    """株式リストへの一連の変更（StockManager.transaction()で作成）"""
+
+    def __init__(self, stocks: List[StockEntry]):
+        self.stocks = list(stocks)
+        if any(
+            _sort_key(a) > _sort_key(b) for a, b in zip(self.stocks, self.stocks[1:])
+        ):
+            self.stocks.sort(key=_sort_key)
+        self.symbols = {stock.symbol for stock in self.stocks}
+        self.changed = False
+
+    def add(self, symbol: str, name: str, market: str) -> bool:
+        """株式を追加（並び順を保つ位置に挿入）"""
+        if symbol in self.symbols:
+            return False
+
+        bisect.insort(
+            self.stocks,
+            StockEntry(symbol=symbol, name=name, market=market),
+            key=_sort_key,
+        )
+        self.symbols.add(symbol)
+        self.changed = True
+        return True
+
+    def remove(self, symbol: str) -> bool:
+        """株式を削除"""
+        if symbol not in self.symbols:
+            return False
+
+        self.stocks = [stock for stock in self.stocks if stock.symbol != symbol]
+        self.symbols.discard(symbol)
+        self.changed = True
+        return True
+
+    def clear(self) -> int:
+        """全ての株式を削除"""
+        count = len(self.stocks)
+        if count:
+            self.stocks = []
+            self.symbols = set()
+            self.changed = True
+        return count
+
+
 class StockManager:
-    """株式管理クラス"""
-    
+    """株式管理クラス
+
+    株式リストはメモリ上でシンボル・市場ごとに索引付けして保持し、
+    データファイルの更新時刻・サイズが変わった場合のみ読み直す。
+    """
+
     def __init__(self, data_file: str = "data/stocks.json"):
         self.data_file = Path(data_file)
+        self._stocks: List[StockEntry] = []
+        self._by_symbol: Dict[str, StockEntry] = {}
+        self._by_market: Dict[str, List[StockEntry]] = {}
+        self._signature: Optional[Tuple[int, int]] = None
         self.ensure_data_file()
-    
+
     def ensure_data_file(self):
         """データファイルが存在することを確認"""
         if not self.data_file.exists():
             self.data_file.parent.mkdir(parents=True, exist_ok=True)
             self.save_stocks([])
-    
-    def load_stocks(self) -> List[StockEntry]:
-        """株式リストを読み込み"""
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        """データファイルの(更新時刻, サイズ)（ファイルがなければNone）"""
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
+            stat = self.data_file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _index(self, stocks: List[StockEntry]):
+        """シンボル・市場ごとの索引を作成"""
+        self._stocks = stocks
+        self._by_symbol = {}
+        self._by_market = {}
+        for stock in stocks:
+            self._by_symbol.setdefault(stock.symbol, stock)
+            self._by_market.setdefault(stock.market, []).append(stock)
+
+    def _refresh(self):
+        """データファイルが更新されていれば読み直す"""
+        signature = self._file_signature()
+        if signature is not None and signature == self._signature:
+            return
+
+        try:
+            with open(self.data_file, "r", encoding="utf-8") as f:
                 data = json.load(f)
-                return [StockEntry(**stock) for stock in data.get('stocks', [])]
+                stocks = [StockEntry(**stock) for stock in data.get("stocks", [])]
         except (FileNotFoundError, json.JSONDecodeError):
-            return []
-    
+            stocks = []
+
+        self._index(stocks)
+        self._signature = signature
+
+    def load_stocks(self) -> List[StockEntry]:
+        """株式リストを読み込み"""
+        self._refresh()
+        return list(self._stocks)
+
     def save_stocks(self, stocks: List[StockEntry]):
         """株式リストを保存"""
-        data = {
-            'stocks': [asdict(stock) for stock in stocks]
-        }
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    
+        with file_lock(self.data_file):
+            self._write(stocks)
+
+    def _write(self, stocks: List[StockEntry]):
+        """一時ファイル経由で原子的に書き込み（呼び出し側でロックを取得）"""
+        atomic_write_json(
+            self.data_file, {"stocks": [asdict(stock) for stock in stocks]}
+        )
+
+        # 書き込んだ内容で索引を更新（読み直しは不要）
+        self._index(list(stocks))
+        self._signature = self._file_signature()
+
+    @contextmanager
+    def transaction(self) -> Iterator[StockTransaction]:
+        """ファイルをロックして一連の変更を行い、最後に1回だけ書き込む
+
+        ブロック内で例外が発生した場合は何も書き込まない。
+        """
+        with file_lock(self.data_file):
+            # ロック取得後に最新の内容を読み込む（他プロセスの更新を失わない）
+            self._refresh()
+            transaction = StockTransaction(self._stocks)
+            yield transaction
+            if transaction.changed:
+                self._write(transaction.stocks)
+
+    def add_many(self, entries: Iterable[Tuple[str, str, str]]) -> List[bool]:
+        """(シンボル, 名前, 市場)のリストをまとめて追加し、各追加の成否を返す"""
+        with self.transaction() as transaction:
+            return [
+                transaction.add(symbol, name, market)
+                for symbol, name, market in entries
+            ]
+
+    def remove_many(self, symbols: Iterable[str]) -> List[bool]:
+        """シンボルのリストをまとめて削除し、各削除の成否を返す"""
+        with self.transaction() as transaction:
+            return [transaction.remove(symbol) for symbol in symbols]
+
     def add_stock(self, symbol: str, name: str, market: str) -> bool:
         """株式を追加"""
-        stocks = self.load_stocks()
-        
-        # 既に存在するかチェック
-        if any(stock.symbol == symbol for stock in stocks):
-            return False
-        
-        # 新しい株式を追加
-        new_stock = StockEntry(symbol=symbol, name=name, market=market)
-        stocks.append(new_stock)
-        
-        # 市場順、シンボル順でソート
-        stocks.sort(key=lambda x: (x.market, x.symbol))
-        
-        self.save_stocks(stocks)
-        return True
-    
+        return self.add_many([(symbol, name, market)])[0]
+
     def remove_stock(self, symbol: str) -> bool:
         """株式を削除"""
-        stocks = self.load_stocks()
-        
-        # 削除対象を見つける
-        original_count = len(stocks)
-        stocks = [stock for stock in stocks if stock.symbol != symbol]
-        
-        if len(stocks) < original_count:
-            self.save_stocks(stocks)
-            return True
-        
-        return False
-    
+        return self.remove_many([symbol])[0]
+
     def clear_stocks(self) -> int:
         """全ての株式を削除"""
-        stocks = self.load_stocks()
-        count = len(stocks)
-        self.save_stocks([])
-        return count
-    
+        with self.transaction() as transaction:
+            return transaction.clear()
+
     def get_stock_by_symbol(self, symbol: str) -> Optional[StockEntry]:
         """シンボルで株式を検索"""
-        stocks = self.load_stocks()
-        return next((stock for stock in stocks if stock.symbol == symbol), None)
-    
+        self._refresh()
+        return self._by_symbol.get(symbol)
+
     def get_stocks_by_market(self, market: str) -> List[StockEntry]:
         """市場別に株式を取得"""
-        stocks = self.load_stocks()
-        return [stock for stock in stocks if stock.market == market]
-    
+        self._refresh()
+        return list(self._by_market.get(market, []))
+
     def get_all_stocks(self) -> List[StockEntry]:
         """全ての株式を取得"""
         return self.load_stocks()
-    
+
     def stock_exists(self, symbol: str) -> bool:
         """株式が存在するかチェック"""
         return self.get_stock_by_symbol(symbol) is not None
-    
+
     def get_stock_count(self) -> int:
         """株式の総数を取得"""
-        return len(self.load_stocks())
-    
+        self._refresh()
+        return len(self._stocks)
+
     def get_market_summary(self) -> Dict[str, int]:
         """市場別サマリーを取得"""
-        stocks = self.load_stocks()
-        summary = {}
-        
-        for stock in stocks:
-            summary[stock.market] = summary.get(stock.market, 0) + 1
-        
-        return summary
\ No newline at end of file
+        self._refresh()
+        return {market: len(stocks) for market, stocks in self._by_market.items()}